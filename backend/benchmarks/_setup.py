@@ -0,0 +1,26 @@
+"""
+Shared bootstrap for the benchmark scripts: puts the backend on sys.path and
+configures Django so `equipment` modules can be imported directly.
+"""
+
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Runs `fn` `repeat` times and returns the fastest wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-type aggregation in analyze_csv.
+
+Compares the previous per-type boolean-mask loop (O(rows x types)) with the
+single-pass groupby engine in `equipment.services`, from the 15-row sample
+CSV up to 10M rows and 1,000 types.
+
+    python benchmarks/bench_analyze_csv.py
+    python benchmarks/bench_analyze_csv.py --rows 15 100000 --types 6 100
+"""
+
+import argparse
+
+import _setup  # noqa: F401
+import numpy as np
+import pandas as pd
+
+from equipment.services import summarize_dataframe
+
+
+def legacy_summary(df: pd.DataFrame) -> dict:
+    """The original mask-per-type implementation, kept for comparison."""
+    type_metrics = {}
+    for eq_type in df["Type"].unique():
+        type_df = df[df["Type"] == eq_type]
+        type_metrics[eq_type] = {
+            "count": len(type_df),
+            "avg_flowrate": round(type_df["Flowrate"].mean(), 2),
+            "avg_pressure": round(type_df["Pressure"].mean(), 2),
+            "avg_temperature": round(type_df["Temperature"].mean(), 2),
+        }
+    return {
+        "total_equipment": len(df),
+        "avg_flowrate": round(df["Flowrate"].mean(), 2),
+        "avg_pressure": round(df["Pressure"].mean(), 2),
+        "avg_temperature": round(df["Temperature"].mean(), 2),
+        "type_distribution": df["Type"].value_counts().to_dict(),
+        "type_metrics": type_metrics,
+    }
+
+
+def make_frame(rows: int, types: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    type_ids = rng.integers(0, types, rows)
+    names = np.array([f"Type-{i}" for i in range(types)], dtype=object)
+    return pd.DataFrame({
+        "Equipment Name": np.arange(rows).astype(str),
+        "Type": names[type_ids],
+        "Flowrate": rng.normal(120, 30, rows),
+        "Pressure": rng.normal(6, 1.5, rows),
+        "Temperature": rng.normal(115, 15, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[15, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--types", type=int, nargs="+", default=[6, 100, 1_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max-cells", type=int, default=200_000_000,
+                        help="skip the legacy loop when rows x types exceeds this")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'types':>6} {'legacy (s)':>12} {'groupby (s)':>12} {'speedup':>8}")
+    for rows in args.rows:
+        for types in args.types:
+            if types > rows:
+                continue
+            df = make_frame(rows, types)
+            new = _setup.best_of(lambda: summarize_dataframe(df), args.repeat)
+            if rows * types <= args.legacy_max_cells:
+                old = _setup.best_of(lambda: legacy_summary(df), args.repeat)
+                print(f"{rows:>12,} {types:>6} {old:>12.4f} {new:>12.4f} {old / new:>7.1f}x")
+            else:
+                print(f"{rows:>12,} {types:>6} {'skipped':>12} {new:>12.4f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: per-type anomaly detection against a naive per-row loop.
+
+Times `detect_anomalies` (MAD and IQR) over synthetic frames and reports
+microseconds per row, which should stay flat as the row count grows. The
+naive baseline filters the frame once per row and is only run up to
+--naive-max rows.
+
+    python benchmarks/bench_anomalies.py --rows 10000 100000 1000000 --types 100
+"""
+
+import argparse
+
+import _setup  # noqa: F401
+import numpy as np
+
+from bench_statistics import make_frame
+from equipment.anomalies import detect_anomalies
+from equipment.services import METRIC_COLUMNS
+
+
+def naive(df, threshold=3.5):
+    flagged = 0
+    for _, row in df.iterrows():
+        peers = df[df["Type"] == row["Type"]]
+        for col in METRIC_COLUMNS:
+            median = peers[col].median()
+            mad = (peers[col] - median).abs().median()
+            if mad and abs(0.6745 * (row[col] - median) / mad) > threshold:
+                flagged += 1
+                break
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--types", type=int, default=100)
+    parser.add_argument("--naive-max", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'mad s':>9} {'iqr s':>9} {'mad us/row':>11} {'naive s':>9} {'flagged':>8}")
+    for rows in args.rows:
+        df = make_frame(rows, min(args.types, rows))
+        names = df["Equipment Name"]
+        name_of = lambda idx: names.iloc[idx].tolist()  # noqa: E731
+        mad = _setup.best_of(lambda: detect_anomalies(df, name_of, "mad"), args.repeat)
+        iqr = _setup.best_of(lambda: detect_anomalies(df, name_of, "iqr"), args.repeat)
+        flagged = detect_anomalies(df, name_of, "mad")["total_flagged"]
+        slow = _setup.best_of(lambda: naive(df), 1) if rows <= args.naive_max else np.nan
+        print(f"{rows:>12,} {mad:>9.4f} {iqr:>9.4f} {mad / rows * 1e6:>11.3f} {slow:>9.4f} {flagged:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: history listing size and latency, full list vs cursor pages.
+
+Seeds a throwaway SQLite database with --users x --per-user datasets whose
+JSON columns hold --types equipment types, then requests /api/history/ for
+random users: the unpaginated list of every dataset (retention raised to
+--per-user), the first and a deep cursor page, and the same pages narrowed
+with ?fields=. Reports median latency and response bytes.
+
+    python benchmarks/bench_history_api.py --users 20 --per-user 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import _setup  # noqa: F401
+from django.conf import settings
+from django.db import connections
+
+LIGHT_FIELDS = "id,filename,uploaded_at,total_equipment"
+
+
+def seed(users: int, per_user: int, types: int):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from equipment.models import Dataset
+
+    User.objects.bulk_create([User(username=f"bench{i}", password="!") for i in range(users)])
+    accounts = list(User.objects.filter(username__startswith="bench"))
+    names = [f"Type-{i}" for i in range(types)]
+    distribution = {name: 10 for name in names}
+    metrics = {
+        name: {"count": 10, "avg_flowrate": 119.8, "avg_pressure": 6.11, "avg_temperature": 117.47}
+        for name in names
+    }
+    aggregates = [
+        {"type": name, "rows": 10, "Flowrate_sum": 1198.0, "Flowrate_count": 10,
+         "Pressure_sum": 61.1, "Pressure_count": 10, "Temperature_sum": 1174.7,
+         "Temperature_count": 10, "Flowrate_sumsq": 143600.0, "Pressure_sumsq": 374.0,
+         "Temperature_sumsq": 138000.0}
+        for name in names
+    ]
+
+    uploaded_at = Dataset._meta.get_field("uploaded_at")
+    uploaded_at.auto_now_add = False
+    now = timezone.now()
+    try:
+        for user in accounts:
+            Dataset.objects.bulk_create([
+                Dataset(
+                    user=user, filename=f"upload_{n}.csv",
+                    uploaded_at=now - timedelta(minutes=n),
+                    total_equipment=10 * types, avg_flowrate=119.8, avg_pressure=6.11,
+                    avg_temperature=117.47, type_distribution=distribution,
+                    type_metrics=metrics, aggregates=aggregates,
+                )
+                for n in range(per_user)
+            ], batch_size=2_000)
+    finally:
+        uploaded_at.auto_now_add = True
+    return accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--per-user", type=int, default=5_000)
+    parser.add_argument("--types", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.DATABASES["default"]["NAME"] = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    settings.DATASET_RETENTION_PER_USER = args.per_user
+    settings.ALLOWED_HOSTS = ["*"]
+    connections.close_all()
+
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+    call_command("migrate", verbosity=0)
+
+    start = time.perf_counter()
+    accounts = seed(args.users, args.per_user, args.types)
+    print(f"seeded {args.users * args.per_user:,} datasets in {time.perf_counter() - start:.1f} s")
+
+    def deep_cursor(client):
+        # Walk to the middle of the history to time a deep page
+        url = f"/api/history/?page_size={args.page_size}&fields=id"
+        for _ in range(args.per_user // args.page_size // 2):
+            url = client.get(url).json()["next"]
+        return url.split("cursor=")[1].split("&")[0]
+
+    rng = random.Random(0)
+    client = APIClient()
+    cursor = None
+    cases = {
+        "full list": lambda: "/api/history/",
+        "page 1": lambda: f"/api/history/?page_size={args.page_size}",
+        "page 1, fields": lambda: f"/api/history/?page_size={args.page_size}&fields={LIGHT_FIELDS}",
+        "deep page": lambda: f"/api/history/?page_size={args.page_size}&cursor={cursor}",
+        "deep page, fields": lambda: (
+            f"/api/history/?page_size={args.page_size}&cursor={cursor}&fields={LIGHT_FIELDS}"
+        ),
+    }
+
+    print(f"\n{'request':<20} {'p50 ms':>10} {'bytes':>12}")
+    for label, url in cases.items():
+        timings, size = [], 0
+        for _ in range(args.samples if label != "full list" else max(1, args.samples // 10)):
+            client.force_authenticate(rng.choice(accounts))
+            if label.startswith("deep") and cursor is None:
+                cursor = deep_cursor(client)
+            begin = time.perf_counter()
+            response = client.get(url())
+            timings.append(time.perf_counter() - begin)
+            size = len(response.content)
+        print(f"{label:<20} {statistics.median(timings) * 1000:>10.2f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
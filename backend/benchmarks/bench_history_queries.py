@@ -0,0 +1,172 @@
+"""
+Benchmark: per-user history and retention queries with and without the
+(user, uploaded_at, id) composite index.
+
+Seeds a scratch database with --users x --per-user datasets (1M rows across
+10k users by default), then times the history and retention queries at
+migration 0003 (foreign-key index only) and again after 0004 adds
+dataset_user_recent_idx. Runs on a throwaway SQLite file by default; pass
+--engine postgresql (plus connection options) to use a local PostgreSQL or
+compatible server instead. The target database is dropped and recreated.
+
+    python benchmarks/bench_history_queries.py --users 1000 --per-user 100
+    python benchmarks/bench_history_queries.py --engine postgresql --name bench
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+import _setup  # noqa: F401
+from django.conf import settings
+from django.db import connection, connections
+
+MIGRATION_BEFORE = "0003_dataset_content_hash"
+MIGRATION_AFTER = "0004_dataset_user_recent_idx"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--per-user", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=500,
+                        help="random users queried per measurement")
+    parser.add_argument("--engine", choices=["sqlite3", "postgresql"], default="sqlite3")
+    parser.add_argument("--name", default=None, help="database name (PostgreSQL)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5432")
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "postgres"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", ""))
+    return parser.parse_args()
+
+
+def configure_database(args):
+    if args.engine == "sqlite3":
+        db = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(tempfile.mkdtemp(), "bench.sqlite3"),
+        }
+    else:
+        db = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": args.name or "chemviz_bench",
+            "HOST": args.host,
+            "PORT": args.port,
+            "USER": args.user,
+            "PASSWORD": args.password,
+        }
+    settings.DATABASES["default"].update(db)
+    connections.close_all()
+
+
+def migrate(target):
+    from django.core.management import call_command
+    call_command("migrate", "equipment", target, verbosity=0)
+
+
+def seed(users: int, per_user: int):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from equipment.models import Dataset
+
+    User.objects.bulk_create(
+        [User(username=f"bench{i}", password="!") for i in range(users)],
+        batch_size=5_000,
+    )
+    user_ids = list(User.objects.filter(username__startswith="bench").values_list("id", flat=True))
+
+    # Stamp explicit upload times instead of auto_now_add's "now" for every row
+    uploaded_at = Dataset._meta.get_field("uploaded_at")
+    uploaded_at.auto_now_add = False
+    now = timezone.now()
+    rng = random.Random(0)
+    batch = []
+    total = users * per_user
+    try:
+        # Interleave users so each user's rows are scattered across the table
+        for n in range(total):
+            batch.append(Dataset(
+                user_id=user_ids[n % users],
+                filename=f"upload_{n}.csv",
+                uploaded_at=now - timedelta(seconds=rng.randrange(10_000_000)),
+                total_equipment=15,
+                avg_flowrate=119.8,
+                avg_pressure=6.11,
+                avg_temperature=117.47,
+                type_distribution={"Pump": 4, "Valve": 3},
+            ))
+            if len(batch) == 10_000 or n == total - 1:
+                Dataset.objects.bulk_create(batch)
+                batch = []
+    finally:
+        uploaded_at.auto_now_add = True
+    return user_ids
+
+
+def measure(user_ids, samples: int) -> dict:
+    from equipment.models import Dataset
+
+    rng = random.Random(1)
+    picks = [rng.choice(user_ids) for _ in range(samples)]
+    keep = settings.DATASET_RETENTION_PER_USER
+
+    queries = {
+        "history": lambda uid: list(
+            Dataset.objects.filter(user_id=uid).order_by("-uploaded_at")[:keep]
+        ),
+        "retention scan": lambda uid: list(
+            Dataset.objects.filter(user_id=uid)
+            .order_by("-uploaded_at", "-id").values_list("id", flat=True)[keep:]
+        ),
+    }
+    results = {}
+    for label, query in queries.items():
+        timings = []
+        for uid in picks:
+            start = time.perf_counter()
+            query(uid)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[label] = (
+            timings[len(timings) // 2] * 1000,
+            timings[int(len(timings) * 0.95)] * 1000,
+        )
+    plan = Dataset.objects.filter(user_id=picks[0]).order_by("-uploaded_at")[:keep].explain()
+    return results, plan
+
+
+def main():
+    args = parse_args()
+    configure_database(args)
+
+    if args.engine == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+    migrate(MIGRATION_BEFORE)
+
+    start = time.perf_counter()
+    user_ids = seed(args.users, args.per_user)
+    print(f"{args.engine}: seeded {args.users * args.per_user:,} datasets for "
+          f"{args.users:,} users in {time.perf_counter() - start:.1f} s")
+
+    for label, target in (("before", MIGRATION_BEFORE), ("after", MIGRATION_AFTER)):
+        migrate(target)
+        if args.engine == "sqlite3":
+            connection.cursor().execute("ANALYZE")
+        else:
+            connection.cursor().execute("ANALYZE equipment_dataset")
+        results, plan = measure(user_ids, args.samples)
+        print(f"\n[{label} composite index]")
+        for query, (p50, p95) in results.items():
+            print(f"  {query:<16} p50 {p50:8.3f} ms   p95 {p95:8.3f} ms")
+        print("  plan: " + plan.replace("\n", "\n        "))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: typed, column-pruned CSV parsing.
+
+Compares a plain `pd.read_csv` of a wide export against
+`equipment.services.read_csv` (REQUIRED_COLUMNS only, categorical Type,
+configured float dtype, pyarrow engine when installed).
+
+    python benchmarks/bench_parse_csv.py --rows 1000000 --extra-columns 20
+"""
+
+import argparse
+import io
+
+import _setup  # noqa: F401
+import numpy as np
+import pandas as pd
+
+from equipment import services
+
+
+def make_csv(rows: int, types: int, extra_columns: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Type-{i}" for i in range(types)], dtype=object)
+    data = {
+        "Equipment Name": [f"EQ-{i}" for i in range(rows)],
+        "Type": names[rng.integers(0, types, rows)],
+        "Flowrate": rng.normal(120, 30, rows).round(2),
+        "Pressure": rng.normal(6, 1.5, rows).round(2),
+        "Temperature": rng.normal(115, 15, rows).round(2),
+    }
+    for i in range(extra_columns):
+        data[f"Tag-{i}"] = rng.normal(0, 1, rows).round(3)
+    return pd.DataFrame(data).to_csv(index=False).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--types", type=int, default=100)
+    parser.add_argument("--extra-columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = make_csv(args.rows, args.types, args.extra_columns)
+    print(f"{args.rows:,} rows, {args.extra_columns} extra columns, "
+          f"{len(raw) / 1e6:.1f} MB, pyarrow={services.HAS_PYARROW}")
+
+    cases = {
+        "pd.read_csv (inferred)": lambda: pd.read_csv(io.BytesIO(raw)),
+        "read_csv (typed, pruned)": lambda: services.read_csv(io.BytesIO(raw)),
+    }
+    for label, fn in cases.items():
+        seconds = _setup.best_of(fn, args.repeat)
+        mb = fn().memory_usage(deep=True).sum() / 1e6
+        print(f"{label:<28} {seconds:>8.3f} s {mb:>10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
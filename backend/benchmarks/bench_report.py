@@ -0,0 +1,197 @@
+"""
+Benchmark: end-to-end generate_pdf_report latency.
+
+Compares the original sequential pyplot chart path with the object-oriented
+Figure renderer (inline, across the chart process pool and from the chart
+cache) and with vector charts drawn straight onto the PDF canvas, reporting
+latency and file size.
+
+    python benchmarks/bench_report.py --types 6 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import tempfile
+from types import SimpleNamespace
+
+import _setup  # noqa: F401
+import matplotlib.pyplot as plt
+from django.conf import settings
+
+from equipment import services
+
+
+# --- Original pyplot chart functions, kept for comparison -------------------
+
+def legacy_bar_chart(data: dict, title: str) -> io.BytesIO:
+    """Generate a bar chart and return as BytesIO."""
+    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    ax.set_facecolor('#0a0e1a')
+    
+    colors = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
+    labels = list(data.keys())
+    values = list(data.values())
+    
+    bars = ax.bar(labels, values, color=colors[:len(data)], width=0.6)
+    
+    ax.set_title(title, color='#f0f4f8', fontsize=12, fontweight='bold', pad=10)
+    ax.tick_params(colors='#94a3b8', labelsize=9)
+    ax.set_xticklabels(labels, rotation=30, ha='right')
+    ax.spines['bottom'].set_color('#334155')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#334155')
+    
+    # Add value labels
+    for bar, val in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
+               str(int(val)), ha='center', va='bottom', 
+               color='#f0f4f8', fontsize=9)
+    
+    plt.tight_layout()
+    
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+
+def legacy_pie_chart(data: dict, title: str) -> io.BytesIO:
+    """Generate a pie chart and return as BytesIO."""
+    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    ax.set_facecolor('#151d2f')
+    
+    colors = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
+    labels = list(data.keys())
+    values = list(data.values())
+    total = sum(values)
+    
+    wedges, texts, autotexts = ax.pie(
+        values, 
+        labels=None,
+        autopct='%1.1f%%',
+        colors=colors[:len(data)],
+        startangle=90,
+        textprops={'color': 'white', 'fontsize': 9}
+    )
+    
+    for autotext in autotexts:
+        autotext.set_fontweight('bold')
+    
+    # Add legend
+    legend_labels = [f'{label} ({val})' for label, val in zip(labels, values)]
+    ax.legend(wedges, legend_labels, loc='center left', bbox_to_anchor=(1.0, 0.5),
+              fontsize=8, frameon=False, labelcolor='#f0f4f8')
+    
+    ax.set_title(title, color='#f0f4f8', fontsize=12, fontweight='bold', pad=5)
+    
+    plt.tight_layout()
+    
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none', bbox_inches='tight')
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+
+def legacy_metrics_bar_chart(data: dict) -> io.BytesIO:
+    """Generate a grouped bar chart for average metrics."""
+    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    ax.set_facecolor('#0a0e1a')
+    
+    metrics = ['Flowrate', 'Pressure', 'Temperature']
+    values = [data['avg_flowrate'], data['avg_pressure'], data['avg_temperature']]
+    colors = ['#63caff', '#34d399', '#fb7185']
+    
+    bars = ax.bar(metrics, values, color=colors, width=0.5)
+    
+    ax.set_title('Average Parameters', color='#f0f4f8', fontsize=12, fontweight='bold', pad=10)
+    ax.tick_params(colors='#94a3b8', labelsize=9)
+    ax.spines['bottom'].set_color('#334155')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#334155')
+    
+    # Add value labels
+    for bar, val in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+               f'{val:.1f}', ha='center', va='bottom', 
+               color='#f0f4f8', fontsize=9)
+    
+    plt.tight_layout()
+    
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+
+def legacy_render_report_charts(type_dist, metrics_data):
+    return [
+        legacy_bar_chart(type_dist, "Equipment Type Distribution"),
+        legacy_pie_chart(type_dist, "Type Distribution"),
+        legacy_metrics_bar_chart(metrics_data),
+    ]
+
+
+def make_dataset(types: int):
+    dist = {f"Type-{i}": 10 + i for i in range(types)}
+    return SimpleNamespace(
+        id=0,
+        filename="bench.csv",
+        total_equipment=sum(dist.values()),
+        avg_flowrate=119.8,
+        avg_pressure=6.11,
+        avg_temperature=117.47,
+        type_distribution=dist,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--types", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.types)
+    out = os.path.join(tempfile.mkdtemp(), "report.pdf")
+    render = lambda: services.generate_pdf_report(dataset, out)  # noqa: E731
+    current = services.render_report_charts
+
+    timings = {}
+    sizes = {}
+
+    def measure(label):
+        timings[label] = _setup.best_of(render, args.repeat)
+        sizes[label] = os.path.getsize(out)
+
+    settings.REPORT_CHART_FORMAT = "png"
+    services.render_report_charts = legacy_render_report_charts
+    measure("PNG, pyplot sequential")
+    services.render_report_charts = services._render_report_charts
+
+    settings.CHART_RENDER_PROCESSES = 0
+    measure("PNG, Figure API inline")
+
+    settings.CHART_RENDER_PROCESSES = args.processes
+    render()  # start the pool outside the timed runs
+    measure(f"PNG, Figure API {args.processes} procs")
+
+    services.render_report_charts = current
+    render()  # warm the chart cache
+    measure("PNG, cached charts")
+
+    settings.REPORT_CHART_FORMAT = "vector"
+    measure("vector, reportlab canvas")
+
+    baseline = timings["PNG, pyplot sequential"]
+    for label, seconds in timings.items():
+        print(f"{label:<28} {seconds * 1000:>8.1f} ms {baseline / seconds:>6.2f}x "
+              f"{sizes[label] / 1024:>8.1f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: overhead of the opt-in extended statistics profile.
+
+Times the default summary alone, summary plus the exact profile (single
+in-memory frame) and summary plus the streaming sketch profile (chunked),
+over synthetic frames.
+
+    python benchmarks/bench_statistics.py --rows 100000 1000000 --types 100
+"""
+
+import argparse
+
+import _setup  # noqa: F401
+import numpy as np
+import pandas as pd
+
+from equipment.services import aggregate_by_type, merge_aggregates, summarize_aggregates, summarize_dataframe
+from equipment.statistics import ProfileSink
+
+
+def make_frame(rows: int, types: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Type-{i}" for i in range(types)])
+    return pd.DataFrame({
+        "Equipment Name": np.arange(rows).astype(str),
+        "Type": pd.Categorical(names[rng.integers(0, types, rows)]),
+        "Flowrate": rng.lognormal(4.7, 0.3, rows),
+        "Pressure": rng.normal(6, 1.5, rows),
+        "Temperature": rng.normal(115, 15, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[15, 100_000, 1_000_000])
+    parser.add_argument("--types", type=int, default=100)
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    def exact(df):
+        summarize_dataframe(df)
+        sink = ProfileSink()
+        sink.append(df)
+        sink.result()
+
+    def chunked(df):
+        sink = ProfileSink()
+        agg = None
+        for start in range(0, len(df), args.chunk_rows):
+            chunk = df.iloc[start:start + args.chunk_rows]
+            part = aggregate_by_type(chunk)
+            agg = part if agg is None else merge_aggregates(agg, part)
+            sink.append(chunk)
+            # Force the sketch path even when everything fits in one chunk
+            if len(df) <= args.chunk_rows:
+                sink.append(chunk.iloc[:0])
+        summarize_aggregates(agg)
+        sink.result()
+
+    print(f"{'rows':>12} {'summary':>10} {'+exact':>10} {'+sketch':>10}   (seconds, {args.types} types)")
+    for rows in args.rows:
+        df = make_frame(rows, min(args.types, rows))
+        base = _setup.best_of(lambda: summarize_dataframe(df), args.repeat)
+        with_exact = _setup.best_of(lambda: exact(df), args.repeat)
+        with_sketch = _setup.best_of(lambda: chunked(df), args.repeat)
+        print(f"{rows:>12,} {base:>10.4f} {with_exact:>10.4f} {with_sketch:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
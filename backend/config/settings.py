@@ -89,6 +89,110 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Most recent uploads kept per user; older datasets are pruned on upload
+DATASET_RETENTION_PER_USER = int(os.environ.get('DATASET_RETENTION_PER_USER', 5))
+
+# CSV analysis: uploads above CSV_STREAMING_THRESHOLD bytes are parsed in
+# chunks, each kept under CSV_CHUNK_MEMORY_LIMIT bytes once in memory
+CSV_STREAMING_THRESHOLD = int(os.environ.get('CSV_STREAMING_THRESHOLD', 50 * 1024 * 1024))
+CSV_CHUNK_MEMORY_LIMIT = int(os.environ.get('CSV_CHUNK_MEMORY_LIMIT', 64 * 1024 * 1024))
+# dtype used for Flowrate/Pressure/Temperature; float32 halves parse memory
+CSV_FLOAT_DTYPE = os.environ.get('CSV_FLOAT_DTYPE', 'float64')
+
+# Extended statistics profile (opt-in per upload): histogram bin count and
+# relative accuracy of the quantile sketch used for chunked uploads
+STATS_HISTOGRAM_BINS = int(os.environ.get('STATS_HISTOGRAM_BINS', 20))
+STATS_SKETCH_ACCURACY = float(os.environ.get('STATS_SKETCH_ACCURACY', 0.01))
+
+# Per-type anomaly detection on uploads, opt-in per request with
+# ?anomalies=mad (robust z-score) or ?anomalies=iqr; ANOMALY_METHOD is used
+# when a request names none ("none" skips detection)
+ANOMALY_METHOD = os.environ.get('ANOMALY_METHOD', 'none')
+ANOMALY_MAD_THRESHOLD = float(os.environ.get('ANOMALY_MAD_THRESHOLD', 3.5))
+ANOMALY_IQR_FACTOR = float(os.environ.get('ANOMALY_IQR_FACTOR', 1.5))
+ANOMALY_MAX_ROWS = int(os.environ.get('ANOMALY_MAX_ROWS', 500))
+
+# Batch uploads: files per request (a zip archive counts its CSV members),
+# uncompressed size allowed for an archive, and threads analyzing files
+BATCH_UPLOAD_MAX_FILES = int(os.environ.get('BATCH_UPLOAD_MAX_FILES', 100))
+BATCH_ARCHIVE_MAX_BYTES = int(os.environ.get('BATCH_ARCHIVE_MAX_BYTES', 1024 * 1024 * 1024))
+BATCH_ANALYSIS_WORKERS = int(os.environ.get('BATCH_ANALYSIS_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Uploads may send the CSV gzip-compressed (part Content-Type application/gzip);
+# it is inflated while streaming in, up to this many bytes
+UPLOAD_MAX_DECOMPRESSED_BYTES = int(os.environ.get('UPLOAD_MAX_DECOMPRESSED_BYTES', 1024 * 1024 * 1024))
+
+# Resumable chunked uploads (POST /api/uploads/): largest file accepted,
+# chunk size suggested to clients, largest chunk per PUT (after gzip
+# decoding), and how long an idle upload is kept before it is discarded
+CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_BYTES', 16 * 1024 * 1024 * 1024))
+CHUNKED_UPLOAD_CHUNK_BYTES = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024))
+CHUNKED_UPLOAD_MAX_CHUNK_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_CHUNK_BYTES', 64 * 1024 * 1024))
+CHUNKED_UPLOAD_TTL = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 60 * 60))
+
+# History listing: default and largest page size when ?page_size=/?cursor=
+# request cursor pagination
+HISTORY_PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE', 20))
+HISTORY_MAX_PAGE_SIZE = int(os.environ.get('HISTORY_MAX_PAGE_SIZE', 100))
+
+# Rendered history/summary responses cached per user, keyed by ETag
+RESPONSE_CACHE_MAX_USERS = int(os.environ.get('RESPONSE_CACHE_MAX_USERS', 1024))
+RESPONSE_CACHE_MAX_ENTRIES_PER_USER = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES_PER_USER', 16))
+
+# Most datasets (latest first) returned by one comparison/trend request
+COMPARE_MAX_DATASETS = int(os.environ.get('COMPARE_MAX_DATASETS', 100))
+
+# Raw REQUIRED_COLUMNS of each upload, stored as memory-mappable column files
+DATASET_STORE_DIR = Path(os.environ.get('DATASET_STORE_DIR', BASE_DIR / 'datastore'))
+
+# Caches of the equipment app (see equipment/cache.py). EQUIPMENT_CACHE_BACKEND
+# is "file" (entries under CACHE_DIR, shared by all workers on this host) or
+# "memory" (per-process LRU). Each cache is bounded by entries and bytes and
+# entries expire after their TTL in seconds (0 = never).
+EQUIPMENT_CACHE_BACKEND = os.environ.get('EQUIPMENT_CACHE_BACKEND', 'file')
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', BASE_DIR / 'cache'))
+# Upload summaries keyed by the SHA-256 of the file
+UPLOAD_CACHE_MAX_ENTRIES = int(os.environ.get('UPLOAD_CACHE_MAX_ENTRIES', 256))
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get('UPLOAD_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+UPLOAD_CACHE_TTL = int(os.environ.get('UPLOAD_CACHE_TTL', 24 * 60 * 60))
+# Rendered PDF reports, keyed by dataset
+REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 1000))
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 7 * 24 * 60 * 60))
+# Rasterized report charts (REPORT_CHART_FORMAT = "png"), keyed by chart data
+CHART_CACHE_MAX_ENTRIES = int(os.environ.get('CHART_CACHE_MAX_ENTRIES', 1000))
+CHART_CACHE_MAX_BYTES = int(os.environ.get('CHART_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+CHART_CACHE_TTL = int(os.environ.get('CHART_CACHE_TTL', 7 * 24 * 60 * 60))
+
+
+def _equipment_cache(name, max_entries, max_bytes, ttl):
+    backend = 'FileCache' if EQUIPMENT_CACHE_BACKEND == 'file' else 'MemoryCache'
+    return {
+        'BACKEND': f'equipment.cache.{backend}',
+        'LOCATION': str(CACHE_DIR / name) if backend == 'FileCache' else name,
+        'TIMEOUT': ttl or None,
+        'OPTIONS': {'MAX_ENTRIES': max_entries, 'MAX_BYTES': max_bytes},
+    }
+
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'summaries': _equipment_cache('summaries', UPLOAD_CACHE_MAX_ENTRIES, UPLOAD_CACHE_MAX_BYTES, UPLOAD_CACHE_TTL),
+    'reports': _equipment_cache('reports', REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_MAX_BYTES, REPORT_CACHE_TTL),
+    'charts': _equipment_cache('charts', CHART_CACHE_MAX_ENTRIES, CHART_CACHE_MAX_BYTES, CHART_CACHE_TTL),
+}
+
+# Reports render on a local thread pool; a download waits this long for a
+# pending render before answering 202 Accepted
+REPORT_RENDER_WORKERS = int(os.environ.get('REPORT_RENDER_WORKERS', 1))
+REPORT_INLINE_WAIT_SECONDS = float(os.environ.get('REPORT_INLINE_WAIT_SECONDS', 2))
+# "vector" draws report charts natively on the PDF canvas; "png" embeds
+# matplotlib rasters (150 dpi) as before
+REPORT_CHART_FORMAT = os.environ.get('REPORT_CHART_FORMAT', 'vector')
+# Processes used to rasterize the three report charts in parallel (0 = inline,
+# the default on single-core hosts where a pool only adds IPC overhead)
+CHART_RENDER_PROCESSES = int(os.environ.get('CHART_RENDER_PROCESSES', 3 if (os.cpu_count() or 1) > 1 else 0))
+
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "authorization",
 ]
@@ -2,6 +2,7 @@ from django.contrib import admin
 
 # Register your models here.
 from .models import Dataset
+from .retention import delete_datasets
 
 @admin.register(Dataset)
 class DatasetAdmin(admin.ModelAdmin):
@@ -11,4 +12,11 @@ class DatasetAdmin(admin.ModelAdmin):
         "uploaded_at",
         "total_equipment",
     )
-    ordering = ("-uploaded_at",)
\ No newline at end of file
+    ordering = ("-uploaded_at",)
+
+    # Go through retention's delete so stored files are removed too
+    def delete_model(self, request, obj):
+        delete_datasets(Dataset.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_datasets(queryset)
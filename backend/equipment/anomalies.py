@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .services import METRIC_COLUMNS
+
+ANOMALY_METHODS = ("mad", "iqr")
+
+# Ratio of the median absolute deviation to the standard deviation for
+# normal data, and of the mean absolute deviation to it
+MAD_TO_SIGMA = 0.6745
+MEAN_AD_TO_SIGMA = 0.7979
+
+
+def _scores_mad(values: pd.Series, groups: np.ndarray) -> np.ndarray:
+    """Robust z-score (Iglewicz-Hoaglin modified z) against each row's type."""
+    grouped = values.groupby(groups)
+    median = grouped.transform("median")
+    deviation = (values - median).abs()
+    mad = deviation.groupby(groups).transform("median")
+    # Types with more than half identical readings have MAD 0; estimate
+    # sigma from the mean absolute deviation for those
+    mean_ad = deviation.groupby(groups).transform("mean")
+    sigma = (mad / MAD_TO_SIGMA).where(mad > 0, mean_ad / MEAN_AD_TO_SIGMA)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (values - median) / sigma
+    return np.where(sigma > 0, z, 0.0)
+
+
+def _scores_iqr(values: pd.Series, groups: np.ndarray, factor: float) -> np.ndarray:
+    """Distance outside the type's Tukey fences, in IQRs (0 when inside)."""
+    grouped = values.groupby(groups)
+    q1 = grouped.transform("quantile", 0.25)
+    q3 = grouped.transform("quantile", 0.75)
+    iqr = q3 - q1
+    below = (q1 - factor * iqr) - values
+    above = values - (q3 + factor * iqr)
+    excess = np.where(below > 0, -below, np.where(above > 0, above, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = excess / iqr
+    # Degenerate IQR: any reading off the fence counts as one IQR out
+    return np.where(iqr > 0, scaled, np.sign(excess) * factor)
+
+
+def detect_anomalies(df: pd.DataFrame, name_of, method: str = "mad",
+                     threshold: float | None = None, limit: int | None = None) -> dict:
+    """
+    Flags readings that are out of envelope for their equipment Type.
+
+    `method` is "mad" (robust z-score against the type median, flagged when
+    |z| > threshold, default ANOMALY_MAD_THRESHOLD) or "iqr" (outside the
+    type's Tukey fences widened by ANOMALY_IQR_FACTOR). Every step is a
+    grouped transform or array operation, so cost is linear in rows. Rows
+    without a Type have no peer group and are never flagged.
+
+    `name_of(indices)` returns the Equipment Name of the given row
+    positions; it is only called for the rows returned, at most `limit`
+    (ANOMALY_MAX_ROWS) of them, most extreme first.
+    """
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Unknown anomaly method: {method}")
+    if threshold is None:
+        threshold = (settings.ANOMALY_MAD_THRESHOLD if method == "mad"
+                     else settings.ANOMALY_IQR_FACTOR)
+    limit = settings.ANOMALY_MAX_ROWS if limit is None else limit
+
+    codes, _ = pd.factorize(df["Type"])
+    typed = codes >= 0
+    scores = {}
+    for col in METRIC_COLUMNS:
+        values = pd.Series(df[col].to_numpy(dtype=float))
+        if method == "mad":
+            score = _scores_mad(values, codes)
+            flagged = np.abs(score) > threshold
+        else:
+            score = _scores_iqr(values, codes, threshold)
+            flagged = score != 0
+        flagged &= typed & ~np.isnan(values.to_numpy())
+        scores[col] = (values.to_numpy(), np.where(flagged, score, 0.0), flagged)
+
+    any_flag = np.logical_or.reduce([flagged for _, _, flagged in scores.values()])
+    severity = np.max([np.abs(score) for _, score, _ in scores.values()], axis=0)
+    rows = np.flatnonzero(any_flag)
+    if len(rows) > limit:
+        rows = rows[np.argpartition(-severity[rows], limit - 1)[:limit]]
+    rows = rows[np.argsort(-severity[rows], kind="stable")]
+
+    types = df["Type"].to_numpy()
+    names = name_of(rows) if len(rows) else []
+    flagged_rows = []
+    for row, name in zip(rows, names):
+        readings = {}
+        for col, (values, score, flagged) in scores.items():
+            if flagged[row]:
+                readings[col] = {
+                    "value": round(float(values[row]), 4),
+                    "score": round(float(score[row]), 2),
+                }
+        flagged_rows.append({
+            "row": int(row),
+            "equipment": name,
+            "type": str(types[row]),
+            "readings": readings,
+        })
+
+    return {
+        "method": method,
+        "threshold": threshold,
+        "total_flagged": int(any_flag.sum()),
+        "truncated": int(any_flag.sum()) > len(flagged_rows),
+        "rows": flagged_rows,
+    }
+
+
+class AnomalySink:
+    """
+    Analysis sink (see `analyze_csv`) that runs `detect_anomalies` once all
+    rows are in. Per-type medians and quartiles need every row, so no chunk
+    is kept: detection reads the memory-mapped columns staged by `writer`.
+    """
+
+    def __init__(self, writer, method: str = "mad"):
+        self.writer = writer
+        self.method = method
+
+    def append(self, df: pd.DataFrame):
+        pass
+
+    def result(self) -> dict:
+        return detect_anomalies(self.writer.load_frame(), self.writer.load_names, self.method)
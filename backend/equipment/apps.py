@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EquipmentConfig(AppConfig):
     name = 'equipment'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+
+from .cache import summary_cache
+from .datastore import ColumnWriter
+from .services import aggregate_csv, storable_aggregates, summarize_aggregates
+
+# Shared pool analyzing the files of batch uploads
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BATCH_ANALYSIS_WORKERS, thread_name_prefix="batch-analysis"
+)
+
+
+def is_archive(file) -> bool:
+    return file.name.lower().endswith(".zip")
+
+
+def expand_batch(files) -> list:
+    """
+    Flattens uploaded files into a list of (filename, file) pairs, replacing
+    each zip archive by its CSV members. Raises ValueError when the batch
+    exceeds BATCH_UPLOAD_MAX_FILES or an archive BATCH_ARCHIVE_MAX_BYTES.
+    """
+    entries = []
+    for upload in files:
+        if not is_archive(upload):
+            entries.append((upload.name, upload))
+            continue
+        try:
+            archive = zipfile.ZipFile(upload)
+        except zipfile.BadZipFile:
+            raise ValueError(f"{upload.name} is not a valid zip archive")
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".csv")
+            and not os.path.basename(info.filename).startswith(".")
+        ]
+        if sum(info.file_size for info in members) > settings.BATCH_ARCHIVE_MAX_BYTES:
+            raise ValueError(f"{upload.name} is too large once extracted")
+        for info in members:
+            member = File(archive.open(info), name=os.path.basename(info.filename))
+            member.size = info.file_size  # avoids decompressing just to measure
+            entries.append((member.name, member))
+
+    if len(entries) > settings.BATCH_UPLOAD_MAX_FILES:
+        raise ValueError(f"At most {settings.BATCH_UPLOAD_MAX_FILES} files per batch")
+    return entries
+
+
+def _hash_file(file) -> str:
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _analyze(filename, file, stored_hashes) -> dict:
+    """
+    Hashes and analyzes one file of a batch. Summaries of content whose
+    columns the user already stored (`stored_hashes`) come from the summary
+    cache; otherwise the raw columns are staged in a ColumnWriter returned
+    with the result. Never touches the database.
+    """
+    result = {"filename": filename, "writer": None}
+    try:
+        result["content_hash"] = _hash_file(file)
+        summary = None
+        if result["content_hash"] in stored_hashes:
+            summary = summary_cache.get(result["content_hash"])
+        if summary is None or "aggregates" not in summary:
+            writer = ColumnWriter()
+            try:
+                agg = aggregate_csv(file, sinks=[writer])
+            except BaseException:
+                writer.abort()
+                raise
+            summary = summarize_aggregates(agg)
+            summary["aggregates"] = storable_aggregates(agg)
+            summary_cache.set(result["content_hash"], summary)
+            result["writer"] = writer
+        result["summary"] = summary
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def analyze_batch(entries, stored_hashes=frozenset()) -> list[dict]:
+    """
+    Analyzes (filename, file) pairs concurrently on the batch worker pool;
+    `stored_hashes` are the content hashes of the uploading user's datasets.
+    Returns one result per entry, in order, with the filename, content_hash
+    and summary (including its "aggregates"), or an "error" message; a
+    "writer" holds the staged columns of freshly parsed files.
+    """
+    return list(_executor.map(lambda entry: _analyze(*entry, stored_hashes), entries))
@@ -0,0 +1,338 @@
+"""
+Cache backends for the equipment app, pluggable through Django's CACHES
+setting. Both evict least recently used entries once either MAX_ENTRIES or
+MAX_BYTES (pickled size) is exceeded, honour per-entry timeouts and delete
+single keys on demand. `stats()` reports the entries, bytes, hits and
+misses of a cache, the counts covering every thread of the process:
+
+- `MemoryCache`: an LRU in the memory of the current process.
+- `FileCache`: one file per entry under LOCATION, shared by every worker
+  process on the host. Writes are atomic renames, so readers in other
+  processes never see a partial entry.
+
+`summary_cache`, `report_cache` and `chart_cache` proxy the "summaries",
+"reports" and "charts" aliases configured in settings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.connection import ConnectionProxy
+
+summary_cache = ConnectionProxy(caches, "summaries")
+report_cache = ConnectionProxy(caches, "reports")
+chart_cache = ConnectionProxy(caches, "charts")
+
+
+# Hits and misses of every cache, by LOCATION; Django creates a cache
+# instance per thread, so the counts are kept here
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+class _BoundedCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._max_bytes = int(options.get("MAX_BYTES", 64 * 1024 * 1024))
+        with _counters_lock:
+            self._counters = _counters.setdefault(location, {"hits": 0, "misses": 0})
+
+    def _count(self, hit: bool):
+        with _counters_lock:
+            self._counters["hits" if hit else "misses"] += 1
+
+    def stats(self) -> dict:
+        entries, size = self._usage()
+        with _counters_lock:
+            return {"entries": entries, "bytes": size, **self._counters}
+
+    def _expiry(self, timeout) -> float:
+        # 0 means "no expiry" here; BaseCache maps a None timeout to None
+        expiry = self.get_backend_timeout(timeout)
+        return 0.0 if expiry is None else expiry
+
+    @staticmethod
+    def _expired(expiry: float) -> bool:
+        return expiry != 0.0 and expiry <= time.time()
+
+
+# Entries of every MemoryCache, by LOCATION, shared by all threads
+_memory_stores = {}
+_memory_locks = {}
+
+
+class MemoryCache(_BoundedCache):
+    """Per-process LRU cache bounded by entry count and pickled bytes."""
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self._entries = _memory_stores.setdefault(location, OrderedDict())
+        self._lock = _memory_locks.setdefault(location, threading.Lock())
+
+    def _size(self) -> int:
+        return sum(len(data) for data, _ in self._entries.values())
+
+    def _usage(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._size()
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._count(entry is not None)
+        if entry is None:
+            return default
+        return pickle.loads(entry[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(data) > self._max_bytes:
+                return
+            self._entries[key] = (data, self._expiry(timeout))
+            self._evict()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.has_key(key, version=version):
+            return False
+        self.set(key, value, timeout, version)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1]):
+                return False
+            self._entries[key] = (entry[0], self._expiry(timeout))
+            self._entries.move_to_end(key)
+            return True
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry[1])
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        total = self._size()
+        while self._entries and (
+            len(self._entries) > self._max_entries or total > self._max_bytes
+        ):
+            _, (data, _) = self._entries.popitem(last=False)
+            total -= len(data)
+
+
+# Running [entries, bytes] of every FileCache directory as seen by this
+# process, so a set only scans the directory once they go over a limit.
+# Other processes' writes are picked up by that scan, which resets them.
+_file_usage = {}
+
+
+class FileCache(_BoundedCache):
+    """
+    On-disk cache shared by the processes of one host. Each entry is a file
+    holding its expiry followed by the pickled value; file modification
+    times track recency for eviction.
+    """
+
+    suffix = ".entry"
+    _header = struct.Struct("<d")
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self._dir = os.path.abspath(location)
+
+    def _path(self, key) -> str:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self._dir, name + self.suffix)
+
+    def _read_expiry(self, path):
+        """The expiry stored at `path`, or None when there is no entry."""
+        try:
+            with open(path, "rb") as f:
+                (expiry,) = self._header.unpack(f.read(self._header.size))
+        except FileNotFoundError:
+            return None
+        return expiry
+
+    def _read(self, path):
+        """The (expiry, pickled value) stored at `path`, or None."""
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        (expiry,) = self._header.unpack_from(raw)
+        return expiry, raw[self._header.size:]
+
+    def _write(self, path, data: bytes, expiry: float):
+        os.makedirs(self._dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._header.pack(expiry))
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _remove(self, path) -> bool:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        self._track(-1, -size)
+        return True
+
+    def _track(self, entries: int, size: int):
+        with _counters_lock:
+            usage = _file_usage.get(self._dir)
+            if usage is not None:
+                usage[0] += entries
+                usage[1] += size
+
+    def _over_limit(self) -> bool:
+        """Whether the tracked usage (unknown until the first scan) is too big."""
+        with _counters_lock:
+            usage = _file_usage.get(self._dir)
+        return usage is None or usage[0] > self._max_entries or usage[1] > self._max_bytes
+
+    def get(self, key, default=None, version=None):
+        path = self._path(self.make_and_validate_key(key, version=version))
+        entry = self._read(path)
+        if entry is not None and self._expired(entry[0]):
+            self._remove(path)
+            entry = None
+        self._count(entry is not None)
+        if entry is None:
+            return default
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except FileNotFoundError:
+            pass
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        path = self._path(self.make_and_validate_key(key, version=version))
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) + self._header.size > self._max_bytes:
+            self._remove(path)
+            return
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = None
+        self._write(path, data, self._expiry(timeout))
+        self._track(
+            1 if replaced is None else 0, len(data) + self._header.size - (replaced or 0)
+        )
+        if self._over_limit():
+            self._evict(keep=path)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.has_key(key, version=version):
+            return False
+        self.set(key, value, timeout, version)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        path = self._path(self.make_and_validate_key(key, version=version))
+        entry = self._read(path)
+        if entry is None or self._expired(entry[0]):
+            return False
+        self._write(path, entry[1], self._expiry(timeout))
+        return True
+
+    def has_key(self, key, version=None):
+        path = self._path(self.make_and_validate_key(key, version=version))
+        expiry = self._read_expiry(path)
+        return expiry is not None and not self._expired(expiry)
+
+    def delete(self, key, version=None):
+        return self._remove(self._path(self.make_and_validate_key(key, version=version)))
+
+    def clear(self):
+        for path in self._list():
+            self._remove(path)
+        with _counters_lock:
+            _file_usage[self._dir] = [0, 0]
+
+    def _usage(self) -> tuple[int, int]:
+        sizes = []
+        for path in self._list():
+            try:
+                sizes.append(os.path.getsize(path))
+            except FileNotFoundError:
+                continue
+        return len(sizes), sum(sizes)
+
+    def _list(self) -> list[str]:
+        try:
+            return [
+                entry.path for entry in os.scandir(self._dir)
+                if entry.name.endswith(self.suffix)
+            ]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self, keep: str | None = None):
+        """
+        Drops least recently used entries until the cache fits MAX_ENTRIES
+        and MAX_BYTES; `keep` (the entry just written) is never evicted.
+        Expired entries are removed when read, or age out here. The
+        directory scan also resets the tracked usage.
+        """
+        entries = []
+        for path in self._list():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if count <= self._max_entries and total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
+        with _counters_lock:
+            _file_usage[self._dir] = [count, total]
@@ -0,0 +1,229 @@
+"""
+Resumable chunked uploads.
+
+A client announces a file (`start_session`), then PUTs it in chunks, each
+at an explicit byte offset with a SHA-256 checksum (`write_chunk`). Bytes
+land in a staging file under the dataset store, so a dropped connection
+only costs the chunk in flight: the client asks for the stored offset and
+carries on from there.
+
+Every accepted chunk is analyzed straight away (`analyze_received`): the
+complete CSV lines received so far are aggregated per type, merged into
+the session's running aggregates and appended to a column store staged
+with `ColumnWriter`. Finalizing therefore only has to parse the last line
+and hash the file before the dataset is saved.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import threading
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .datastore import ColumnWriter, store_root
+from .models import UploadSession
+from .services import (
+    aggregate_csv, load_aggregates, merge_aggregates, read_csv_options,
+    storable_aggregates,
+)
+
+# Bytes copied from the request per read
+READ_SIZE = 1024 * 1024
+
+# Running SHA-256 of each session's staged file, fed as chunks are written:
+# session id -> (bytes covered, hasher). hashlib state cannot be saved on
+# the session, so when another worker process took a chunk (or after a
+# restart) finalize falls back to hashing the staged file
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def session_dir(session) -> str:
+    return os.path.join(store_root(), f".upload-{session.id}")
+
+
+def data_path(session) -> str:
+    return os.path.join(session_dir(session), "data.csv")
+
+
+def columns_path(session) -> str:
+    return os.path.join(session_dir(session), "columns")
+
+
+def start_session(user, filename: str, size: int) -> UploadSession:
+    """Creates an upload session with an empty staging file and column store."""
+    if size < 0 or size > settings.CHUNKED_UPLOAD_MAX_BYTES:
+        raise ValueError(
+            f"File size must be between 0 and {settings.CHUNKED_UPLOAD_MAX_BYTES} bytes"
+        )
+    session = UploadSession.objects.create(user=user, filename=filename, size=size)
+    os.makedirs(session_dir(session))
+    open(data_path(session), "wb").close()
+    ColumnWriter(columns_path(session)).close()
+    return session
+
+
+def delete_session_dir(directory: str):
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def forget_session_hash(session_id):
+    with _hashers_lock:
+        _hashers.pop(session_id, None)
+
+
+def purge_expired_sessions():
+    """Discards uploads idle for longer than CHUNKED_UPLOAD_TTL."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_TTL)
+    # Queryset deletes still send post_delete, which removes the files
+    UploadSession.objects.filter(updated_at__lt=cutoff).delete()
+
+
+def parse_checksum(header: str) -> str:
+    """Hex digest from an `Upload-Checksum: sha256 <hex>` header."""
+    algorithm, _, digest = header.strip().partition(" ")
+    if algorithm.lower() != "sha256" or len(digest.strip()) != 64:
+        raise ValueError("Upload-Checksum must be 'sha256 <hex digest>'")
+    return digest.strip().lower()
+
+
+def write_chunk(session, offset: int, stream, length: int, checksum: str, gzipped: bool = False) -> int:
+    """
+    Stores `length` request bytes read from `stream` at `offset` of the
+    staging file, gunzipping them first when `gzipped`. Anything past the
+    chunk (left by an earlier attempt) is cut off. Raises ValueError, with
+    the staging file unchanged, when the decoded chunk does not match its
+    SHA-256 `checksum` or would overrun the announced size. Returns the
+    decoded chunk size; the caller records the new offset.
+    """
+    limit = min(settings.CHUNKED_UPLOAD_MAX_CHUNK_BYTES, session.size - offset)
+    inflater = zlib.decompressobj(wbits=31) if gzipped else None
+    hasher = hashlib.sha256()
+    written = 0
+
+    # Continue the file's running hash when this chunk directly follows the
+    # bytes it covers; a copy, so a rejected chunk leaves it untouched
+    with _hashers_lock:
+        covered, running = _hashers.get(session.id, (0, None))
+    if offset == 0:
+        running = hashlib.sha256()
+    elif covered != offset or running is None:
+        running = None
+    else:
+        running = running.copy()
+
+    with open(data_path(session), "r+b") as f:
+        f.seek(offset)
+        try:
+            remaining = length
+            while remaining > 0:
+                data = stream.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise ValueError("Chunk ended before Content-Length bytes")
+                remaining -= len(data)
+                if inflater:
+                    try:
+                        data = inflater.decompress(data)
+                    except zlib.error:
+                        raise ValueError("Chunk is not valid gzip data")
+                written += len(data)
+                if written > limit:
+                    raise ValueError("Chunk exceeds the announced file size or the chunk size limit")
+                hasher.update(data)
+                if running:
+                    running.update(data)
+                f.write(data)
+            if inflater and not inflater.eof:
+                raise ValueError("Compressed chunk is truncated")
+            if hasher.hexdigest() != checksum:
+                raise ValueError("Chunk checksum mismatch")
+        except ValueError:
+            f.truncate(offset)
+            raise
+        f.truncate(offset + written)
+    if running:
+        with _hashers_lock:
+            _hashers[session.id] = (offset + written, running)
+    return written
+
+
+def _complete_lines(buf: bytes) -> int:
+    """
+    Length of the longest prefix of `buf` made of whole CSV records: it
+    ends with a newline outside any quoted field.
+    """
+    end = len(buf)
+    while True:
+        newline = buf.rfind(b"\n", 0, end)
+        if newline < 0:
+            return 0
+        # An odd number of quotes before it means the newline is quoted
+        if buf.count(b'"', 0, newline) % 2 == 0:
+            return newline + 1
+        end = newline
+
+
+def analyze_received(session, final: bool = False):
+    """
+    Aggregates the complete CSV records stored since the last call (all
+    remaining bytes when `final`) and appends them to the staged columns.
+    Updates the session's header, parsed offset, rows and aggregates; the
+    caller saves it. Raises ValueError for an invalid CSV.
+    """
+    with open(data_path(session), "rb") as f:
+        f.seek(session.parsed)
+        buf = f.read(session.received - session.parsed)
+
+    if not session.header:
+        newline = buf.find(b"\n")
+        if newline < 0 and not final:
+            return
+        line = buf if newline < 0 else buf[:newline + 1]
+        header = line.decode("utf-8-sig")
+        read_csv_options(io.StringIO(header))  # fail fast on missing columns
+        session.header = header if header.endswith("\n") else header + "\n"
+        session.parsed += len(line)
+        buf = buf[len(line):]
+
+    size = len(buf) if final else _complete_lines(buf)
+    if not size:
+        return
+
+    writer = ColumnWriter.reopen(columns_path(session), session.rows)
+    try:
+        part = aggregate_csv(io.BytesIO(session.header.encode() + buf[:size]), sinks=[writer])
+    finally:
+        writer.close()
+
+    agg = merge_aggregates(load_aggregates(session.aggregates), part) if session.aggregates else part
+    session.aggregates = storable_aggregates(agg)
+    session.parsed += size
+    session.rows = writer.rows
+
+
+def content_hash(session) -> str:
+    """
+    SHA-256 of the whole uploaded file, the same as a one-shot upload's.
+    Taken from the running hash when it covers every received byte;
+    otherwise the staged file is read again.
+    """
+    with _hashers_lock:
+        covered, running = _hashers.pop(session.id, (0, None))
+    if running and covered == session.received:
+        return running.hexdigest()
+
+    hasher = hashlib.sha256()
+    with open(data_path(session), "rb") as f:
+        while data := f.read(READ_SIZE):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def open_columns(session) -> ColumnWriter:
+    """The session's staged columns, ready to commit under a dataset id."""
+    return ColumnWriter.reopen(columns_path(session), session.rows)
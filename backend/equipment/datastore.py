@@ -0,0 +1,328 @@
+"""
+Columnar store of the raw REQUIRED_COLUMNS of each uploaded dataset.
+
+Every dataset gets a directory under DATASET_STORE_DIR holding one flat,
+little-endian binary file per column plus a small meta.json:
+
+    Flowrate.bin, Pressure.bin, Temperature.bin   metric values (float dtype)
+    type_codes.bin                                int32 index into meta "types", -1 = missing
+    names.bin, name_offsets.bin                   UTF-8 equipment names + int64 offsets
+
+Files are appended chunk by chunk while the CSV is analyzed and read back
+with `np.memmap`, so analytics can work on them without copying.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .services import METRIC_COLUMNS
+
+STORE_VERSION = 1
+
+
+def store_root() -> str:
+    return str(settings.DATASET_STORE_DIR)
+
+
+def dataset_dir(dataset_id) -> str:
+    return os.path.join(store_root(), str(dataset_id))
+
+
+def has_columns(dataset_id) -> bool:
+    return os.path.exists(os.path.join(dataset_dir(dataset_id), "meta.json"))
+
+
+COLUMN_FILES = [*METRIC_COLUMNS, "type_codes", "names", "name_offsets"]
+
+# Rows copied per step by `ColumnWriter.append_staged`
+APPEND_STAGED_ROWS = 1 << 18
+
+
+class ColumnWriter:
+    """
+    Streams parsed CSV chunks into a private staging directory (`path`, a
+    fresh one under the store by default). `commit`
+    moves it into place under the dataset id once the row exists; `abort`
+    discards it. `close` sets the staging directory aside so a later
+    request can continue it with `reopen`; `extend` stages a copy of a
+    stored dataset's columns for appending.
+    """
+
+    def __init__(self, path: str | None = None):
+        os.makedirs(store_root(), exist_ok=True)
+        if path:
+            os.makedirs(path)
+            self.path = path
+        else:
+            self.path = tempfile.mkdtemp(dir=store_root(), prefix=".incoming-")
+        self.rows = 0
+        self.float_dtype = np.dtype(settings.CSV_FLOAT_DTYPE).newbyteorder("<")
+        self._types = {}
+        self._name_bytes = 0
+        self._files = {
+            name: open(os.path.join(self.path, f"{name}.bin"), "wb")
+            for name in COLUMN_FILES
+        }
+        self._files["name_offsets"].write(np.zeros(1, "<i8").tobytes())
+
+    @classmethod
+    def reopen(cls, path: str, rows: int) -> "ColumnWriter":
+        """
+        Continues appending to a staging directory left by `close`. Files
+        are cut back to the first `rows` rows, dropping whatever a request
+        that failed midway wrote after its last acknowledged chunk.
+        """
+        writer = cls.__new__(cls)
+        meta = _read_meta(path)
+        writer.path = path
+        writer.rows = rows
+        writer.float_dtype = np.dtype(meta["float_dtype"])
+        writer._types = {t: code for code, t in enumerate(meta["types"])}
+        with open(os.path.join(path, "name_offsets.bin"), "rb") as f:
+            f.seek(rows * 8)
+            (writer._name_bytes,) = np.frombuffer(f.read(8), "<i8").tolist()
+
+        sizes = {col: rows * writer.float_dtype.itemsize for col in METRIC_COLUMNS}
+        sizes.update(type_codes=rows * 4, names=writer._name_bytes, name_offsets=(rows + 1) * 8)
+        writer._files = {}
+        for name in COLUMN_FILES:
+            f = open(os.path.join(path, f"{name}.bin"), "r+b")
+            f.truncate(sizes[name])
+            f.seek(0, os.SEEK_END)
+            writer._files[name] = f
+        return writer
+
+    @classmethod
+    def extend(cls, dataset_id) -> "ColumnWriter":
+        """
+        Stages a copy of the stored columns of a dataset for appending
+        rows; `commit` then swaps it in. The live files are never written,
+        so readers and datasets sharing them (see `link_columns`) keep
+        seeing the old rows.
+        """
+        source = dataset_dir(dataset_id)
+        staging = tempfile.mkdtemp(dir=store_root(), prefix=".incoming-")
+        for name in os.listdir(source):
+            shutil.copy2(os.path.join(source, name), os.path.join(staging, name))
+        return cls.reopen(staging, _read_meta(staging)["rows"])
+
+    def append(self, df: pd.DataFrame):
+        for col in METRIC_COLUMNS:
+            values = df[col].to_numpy(dtype=self.float_dtype, na_value=np.nan)
+            self._files[col].write(values.tobytes())
+
+        # Map this chunk's categories onto the dataset-wide type codes
+        types = df["Type"].astype("category")
+        lookup = np.array(
+            [self._types.setdefault(t, len(self._types)) for t in types.cat.categories],
+            dtype="<i4",
+        )
+        codes = types.cat.codes.to_numpy()
+        global_codes = np.full(len(codes), -1, dtype="<i4")
+        present = codes >= 0
+        global_codes[present] = lookup[codes[present]]
+        self._files["type_codes"].write(global_codes.tobytes())
+
+        encoded = df["Equipment Name"].fillna("").astype(str).str.encode("utf-8")
+        lengths = encoded.str.len().to_numpy(dtype="<i8")
+        self._files["names"].write(b"".join(encoded))
+        offsets = self._name_bytes + np.cumsum(lengths, dtype="<i8")
+        self._files["name_offsets"].write(offsets.tobytes())
+        if len(offsets):
+            self._name_bytes = int(offsets[-1])
+
+        self.rows += len(df)
+
+    def append_staged(self, other: "ColumnWriter"):
+        """
+        Appends the rows staged by `other`, e.g. a slice parsed before its
+        dataset was locked, in bounded chunks of the memory-mapped files.
+        """
+        other.flush()
+        columns = _load_columns(other.path)
+        lookup = np.array(
+            [self._types.setdefault(t, len(self._types)) for t in columns["types"]],
+            dtype="<i4",
+        )
+        for start in range(0, other.rows, APPEND_STAGED_ROWS):
+            stop = min(start + APPEND_STAGED_ROWS, other.rows)
+            for col in METRIC_COLUMNS:
+                values = np.asarray(columns[col][start:stop], dtype=self.float_dtype)
+                self._files[col].write(values.tobytes())
+            codes = np.asarray(columns["type_codes"][start:stop])
+            global_codes = np.full(len(codes), -1, dtype="<i4")
+            present = codes >= 0
+            global_codes[present] = lookup[codes[present]]
+            self._files["type_codes"].write(global_codes.tobytes())
+
+        # Names are copied as is; their offsets move past this writer's names
+        offsets = _map(os.path.join(other.path, "name_offsets.bin"), "<i8", other.rows + 1)
+        for start in range(1, other.rows + 1, APPEND_STAGED_ROWS):
+            shifted = np.asarray(offsets[start:start + APPEND_STAGED_ROWS]) + self._name_bytes
+            self._files["name_offsets"].write(shifted.astype("<i8").tobytes())
+        with open(os.path.join(other.path, "names.bin"), "rb") as f:
+            shutil.copyfileobj(f, self._files["names"])
+        self._name_bytes += int(offsets[-1])
+        self.rows += other.rows
+
+    def flush(self):
+        """Makes everything appended so far readable from `self.path`."""
+        for f in self._files.values():
+            f.flush()
+        meta = {
+            "version": STORE_VERSION,
+            "rows": self.rows,
+            "float_dtype": self.float_dtype.str,
+            "types": [str(t) for t in self._types],
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    def load_frame(self) -> pd.DataFrame:
+        """The staged columns so far, memory-mapped like `load_frame`."""
+        self.flush()
+        return _load_frame(self.path)
+
+    def load_names(self, indices) -> list[str]:
+        self.flush()
+        return _load_names(self.path, indices)
+
+    def close(self):
+        """Flushes and closes the files, keeping the staged columns."""
+        self.flush()
+        self._close()
+
+    def _close(self):
+        for f in self._files.values():
+            f.close()
+
+    def commit(self, dataset_id):
+        self.flush()
+        self._close()
+        target = dataset_dir(dataset_id)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(self.path, target)
+
+    def abort(self):
+        self._close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def find_stored_columns(user, content_hash: str):
+    """
+    Id of `user`'s dataset with this content hash, if its columns are
+    stored. Columns are never shared between users, so one user's files
+    do not depend on another's uploads or retention.
+    """
+    from .models import Dataset
+
+    if not content_hash:
+        return None
+    dataset_id = Dataset.objects.filter(
+        user=user, content_hash=content_hash
+    ).values_list("id", flat=True).first()
+    return dataset_id if dataset_id is not None and has_columns(dataset_id) else None
+
+
+def link_columns(source_id, dataset_id):
+    """
+    Shares the stored columns of `source_id` with `dataset_id` (same user,
+    same upload content) via hard links, copying when the filesystem
+    cannot link.
+    """
+    source = dataset_dir(source_id)
+    staging = tempfile.mkdtemp(dir=store_root(), prefix=".incoming-")
+    for name in os.listdir(source):
+        try:
+            os.link(os.path.join(source, name), os.path.join(staging, name))
+        except OSError:
+            shutil.copy2(os.path.join(source, name), os.path.join(staging, name))
+    target = dataset_dir(dataset_id)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+
+def delete_columns(dataset_id):
+    shutil.rmtree(dataset_dir(dataset_id), ignore_errors=True)
+
+
+def read_meta(dataset_id) -> dict:
+    return _read_meta(dataset_dir(dataset_id))
+
+
+def load_columns(dataset_id) -> dict:
+    """
+    Memory-maps a dataset's stored columns read-only. Returns metric arrays
+    keyed by column name, "type_codes" and the "types" list they index.
+    """
+    return _load_columns(dataset_dir(dataset_id))
+
+
+def load_frame(dataset_id) -> pd.DataFrame:
+    """
+    Stored columns as a DataFrame with Type as a categorical. Metric
+    columns wrap the memory maps without copying; equipment names are not
+    included (see `load_names`).
+    """
+    return _load_frame(dataset_dir(dataset_id))
+
+
+def load_names(dataset_id, indices=None) -> list[str]:
+    """Decoded equipment names, for all rows or only the given row indices."""
+    return _load_names(dataset_dir(dataset_id), indices)
+
+
+def _read_meta(base: str) -> dict:
+    with open(os.path.join(base, "meta.json")) as f:
+        return json.load(f)
+
+
+def _map(path: str, dtype, length: int) -> np.ndarray:
+    # np.memmap refuses zero-length files
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+
+def _load_columns(base: str) -> dict:
+    meta = _read_meta(base)
+    rows = meta["rows"]
+    columns = {
+        col: _map(os.path.join(base, f"{col}.bin"), np.dtype(meta["float_dtype"]), rows)
+        for col in METRIC_COLUMNS
+    }
+    columns["type_codes"] = _map(os.path.join(base, "type_codes.bin"), "<i4", rows)
+    columns["types"] = meta["types"]
+    return columns
+
+
+def _load_frame(base: str) -> pd.DataFrame:
+    columns = _load_columns(base)
+    data = {
+        "Type": pd.Categorical.from_codes(columns["type_codes"], categories=columns["types"]),
+    }
+    data.update({col: columns[col] for col in METRIC_COLUMNS})
+    return pd.DataFrame(data, copy=False)
+
+
+def _load_names(base: str, indices=None) -> list[str]:
+    meta = _read_meta(base)
+    offsets = _map(os.path.join(base, "name_offsets.bin"), "<i8", meta["rows"] + 1)
+    names = []
+    with open(os.path.join(base, "names.bin"), "rb") as f:
+        if indices is None:
+            raw = f.read()
+            return [raw[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+        for i in indices:
+            start, end = int(offsets[i]), int(offsets[i + 1])
+            f.seek(start)
+            names.append(f.read(end - start).decode("utf-8"))
+    return names
@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Dataset
+
+# Bump when the serialized shape of history/summary responses changes
+RESPONSE_VERSION = 1
+
+
+class UserResponseCache:
+    """
+    Thread-safe cache of rendered response bodies, grouped per user and
+    keyed by ETag. At most `max_entries_per_user` bodies are kept for each
+    of the `max_users` most recently active users; `invalidate` drops
+    everything cached for one user.
+    """
+
+    def __init__(self, max_users: int, max_entries_per_user: int):
+        self.max_users = max_users
+        self.max_entries_per_user = max_entries_per_user
+        self._users = OrderedDict()  # user id -> OrderedDict(etag -> data)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, etag: str):
+        with self._lock:
+            entries = self._users.get(user_id)
+            if entries is None or etag not in entries:
+                return None
+            self._users.move_to_end(user_id)
+            entries.move_to_end(etag)
+            return entries[etag]
+
+    def set(self, user_id, etag: str, data):
+        with self._lock:
+            entries = self._users.setdefault(user_id, OrderedDict())
+            self._users.move_to_end(user_id)
+            entries[etag] = data
+            entries.move_to_end(etag)
+            while len(entries) > self.max_entries_per_user:
+                entries.popitem(last=False)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+response_cache = UserResponseCache(
+    max_users=settings.RESPONSE_CACHE_MAX_USERS,
+    max_entries_per_user=settings.RESPONSE_CACHE_MAX_ENTRIES_PER_USER,
+)
+
+
+def _etag(prefix: str, *parts) -> str:
+    digest = hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+    return f'"{prefix}-{digest[:32]}"'
+
+
+def _request_variant(request) -> tuple:
+    # Query parameters select fields and pages; the host appears in links
+    return request.get_host(), sorted(request.query_params.lists())
+
+
+def history_etag(request) -> str:
+    """
+    Strong ETag for a user's history listing, from one aggregate query.
+    Uploads raise the highest id, deletes lower the count and appends move
+    the latest updated_at, so any change to the listing changes the tag.
+    """
+    state = Dataset.objects.filter(user=request.user).aggregate(
+        count=Count("id"), last_id=Max("id"), updated_at=Max("updated_at"),
+    )
+    return _etag(
+        f"history-{request.user.id}", RESPONSE_VERSION,
+        state["count"], state["last_id"], state["updated_at"],
+        settings.DATASET_RETENTION_PER_USER, *_request_variant(request),
+    )
+
+
+def dataset_etag(dataset, request) -> str:
+    """Strong ETag for one dataset's summary; appends bump updated_at."""
+    return _etag(
+        f"dataset-{dataset.id}", RESPONSE_VERSION,
+        dataset.content_hash, dataset.updated_at.isoformat(), *_request_variant(request),
+    )
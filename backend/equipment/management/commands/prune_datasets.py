@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from equipment.retention import prune_all_datasets, retention_limit
+
+
+class Command(BaseCommand):
+    help = "Deletes datasets beyond the per-user retention limit for all users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=None,
+            help="Datasets to keep per user (default: DATASET_RETENTION_PER_USER).",
+        )
+
+    def handle(self, *args, keep=None, **options):
+        keep = retention_limit() if keep is None else keep
+        if keep < 0:
+            raise CommandError("--keep must not be negative")
+
+        with transaction.atomic():
+            deleted = prune_all_datasets(keep)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} dataset(s), keeping {keep} per user")
+        )
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_dataset_user_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='type_metrics',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
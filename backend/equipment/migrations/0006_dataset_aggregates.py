@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing datasets have not changed since upload
+    Dataset = apps.get_model('equipment', 'Dataset')
+    Dataset.objects.update(updated_at=F('uploaded_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_dataset_type_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='dataset',
+            name='aggregates',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
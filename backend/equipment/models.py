@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -6,7 +8,11 @@ from django.contrib.auth.models import User
 class Dataset(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='datasets')
     filename = models.CharField(max_length=255)
+    # SHA-256 of the uploaded bytes, used to detect re-uploads of the same file
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Bumped whenever rows are appended to the dataset
+    updated_at = models.DateTimeField(auto_now=True)
 
     total_equipment = models.IntegerField()
     avg_flowrate = models.FloatField()
@@ -15,10 +21,39 @@ class Dataset(models.Model):
 
     # store type distribution as JSON
     type_distribution = models.JSONField()
+    # per-type count and averages, same shape as the upload summary's type_metrics
+    type_metrics = models.JSONField(default=dict, blank=True)
+    # per-type running count/sum/sum-of-squares, merged into by appends
+    aggregates = models.JSONField(default=list, blank=True)
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Serves per-user history and retention scans in index order
+            models.Index(fields=['user', '-uploaded_at', '-id'], name='dataset_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.filename} ({self.uploaded_at})"
 
+
+class UploadSession(models.Model):
+    """A resumable chunked upload in progress (see equipment/chunked.py)."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    # Total bytes announced by the client and bytes stored so far
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    # Bytes of complete CSV lines analyzed so far and the rows they held
+    parsed = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    header = models.TextField(blank=True, default="")
+    # per-type running count/sum/sum-of-squares of the analyzed rows
+    aggregates = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
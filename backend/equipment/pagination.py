@@ -0,0 +1,80 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class DatasetCursorPagination(BasePagination):
+    """
+    Keyset pagination over datasets, newest first.
+
+    The cursor encodes the (uploaded_at, id) of the last row served, and the
+    next page is fetched with a range condition on that pair, which the
+    (user, uploaded_at, id) index answers without scanning earlier pages.
+    Unlike offset pagination, cost does not grow with the page number and
+    rows inserted meanwhile never shift a page.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request) -> int:
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return settings.HISTORY_PAGE_SIZE
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValidationError({"error": f"Invalid page_size: {value}"})
+        return max(1, min(page_size, settings.HISTORY_MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            uploaded_at, dataset_id = base64.urlsafe_b64decode(encoded).decode().rsplit("|", 1)
+            position = parse_datetime(uploaded_at), int(dataset_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            position = (None, None)
+        if position[0] is None:
+            raise ValidationError({"error": "Invalid cursor"})
+        return position
+
+    def encode_cursor(self, dataset) -> str:
+        raw = f"{dataset.uploaded_at.isoformat()}|{dataset.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by("-uploaded_at", "-id")
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            uploaded_at, dataset_id = position
+            queryset = queryset.filter(
+                Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=dataset_id)
+            )
+
+        # One extra row tells whether another page follows
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .cache import report_cache
+from .services import generate_pdf_report
+
+# Bump when the report layout changes so cached PDFs are re-rendered
+REPORT_VERSION = 2
+
+# Striped render locks, so concurrent renders of a dataset run once; a
+# fixed table keeps memory flat however many datasets get rendered
+RENDER_LOCK_STRIPES = 64
+_render_locks = [threading.Lock() for _ in range(RENDER_LOCK_STRIPES)]
+
+# Background render queue: dataset id -> Future of the pending render
+_executor = ThreadPoolExecutor(
+    max_workers=settings.REPORT_RENDER_WORKERS, thread_name_prefix="report-render"
+)
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def report_etag(dataset) -> str:
+    """
+    Strong ETag for a dataset's report. Appends give a dataset a new
+    content hash, so id, content and layout version fully determine the PDF.
+    """
+    content = dataset.content_hash or str(int(dataset.uploaded_at.timestamp()))
+    return (
+        f'"report-{dataset.id}-{content[:16]}'
+        f'-v{REPORT_VERSION}-{settings.REPORT_CHART_FORMAT}"'
+    )
+
+
+def _cache_key(dataset) -> str:
+    # The ETag changes with content and layout, so stale versions are never
+    # looked up again and age out of the cache
+    return "report:" + report_etag(dataset).strip('"')
+
+
+def is_report_ready(dataset) -> bool:
+    """Whether an up-to-date rendered report is already cached."""
+    return report_cache.has_key(_cache_key(dataset))
+
+
+def cached_report(dataset) -> bytes | None:
+    """The cached up-to-date PDF report of `dataset`, or None."""
+    return report_cache.get(_cache_key(dataset))
+
+
+def get_report(dataset) -> bytes:
+    """
+    Returns the PDF report of `dataset`, rendering it only when no
+    up-to-date copy is in the report cache.
+    """
+    pdf = report_cache.get(_cache_key(dataset))
+    if pdf is not None:
+        return pdf
+
+    with _render_locks[dataset.id % RENDER_LOCK_STRIPES]:
+        pdf = report_cache.get(_cache_key(dataset))
+        if pdf is not None:
+            return pdf
+        pdf = _render(dataset)
+        # Rows appended mid-render: render the current version instead
+        while _refresh(dataset):
+            pdf = _render(dataset)
+        report_cache.set(_cache_key(dataset), pdf)
+    return pdf
+
+
+def _render(dataset) -> bytes:
+    buffer = io.BytesIO()
+    generate_pdf_report(dataset, buffer)
+    return buffer.getvalue()
+
+
+def _refresh(dataset) -> bool:
+    """Reloads `dataset` if it was updated in the database; True if it was."""
+    updated_at = type(dataset).objects.filter(pk=dataset.pk).values_list(
+        "updated_at", flat=True
+    ).first()
+    if updated_at is None or updated_at == dataset.updated_at:
+        return False
+    dataset.refresh_from_db()
+    return True
+
+
+def delete_report(dataset):
+    """Removes the cached report of a dataset, if any."""
+    report_cache.delete(_cache_key(dataset))
+
+
+def _render_job(dataset) -> bytes | None:
+    # Workers query the database (see `_refresh`); drop their connection
+    # around each job like Django does around requests, so idle workers
+    # do not hold one open
+    close_old_connections()
+    try:
+        # Deleted before its turn, e.g. pruned by a later file of its batch
+        if not type(dataset).objects.filter(pk=dataset.pk).exists():
+            return None
+        return get_report(dataset)
+    finally:
+        close_old_connections()
+
+
+def schedule_report(dataset):
+    """
+    Queues a background render of `dataset`'s report and returns its Future,
+    whose result is None if the dataset is gone by the time it runs.
+    Repeated calls while a render is pending share the same job.
+    """
+    with _jobs_lock:
+        job = _jobs.get(dataset.id)
+        if job is not None and not (job.done() and job.exception() is not None):
+            return job
+        job = _executor.submit(_render_job, dataset)
+        _jobs[dataset.id] = job
+
+    def _forget(done, dataset_id=dataset.id):
+        # Keep failed jobs around so report_status can surface the error
+        if done.exception() is None:
+            with _jobs_lock:
+                if _jobs.get(dataset_id) is done:
+                    del _jobs[dataset_id]
+
+    job.add_done_callback(_forget)
+    return job
+
+
+def report_status(dataset) -> str:
+    """One of "ready", "rendering", "failed" or "missing"."""
+    with _jobs_lock:
+        job = _jobs.get(dataset.id)
+    if job is not None and not job.done():
+        return "rendering"
+    if is_report_ready(dataset):
+        return "ready"
+    if job is not None and job.exception() is not None:
+        return "failed"
+    return "missing"
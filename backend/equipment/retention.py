@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .datastore import delete_columns
+from .http_cache import response_cache
+from .models import Dataset
+from .reports import delete_report
+
+
+def retention_limit() -> int:
+    """Number of datasets kept per user (DATASET_RETENTION_PER_USER)."""
+    return settings.DATASET_RETENTION_PER_USER
+
+
+def prune_user_datasets(user, keep: int | None = None) -> int:
+    """
+    Deletes all but the `keep` most recent datasets of `user` with a
+    set-based DELETE (see `delete_datasets`) and returns how many were
+    removed. Call it inside the transaction that inserted the new dataset.
+    """
+    keep = retention_limit() if keep is None else keep
+    stale = (
+        Dataset.objects.filter(user=user)
+        .order_by("-uploaded_at", "-id")
+        .values("id")[keep:]
+    )
+    return delete_datasets(Dataset.objects.filter(id__in=stale))
+
+
+def prune_all_datasets(keep: int | None = None) -> int:
+    """
+    Applies the retention limit to every user at once: datasets are ranked
+    per user with a window function and everything past `keep` is deleted.
+    """
+    keep = retention_limit() if keep is None else keep
+    ranked = Dataset.objects.annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F("user_id")],
+            order_by=[F("uploaded_at").desc(), F("id").desc()],
+        )
+    )
+    stale = ranked.filter(rank__gt=keep).values("id")
+    return delete_datasets(Dataset.objects.filter(id__in=stale))
+
+
+def delete_datasets(datasets) -> int:
+    """
+    Deletes the datasets of a queryset with one DELETE statement and returns
+    how many rows went. Dataset has no delete signal receivers and nothing
+    references it, so Django deletes without loading the rows. Cached
+    reports and stored columns are removed once the surrounding transaction
+    commits, so a rollback keeps them.
+    """
+    # Only what the file cleanup needs (report cache keys, column dirs)
+    stale = list(datasets.values_list(
+        "id", "user_id", "content_hash", "uploaded_at", named=True
+    ))
+    deleted, _ = datasets.delete()
+
+    for user_id in {dataset.user_id for dataset in stale}:
+        response_cache.invalidate(user_id)
+    transaction.on_commit(lambda: remove_dataset_files(stale), robust=True)
+    return deleted
+
+
+def remove_dataset_files(datasets):
+    """
+    Drops the cached PDF reports and stored columns of deleted datasets,
+    given as rows with id, content_hash and uploaded_at.
+    """
+    for dataset in datasets:
+        delete_report(dataset)
+        delete_columns(dataset.id)
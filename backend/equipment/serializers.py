@@ -2,15 +2,28 @@ from rest_framework import serializers
 from .models import Dataset
 
 class DatasetSerializer(serializers.ModelSerializer):
+    """
+    Takes an optional `fields` argument to serialize only a subset of the
+    fields below, e.g. to leave out the JSON columns in listings.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Dataset
         fields = [
             "id",
             "filename",
             "uploaded_at",
+            "updated_at",
             "total_equipment",
             "avg_flowrate",
             "avg_pressure",
             "avg_temperature",
             "type_distribution",
+            "type_metrics",
         ]
@@ -1,7 +1,10 @@
+from __future__ import annotations
+
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for PDF generation
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
 import numpy as np
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
@@ -11,6 +14,20 @@ from reportlab.lib.utils import ImageReader
 from django.conf import settings
 import os
 import io
+import json
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .cache import chart_cache
+
+try:
+    import pyarrow  # noqa: F401 - optional, enables the faster CSV parser
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 REQUIRED_COLUMNS = {
     "Equipment Name",
@@ -20,40 +37,226 @@ REQUIRED_COLUMNS = {
     "Temperature",
 }
 
-def analyze_csv(file):
+# Numeric columns averaged in the summary, mapped to their summary keys
+METRIC_COLUMNS = {
+    "Flowrate": "avg_flowrate",
+    "Pressure": "avg_pressure",
+    "Temperature": "avg_temperature",
+}
+
+
+def csv_dtypes() -> dict:
     """
-    Reads CSV and returns comprehensive summary statistics.
+    Parse-time dtypes for REQUIRED_COLUMNS. Type is read as a categorical and
+    the metric columns use the CSV_FLOAT_DTYPE setting (float32 or float64).
     """
-    df = pd.read_csv(file)
+    dtypes = {"Equipment Name": "string", "Type": "category"}
+    dtypes.update({col: settings.CSV_FLOAT_DTYPE for col in METRIC_COLUMNS})
+    return dtypes
 
-    missing_cols = REQUIRED_COLUMNS - set(df.columns)
+
+def read_csv_options(file) -> dict:
+    """
+    Peeks at the CSV header and returns `pd.read_csv` keyword arguments that
+    only materialize REQUIRED_COLUMNS with their configured dtypes. Raises
+    ValueError when a required column is missing. The file is rewound so
+    it can be parsed again from the start.
+    """
+    header = pd.read_csv(file, nrows=0).columns
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    missing_cols = REQUIRED_COLUMNS - set(header)
     if missing_cols:
         raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
 
-    # Calculate per-type metrics
+    return {
+        "usecols": [col for col in header if col in REQUIRED_COLUMNS],
+        "dtype": csv_dtypes(),
+    }
+
+
+def read_csv(file) -> pd.DataFrame:
+    """
+    Parses an uploaded CSV into a typed, column-pruned frame, using the
+    pyarrow engine when it is installed.
+    """
+    options = read_csv_options(file)
+    if HAS_PYARROW:
+        options["engine"] = "pyarrow"
+    try:
+        return pd.read_csv(file, **options)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Could not parse CSV: {e}") from e
+
+
+def aggregate_by_type(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes per-type partial aggregates in a single groupby pass.
+
+    Returns a frame indexed by Type with the row count plus the sum,
+    non-null count and sum of squares of each metric column. Rows with a
+    missing Type are kept under a NaN key so global totals still include
+    them. Partials are additive and can be combined with `merge_aggregates`.
+    """
+    metrics = list(METRIC_COLUMNS)
+    for col in metrics:
+        if not df.empty and not pd.api.types.is_numeric_dtype(df[col]):
+            raise ValueError(f"Column {col} must be numeric")
+
+    values = df[metrics].astype("float64")
+    squares = values.pow(2).add_suffix("_sumsq")
+    grouped = pd.concat([values, squares], axis=1).groupby(
+        df["Type"], sort=False, dropna=False, observed=True
+    )
+    agg = grouped[metrics].agg(["sum", "count"])
+    agg.columns = [f"{col}_{stat}" for col, stat in agg.columns]
+    agg = agg.join(grouped[list(squares.columns)].sum())
+    agg.insert(0, "rows", grouped.size())
+    return agg
+
+
+def merge_aggregates(*parts: pd.DataFrame) -> pd.DataFrame:
+    """Combines partial aggregates produced by `aggregate_by_type`."""
+    return pd.concat(parts).groupby(level=0, sort=False, dropna=False).sum()
+
+
+def _mean(total, count):
+    return round(float(total) / float(count), 2) if count else float("nan")
+
+
+def summarize_aggregates(agg: pd.DataFrame) -> dict:
+    """
+    Builds the upload summary from per-type aggregates. Global averages are
+    derived from the per-type sums, so no second pass over rows is needed.
+    """
+    totals = agg.sum()
+    summary = {"total_equipment": int(totals["rows"])}
+    for col, key in METRIC_COLUMNS.items():
+        summary[key] = _mean(totals[f"{col}_sum"], totals[f"{col}_count"])
+
+    # Per-type figures ignore rows without a Type, like value_counts() does
+    typed = agg[agg.index.notna()]
     type_metrics = {}
-    for eq_type in df["Type"].unique():
-        type_df = df[df["Type"] == eq_type]
-        type_metrics[eq_type] = {
-            "count": len(type_df),
-            "avg_flowrate": round(type_df["Flowrate"].mean(), 2),
-            "avg_pressure": round(type_df["Pressure"].mean(), 2),
-            "avg_temperature": round(type_df["Temperature"].mean(), 2),
-        }
+    for eq_type, row in typed.iterrows():
+        metrics = {"count": int(row["rows"])}
+        for col, key in METRIC_COLUMNS.items():
+            metrics[key] = _mean(row[f"{col}_sum"], row[f"{col}_count"])
+        type_metrics[eq_type] = metrics
+
+    distribution = typed["rows"].sort_values(ascending=False, kind="stable")
+    summary["type_distribution"] = {k: int(v) for k, v in distribution.items()}
+    summary["type_metrics"] = type_metrics
+    return summary
 
+
+def storable_type_metrics(type_metrics: dict) -> dict:
+    """
+    JSON-safe copy of a summary's type_metrics for persisting on a Dataset:
+    keys become strings and NaN averages (no readings) become None.
+    """
     return {
-        "total_equipment": len(df),
-        "avg_flowrate": round(df["Flowrate"].mean(), 2),
-        "avg_pressure": round(df["Pressure"].mean(), 2),
-        "avg_temperature": round(df["Temperature"].mean(), 2),
-        "type_distribution": df["Type"].value_counts().to_dict(),
-        "type_metrics": type_metrics,
+        str(eq_type): {
+            key: (None if isinstance(value, float) and value != value else value)
+            for key, value in metrics.items()
+        }
+        for eq_type, metrics in type_metrics.items()
     }
 
 
+def storable_aggregates(agg: pd.DataFrame) -> list[dict]:
+    """
+    JSON-safe records of `aggregate_by_type` partials for persisting on a
+    Dataset, one per type; rows without a Type are stored under None.
+    """
+    return [
+        {"type": None if pd.isna(eq_type) else str(eq_type), **row}
+        for eq_type, row in zip(agg.index, agg.to_dict("records"))
+    ]
+
+
+def load_aggregates(records: list[dict]) -> pd.DataFrame:
+    """Rebuilds the partial aggregates persisted by `storable_aggregates`."""
+    if not records:
+        return aggregate_by_type(pd.DataFrame(columns=["Type", *METRIC_COLUMNS]))
+    return pd.DataFrame.from_records(records, index="type").rename_axis("Type")
+
+
+def summarize_dataframe(df: pd.DataFrame) -> dict:
+    """Validates columns and returns the summary for an in-memory frame."""
+    missing_cols = REQUIRED_COLUMNS - set(df.columns)
+    if missing_cols:
+        raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
+
+    return summarize_aggregates(aggregate_by_type(df))
+
+
+def analyze_csv(file, sinks=()):
+    """
+    Reads CSV and returns comprehensive summary statistics.
+    Uploads larger than CSV_STREAMING_THRESHOLD bytes are analyzed in chunks.
+    Parsed rows are also passed to `append` of each of `sinks`, as one
+    frame or chunk by chunk.
+    """
+    return summarize_aggregates(aggregate_csv(file, sinks=sinks))
+
+
+def aggregate_csv(file, sinks=()) -> pd.DataFrame:
+    """Like `analyze_csv`, but returns the per-type partial aggregates."""
+    size = getattr(file, "size", None)
+    if size is not None and size > settings.CSV_STREAMING_THRESHOLD:
+        return aggregate_csv_stream(file, sinks=sinks)
+
+    df = read_csv(file)
+    agg = aggregate_by_type(df)
+    for sink in sinks:
+        sink.append(df)
+    return agg
+
+
+# Rows parsed up front to estimate the per-row memory footprint
+STREAM_PROBE_ROWS = 10_000
+
+
+def aggregate_csv_stream(file, memory_limit: int | None = None, sinks=()) -> pd.DataFrame:
+    """
+    Streaming variant of `aggregate_csv` for uploads larger than RAM.
+
+    The CSV is parsed in chunks whose in-memory size stays under
+    `memory_limit` bytes (CSV_CHUNK_MEMORY_LIMIT by default). Chunk length
+    is re-derived from the measured bytes per row after every chunk, and
+    only the per-type partial aggregates are kept between chunks, so the
+    result matches `aggregate_csv` on the whole file.
+    """
+    memory_limit = memory_limit or settings.CSV_CHUNK_MEMORY_LIMIT
+    chunk_rows = STREAM_PROBE_ROWS
+    agg = None
+
+    options = read_csv_options(file)
+    with pd.read_csv(file, chunksize=chunk_rows, **options) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(chunk_rows)
+            except StopIteration:
+                break
+
+            part = aggregate_by_type(chunk)
+            agg = part if agg is None else merge_aggregates(agg, part)
+            for sink in sinks:
+                sink.append(chunk)
+
+            if len(chunk):
+                row_bytes = chunk.memory_usage(deep=True).sum() / len(chunk)
+                chunk_rows = max(1, int(memory_limit // row_bytes))
+            del chunk
+
+    return agg
+
+
 def create_bar_chart(data: dict, title: str) -> io.BytesIO:
     """Generate a bar chart and return as BytesIO."""
-    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    fig = Figure(figsize=(5, 3), facecolor='#151d2f')
+    ax = fig.add_subplot()
     ax.set_facecolor('#0a0e1a')
     
     colors = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
@@ -64,7 +267,7 @@ def create_bar_chart(data: dict, title: str) -> io.BytesIO:
     
     ax.set_title(title, color='#f0f4f8', fontsize=12, fontweight='bold', pad=10)
     ax.tick_params(colors='#94a3b8', labelsize=9)
-    ax.set_xticklabels(labels, rotation=30, ha='right')
+    ax.set_xticks(range(len(labels)), labels, rotation=30, ha='right')
     ax.spines['bottom'].set_color('#334155')
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
@@ -76,18 +279,18 @@ def create_bar_chart(data: dict, title: str) -> io.BytesIO:
                str(int(val)), ha='center', va='bottom', 
                color='#f0f4f8', fontsize=9)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
-    plt.close(fig)
+    fig.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
     buf.seek(0)
     return buf
 
 
 def create_pie_chart(data: dict, title: str) -> io.BytesIO:
     """Generate a pie chart and return as BytesIO."""
-    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    fig = Figure(figsize=(5, 3), facecolor='#151d2f')
+    ax = fig.add_subplot()
     ax.set_facecolor('#151d2f')
     
     colors = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
@@ -114,18 +317,18 @@ def create_pie_chart(data: dict, title: str) -> io.BytesIO:
     
     ax.set_title(title, color='#f0f4f8', fontsize=12, fontweight='bold', pad=5)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none', bbox_inches='tight')
-    plt.close(fig)
+    fig.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none', bbox_inches='tight')
     buf.seek(0)
     return buf
 
 
 def create_metrics_bar_chart(data: dict) -> io.BytesIO:
     """Generate a grouped bar chart for average metrics."""
-    fig, ax = plt.subplots(figsize=(5, 3), facecolor='#151d2f')
+    fig = Figure(figsize=(5, 3), facecolor='#151d2f')
+    ax = fig.add_subplot()
     ax.set_facecolor('#0a0e1a')
     
     metrics = ['Flowrate', 'Pressure', 'Temperature']
@@ -147,23 +350,233 @@ def create_metrics_bar_chart(data: dict) -> io.BytesIO:
                f'{val:.1f}', ha='center', va='bottom', 
                color='#f0f4f8', fontsize=9)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
-    plt.close(fig)
+    fig.savefig(buf, format='png', dpi=150, facecolor='#151d2f', edgecolor='none')
     buf.seek(0)
     return buf
 
 
-def generate_pdf_report(dataset):
+_chart_pool = None
+_chart_pool_lock = threading.Lock()
+
+
+def _get_chart_pool():
     """
-    Generates a professionally designed PDF report with charts.
+    Lazily starts the process pool used to rasterize report charts, or
+    returns None when CHART_RENDER_PROCESSES is 0 (render in-process).
+    Workers are spawned rather than forked since the server is threaded.
     """
-    reports_dir = os.path.join(settings.BASE_DIR, "reports")
-    os.makedirs(reports_dir, exist_ok=True)
+    global _chart_pool
+    if settings.CHART_RENDER_PROCESSES <= 0:
+        return None
+    with _chart_pool_lock:
+        if _chart_pool is None:
+            _chart_pool = ProcessPoolExecutor(
+                max_workers=settings.CHART_RENDER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _chart_pool
+
+
+# Bump when the look of the rasterized charts changes
+CHART_VERSION = 1
+
+
+def render_report_charts(type_dist: dict, metrics_data: dict) -> list[io.BytesIO]:
+    """
+    Returns the bar, pie and metrics chart PNGs of a report. Charts are
+    cached by their input data; misses are rendered in parallel across the
+    chart process pool when one is configured.
+    """
+    key = "charts:" + hashlib.sha256(json.dumps(
+        [CHART_VERSION, type_dist, metrics_data], sort_keys=True, default=str
+    ).encode()).hexdigest()
+    pngs = chart_cache.get(key)
+    if pngs is None:
+        pngs = [chart.getvalue() for chart in _render_report_charts(type_dist, metrics_data)]
+        chart_cache.set(key, pngs)
+    return [io.BytesIO(png) for png in pngs]
+
+
+def _render_report_charts(type_dist: dict, metrics_data: dict) -> list[io.BytesIO]:
+    jobs = [
+        (create_bar_chart, (type_dist, "Equipment Type Distribution")),
+        (create_pie_chart, (type_dist, "Type Distribution")),
+        (create_metrics_bar_chart, (metrics_data,)),
+    ]
+    pool = _get_chart_pool()
+    if pool is None:
+        return [fn(*args) for fn, args in jobs]
+
+    try:
+        futures = [pool.submit(fn, *args) for fn, args in jobs]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next report starts a fresh one
+        _reset_chart_pool(pool)
+        return [fn(*args) for fn, args in jobs]
+
+
+def _reset_chart_pool(pool):
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is pool:
+            _chart_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# VECTOR CHARTS (drawn straight onto the reportlab canvas)
+# ═══════════════════════════════════════════════════════════════
+
+CHART_COLORS = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
+
+
+def _draw_chart_panel(c, x, y, w, h, title):
+    """Dark chart background with a centered title; returns the title baseline."""
+    c.setFillColor(HexColor('#151d2f'))
+    c.rect(x, y, w, h, fill=True, stroke=False)
+    c.setFillColor(HexColor('#f0f4f8'))
+    c.setFont("Helvetica-Bold", 8)
+    c.drawCentredString(x + w / 2, y + h - 13, title)
+
+
+def _draw_bars(c, labels, values, value_labels, colors, x, y, w, h, rotate_labels):
+    """Bar plot with value labels inside the frame (x, y, w, h)."""
+    axis_color = HexColor('#334155')
+    tick_color = HexColor('#94a3b8')
+
+    px = x + 26
+    py = y + (34 if rotate_labels else 16)
+    pw = w - px + x - 8
+    ph = y + h - 22 - py
+
+    c.setFillColor(HexColor('#0a0e1a'))
+    c.rect(px, py, pw, ph, fill=True, stroke=False)
+
+    # Same "nice" y ticks matplotlib would pick over the full range
+    # (negative averages included), with headroom for labels
+    present = [v for v in values if v == v]
+    low = min(present + [0]) * 1.1
+    high = max(present + [0]) * 1.1
+    if high == low:
+        high = low + 1
+    ticks = MaxNLocator(nbins=6).tick_values(low, high)
+
+    def to_y(value):
+        return py + (value - low) / (high - low) * ph
+
+    c.setFont("Helvetica", 6)
+    c.setFillColor(tick_color)
+    for tick in ticks:
+        if low <= tick <= high:
+            c.drawRightString(px - 3, to_y(tick) - 2, f"{tick:g}")
 
-    file_path = os.path.join(reports_dir, f"dataset_report_{dataset.id}.pdf")
+    c.setStrokeColor(axis_color)
+    c.setLineWidth(0.6)
+    c.line(px, py, px + pw, py)
+    c.line(px, py, px, py + ph)
+    base = to_y(0)
+    if low < 0:
+        c.line(px, base, px + pw, base)
+
+    slot = pw / max(len(values), 1)
+    bar_w = slot * 0.6
+    for i, (label, value, value_label) in enumerate(zip(labels, values, value_labels)):
+        cx = px + slot * (i + 0.5)
+        bar_h = (to_y(value) - base) if value == value else 0
+        c.setFillColor(HexColor(colors[i % len(colors)]))
+        c.rect(cx - bar_w / 2, base, bar_w, bar_h, fill=True, stroke=False)
+
+        # Value labels sit past the end of the bar, below negative ones
+        c.setFillColor(HexColor('#f0f4f8'))
+        c.setFont("Helvetica", 6)
+        c.drawCentredString(cx, base + bar_h + (2 if bar_h >= 0 else -7), value_label)
+
+        c.setFillColor(tick_color)
+        if rotate_labels:
+            c.saveState()
+            c.translate(cx, py - 4)
+            c.rotate(30)
+            c.drawRightString(0, -4, str(label))
+            c.restoreState()
+        else:
+            c.drawCentredString(cx, py - 8, str(label))
+
+
+def draw_bar_chart(c, data: dict, title: str, x, y, w, h):
+    """Vector counterpart of `create_bar_chart`, drawn into (x, y, w, h)."""
+    _draw_chart_panel(c, x, y, w, h, title)
+    values = list(data.values())
+    _draw_bars(c, list(data.keys()), values, [str(int(v)) for v in values],
+               CHART_COLORS[:len(data)] or CHART_COLORS, x, y, w, h, rotate_labels=True)
+
+
+def draw_pie_chart(c, data: dict, title: str, x, y, w, h):
+    """Vector counterpart of `create_pie_chart`, drawn into (x, y, w, h)."""
+    _draw_chart_panel(c, x, y, w, h, title)
+    labels = list(data.keys())
+    values = list(data.values())
+    total = sum(values)
+    if not total:
+        return
+
+    radius = min(w * 0.5, h - 28) / 2
+    cx = x + 12 + radius
+    cy = y + (h - 18) / 2
+
+    # Counter-clockwise from 12 o'clock, like matplotlib's startangle=90
+    angle = 90.0
+    for i, value in enumerate(values):
+        extent = 360.0 * value / total
+        c.setFillColor(HexColor(CHART_COLORS[i % len(CHART_COLORS)]))
+        c.wedge(cx - radius, cy - radius, cx + radius, cy + radius, angle, extent,
+                stroke=0, fill=1)
+
+        mid = np.radians(angle + extent / 2)
+        c.setFillColor(HexColor('#ffffff'))
+        c.setFont("Helvetica-Bold", 6)
+        c.drawCentredString(cx + 0.6 * radius * np.cos(mid),
+                            cy + 0.6 * radius * np.sin(mid) - 2,
+                            f"{100.0 * value / total:.1f}%")
+        angle += extent
+
+    # Legend
+    lx = cx + radius + 12
+    ly = cy + len(labels) * 5
+    c.setFont("Helvetica", 6)
+    for i, (label, value) in enumerate(zip(labels, values)):
+        c.setFillColor(HexColor(CHART_COLORS[i % len(CHART_COLORS)]))
+        c.rect(lx, ly - i * 10, 6, 6, fill=True, stroke=False)
+        c.setFillColor(HexColor('#f0f4f8'))
+        c.drawString(lx + 9, ly - i * 10 + 1, f"{label} ({value})")
+
+
+def draw_metrics_bar_chart(c, data: dict, x, y, w, h):
+    """Vector counterpart of `create_metrics_bar_chart`, drawn into (x, y, w, h)."""
+    _draw_chart_panel(c, x, y, w, h, 'Average Parameters')
+    values = [data['avg_flowrate'], data['avg_pressure'], data['avg_temperature']]
+    _draw_bars(c, ['Flowrate', 'Pressure', 'Temperature'], values,
+               [f'{v:.1f}' for v in values], ['#63caff', '#34d399', '#fb7185'],
+               x, y, w, h, rotate_labels=False)
+
+
+def report_path(dataset_id) -> str:
+    """Location of the rendered PDF report for a dataset."""
+    return os.path.join(settings.BASE_DIR, "reports", f"dataset_report_{dataset_id}.pdf")
+
+
+def generate_pdf_report(dataset, file_path=None):
+    """
+    Generates a professionally designed PDF report with charts.
+    Writes to `report_path(dataset.id)` unless `file_path` is given, which
+    may also be a binary file object.
+    """
+    file_path = file_path or report_path(dataset.id)
+    if isinstance(file_path, (str, os.PathLike)):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
     c = canvas.Canvas(file_path, pagesize=A4)
     width, height = A4
@@ -278,25 +691,28 @@ def generate_pdf_report(dataset):
 
     # Generate and embed charts
     type_dist = dataset.type_distribution
-    
-    # Bar chart - Equipment Distribution
-    bar_img = create_bar_chart(type_dist, "Equipment Type Distribution")
-    c.drawImage(ImageReader(bar_img), 50, y - 180, width=240, height=170, preserveAspectRatio=True)
-    
-    # Pie chart - Distribution Percentage
-    pie_img = create_pie_chart(type_dist, "Type Distribution")
-    c.drawImage(ImageReader(pie_img), 310, y - 180, width=240, height=170, preserveAspectRatio=True)
-    
-    y -= 200
-
-    # Average metrics chart
     metrics_data = {
         'avg_flowrate': dataset.avg_flowrate,
         'avg_pressure': dataset.avg_pressure,
         'avg_temperature': dataset.avg_temperature,
     }
-    metrics_img = create_metrics_bar_chart(metrics_data)
-    c.drawImage(ImageReader(metrics_img), center_x - 120, y - 160, width=240, height=150, preserveAspectRatio=True)
+
+    if settings.REPORT_CHART_FORMAT == "png":
+        bar_img, pie_img, metrics_img = render_report_charts(type_dist, metrics_data)
+
+        # Bar chart - Equipment Distribution
+        c.drawImage(ImageReader(bar_img), 50, y - 180, width=240, height=170, preserveAspectRatio=True)
+
+        # Pie chart - Distribution Percentage
+        c.drawImage(ImageReader(pie_img), 310, y - 180, width=240, height=170, preserveAspectRatio=True)
+
+        # Average metrics chart
+        c.drawImage(ImageReader(metrics_img), center_x - 120, y - 360, width=240, height=150, preserveAspectRatio=True)
+    else:
+        # Same 5:3 frames the PNG charts occupy once aspect-fitted
+        draw_bar_chart(c, type_dist, "Equipment Type Distribution", 50, y - 167, 240, 144)
+        draw_pie_chart(c, type_dist, "Type Distribution", 310, y - 167, 240, 144)
+        draw_metrics_bar_chart(c, metrics_data, center_x - 120, y - 357, 240, 144)
 
     # ═══════════════════════════════════════════════════════════════
     # FOOTER
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .chunked import delete_session_dir, forget_session_hash, session_dir
+from .models import Dataset, UploadSession
+from .http_cache import response_cache
+from .retention import delete_datasets
+
+# Datasets are deleted through `delete_datasets`, which cleans up their
+# files and cached responses; a delete receiver on Dataset would make every
+# DELETE load and signal its rows one by one
+
+
+@receiver(post_save, sender=Dataset)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Drop the owner's cached history/summary responses on any change."""
+    response_cache.invalidate(instance.user_id)
+
+
+@receiver(pre_delete, sender=User)
+def remove_user_datasets(sender, instance, **kwargs):
+    """Delete a user's datasets and their files ahead of the cascade."""
+    delete_datasets(Dataset.objects.filter(user=instance))
+
+
+@receiver(post_delete, sender=UploadSession)
+def remove_upload_files(sender, instance, **kwargs):
+    """Drop a chunked upload's staged bytes and columns once the delete commits."""
+    # The instance loses its pk after the delete, so resolve the path now
+    directory = session_dir(instance)
+    forget_session_hash(instance.id)
+    transaction.on_commit(lambda: delete_session_dir(directory))
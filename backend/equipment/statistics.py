@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .services import METRIC_COLUMNS
+
+PERCENTILES = (50, 95, 99)
+
+
+def _clean(value, digits=4):
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _histogram_edges(lo, hi, bins: int) -> np.ndarray:
+    if not (np.isfinite(lo) and np.isfinite(hi)):
+        return np.linspace(0.0, 1.0, bins + 1)
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def _bin_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin of each value, with the top edge closed like np.histogram."""
+    return np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+
+
+def _entry(count, mean, std, lo, hi, quantiles, edges, hist) -> dict:
+    entry = {
+        "count": int(count),
+        "mean": _clean(mean),
+        "std": _clean(std),
+        "min": _clean(lo),
+        "max": _clean(hi),
+    }
+    for p, q in zip(PERCENTILES, quantiles):
+        entry[f"p{p}"] = _clean(q)
+    entry["histogram"] = {
+        "edges": [_clean(e) for e in edges],
+        "counts": [int(c) for c in hist],
+    }
+    return entry
+
+
+def exact_profile(df: pd.DataFrame, bins: int | None = None) -> dict:
+    """
+    Exact extended statistics for an in-memory frame: count, mean, std,
+    min/max, PERCENTILES and a fixed-bin histogram per metric column,
+    globally and per Type. Per-type figures come from one groupby per
+    statistic and histograms from a single bincount over (type, bin), so
+    the cost stays linear in rows regardless of the number of types.
+    Histogram edges are shared between the global and per-type entries.
+    """
+    bins = bins or settings.STATS_HISTOGRAM_BINS
+    codes, types = pd.factorize(df["Type"])
+    typed = codes >= 0
+    fractions = [p / 100 for p in PERCENTILES]
+
+    grouped = df[list(METRIC_COLUMNS)].groupby(df["Type"], sort=False, observed=True)
+    desc = grouped.agg(["count", "mean", "std", "min", "max"])
+    quant = grouped.quantile(fractions)
+
+    result = {"method": "exact", "global": {}, "by_type": {str(t): {} for t in types}}
+    for col in METRIC_COLUMNS:
+        values = df[col].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        finite = values[valid]
+        lo, hi = (finite.min(), finite.max()) if len(finite) else (np.nan, np.nan)
+        edges = _histogram_edges(lo, hi, bins)
+        idx = _bin_index(values, edges)
+
+        result["global"][col] = _entry(
+            len(finite),
+            finite.mean() if len(finite) else np.nan,
+            finite.std(ddof=1) if len(finite) > 1 else np.nan,
+            lo, hi,
+            np.percentile(finite, PERCENTILES) if len(finite) else [np.nan] * len(PERCENTILES),
+            edges,
+            np.bincount(idx[valid], minlength=bins),
+        )
+
+        both = valid & typed
+        hist = np.bincount(
+            codes[both] * bins + idx[both], minlength=len(types) * bins
+        ).reshape(len(types), bins)
+        stats = desc[col].reindex(types).to_numpy()
+        q = quant[col].unstack().reindex(types).to_numpy()
+        for code, eq_type in enumerate(types):
+            count, mean, std, lo, hi = stats[code]
+            result["by_type"][str(eq_type)][col] = _entry(
+                count, mean, std, lo, hi, q[code], edges, hist[code],
+            )
+    return result
+
+
+def _moments(values: pd.Series, groups) -> pd.DataFrame:
+    """Per-group count, mean, M2 (sum of squared deviations), min and max."""
+    grouped = values.groupby(groups, sort=False, observed=True)
+    out = grouped.agg(["count", "mean", "min", "max"])
+    out["m2"] = grouped.var(ddof=0) * out["count"]
+    return out[out["count"] > 0]
+
+
+def _merge_moments(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Chan et al. parallel merge of two `_moments` frames."""
+    a, b = a.align(b, join="outer")
+    na, nb = a["count"].fillna(0), b["count"].fillna(0)
+    n = na + nb
+    delta = (b["mean"] - a["mean"]).fillna(0)
+    return pd.DataFrame({
+        "count": n,
+        "mean": (na * a["mean"].fillna(0) + nb * b["mean"].fillna(0)) / n,
+        "min": np.fmin(a["min"], b["min"]),
+        "max": np.fmax(a["max"], b["max"]),
+        "m2": a["m2"].fillna(0) + b["m2"].fillna(0) + delta ** 2 * na * nb / n,
+    })
+
+
+class ProfileSink:
+    """
+    Analysis sink (see `analyze_csv`) that builds the extended statistics
+    profile.
+
+    When the whole upload arrives as a single frame the result is exact.
+    Chunked uploads are summarized with mergeable state instead: moments
+    merged with Chan's formula, plus a log-bucketed quantile sketch in the
+    style of DDSketch. Sketch percentiles are within STATS_SKETCH_ACCURACY
+    relative error, and histograms are rebuilt from the sketch buckets.
+    """
+
+    GLOBAL = 0
+
+    def __init__(self, accuracy: float | None = None, bins: int | None = None):
+        self.accuracy = accuracy or settings.STATS_SKETCH_ACCURACY
+        self.bins = bins or settings.STATS_HISTOGRAM_BINS
+        self._log_gamma = math.log((1 + self.accuracy) / (1 - self.accuracy))
+        self._first = None
+        self._chunks = 0
+        self._types = {}  # first-seen order of type labels
+        self._moments = {}  # (scope, column) -> moments frame
+        self._buckets = {}  # (scope, column) -> counts by (group, bucket value)
+
+    def append(self, df: pd.DataFrame):
+        self._chunks += 1
+        if self._chunks == 1:
+            self._first = df
+            return
+        if self._first is not None:
+            self._absorb(self._first)
+            self._first = None
+        self._absorb(df)
+
+    def result(self) -> dict:
+        if self._chunks <= 1:
+            if self._first is None:
+                return {"method": "exact", "global": {}, "by_type": {}}
+            return exact_profile(self._first, self.bins)
+        return self._sketch_result()
+
+    def _bucket_values(self, values: np.ndarray) -> np.ndarray:
+        """Representative value of each value's log bucket (0 stays 0)."""
+        magnitude = np.abs(values)
+        with np.errstate(divide="ignore"):
+            k = np.ceil(np.log(magnitude) / self._log_gamma)
+        gamma = math.exp(self._log_gamma)
+        rep = 2 * np.exp(k * self._log_gamma) / (gamma + 1)
+        return np.where(magnitude > 0, np.sign(values) * rep, 0.0)
+
+    def _absorb(self, df: pd.DataFrame):
+        types = df["Type"]
+        for t in pd.unique(types.dropna()):
+            self._types.setdefault(str(t), None)
+        labels = types.astype(str).where(types.notna())
+        scopes = {"global": np.zeros(len(df), dtype=np.int8), "by_type": labels}
+
+        for col in METRIC_COLUMNS:
+            values = df[col].astype(float)
+            buckets = pd.Series(self._bucket_values(values.to_numpy()), index=values.index)
+            valid = values.notna()
+            for scope, groups in scopes.items():
+                key = (scope, col)
+                part = _moments(values, groups)
+                self._moments[key] = (
+                    part if key not in self._moments else _merge_moments(self._moments[key], part)
+                )
+                g = pd.Series(groups, index=values.index)[valid]
+                counts = buckets[valid].groupby([g, buckets[valid]], sort=False).size()
+                prev = self._buckets.get(key)
+                self._buckets[key] = counts if prev is None else prev.add(counts, fill_value=0)
+
+    def _sketch_quantiles(self, moments, counts: pd.Series):
+        """Bucket values and weights, count, std and PERCENTILES from a sketch."""
+        n = moments["count"]
+        std = math.sqrt(moments["m2"] / (n - 1)) if n > 1 else np.nan
+        counts = counts.sort_index()
+        cum = counts.cumsum().to_numpy()
+        reps = counts.index.to_numpy(dtype=float)
+        # Clamp bucket representatives to the exact observed range
+        reps = np.clip(reps, moments["min"], moments["max"])
+        quantiles = [reps[np.searchsorted(cum, p / 100 * (n - 1), side="right")]
+                     for p in PERCENTILES]
+        return reps, counts.to_numpy(), n, std, quantiles
+
+    def _sketch_result(self) -> dict:
+        result = {
+            "method": "sketch",
+            "relative_accuracy": self.accuracy,
+            "global": {},
+            "by_type": {t: {} for t in self._types},
+        }
+        for col in METRIC_COLUMNS:
+            g_moments = self._moments[("global", col)]
+            if not len(g_moments):
+                continue
+            g_stats = g_moments.loc[self.GLOBAL]
+            edges = _histogram_edges(g_stats["min"], g_stats["max"], self.bins)
+
+            def build(stats, counts):
+                reps, weights, n, std, quantiles = self._sketch_quantiles(stats, counts)
+                hist = np.bincount(_bin_index(reps, edges), weights=weights, minlength=self.bins)
+                return _entry(n, stats["mean"], std, stats["min"], stats["max"], quantiles, edges, hist)
+
+            g_counts = self._buckets[("global", col)].xs(self.GLOBAL, level=0)
+            result["global"][col] = build(g_stats, g_counts)
+
+            t_moments = self._moments[("by_type", col)]
+            t_buckets = self._buckets[("by_type", col)]
+            for eq_type in result["by_type"]:
+                if eq_type in t_moments.index:
+                    result["by_type"][eq_type][col] = build(
+                        t_moments.loc[eq_type], t_buckets.xs(eq_type, level=0)
+                    )
+        return result
@@ -0,0 +1,101 @@
+import io
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+
+from equipment.services import (
+    STREAM_PROBE_ROWS, aggregate_csv_stream, read_csv, summarize_aggregates,
+    summarize_dataframe,
+)
+from equipment.tests.utils import EquipmentTestMixin, make_csv, sample_rows
+
+
+def per_type_loop(df: pd.DataFrame) -> dict:
+    """The original summary: one boolean mask and mean per type."""
+    type_metrics = {}
+    for eq_type in df["Type"].unique():
+        type_df = df[df["Type"] == eq_type]
+        type_metrics[eq_type] = {
+            "count": len(type_df),
+            "avg_flowrate": round(type_df["Flowrate"].mean(), 2),
+            "avg_pressure": round(type_df["Pressure"].mean(), 2),
+            "avg_temperature": round(type_df["Temperature"].mean(), 2),
+        }
+    return {
+        "total_equipment": len(df),
+        "avg_flowrate": round(df["Flowrate"].mean(), 2),
+        "avg_pressure": round(df["Pressure"].mean(), 2),
+        "avg_temperature": round(df["Temperature"].mean(), 2),
+        "type_distribution": df["Type"].value_counts().to_dict(),
+        "type_metrics": type_metrics,
+    }
+
+
+class RecordingSink:
+    def __init__(self):
+        self.chunks = []
+
+    def append(self, df):
+        self.chunks.append(len(df))
+
+
+class SummaryTests(SimpleTestCase):
+    def setUp(self):
+        rows = sample_rows(500)
+        # Missing readings are skipped by the averages
+        rows[3] = ("EQ-3", "Pump", None, 5.5, 61)
+        rows[10] = ("EQ-10", "Valve", 101.5, None, None)
+        self.content = make_csv(rows)
+
+    def test_groupby_matches_per_type_loop(self):
+        summary = summarize_dataframe(read_csv(io.BytesIO(self.content)))
+        expected = per_type_loop(pd.read_csv(io.BytesIO(self.content)))
+
+        self.assertEqual(summary["total_equipment"], expected["total_equipment"])
+        for key in ("avg_flowrate", "avg_pressure", "avg_temperature"):
+            self.assertEqual(summary[key], expected[key])
+        self.assertEqual(summary["type_distribution"], expected["type_distribution"])
+        self.assertEqual(summary["type_metrics"], expected["type_metrics"])
+
+    def test_streaming_matches_in_memory(self):
+        # Past the probe chunk, a small memory limit forces many chunks
+        content = make_csv(sample_rows(STREAM_PROBE_ROWS + 2000))
+        sink = RecordingSink()
+        agg = aggregate_csv_stream(io.BytesIO(content), memory_limit=64 * 1024, sinks=[sink])
+
+        self.assertGreater(len(sink.chunks), 2)
+        self.assertEqual(sum(sink.chunks), STREAM_PROBE_ROWS + 2000)
+        self.assertEqual(
+            summarize_aggregates(agg), summarize_dataframe(read_csv(io.BytesIO(content)))
+        )
+
+    def test_read_csv_keeps_only_required_columns(self):
+        content = make_csv(
+            [("EQ-1", "Pump", 1.5, 2, 3, "x")],
+            header="Equipment Name,Type,Flowrate,Pressure,Temperature,Notes\n",
+        )
+        df = read_csv(io.BytesIO(content))
+
+        self.assertNotIn("Notes", df.columns)
+        self.assertEqual(df["Flowrate"].dtype, np.float64)
+        self.assertEqual(df["Pressure"].dtype, np.float64)
+        self.assertIsInstance(df["Type"].dtype, pd.CategoricalDtype)
+
+    def test_read_csv_rejects_missing_columns(self):
+        with self.assertRaisesMessage(ValueError, "Missing columns"):
+            read_csv(io.BytesIO(b"Equipment Name,Type\nEQ-1,Pump\n"))
+
+
+class UploadAnalysisTests(EquipmentTestMixin, TestCase):
+    def test_extended_profile_is_opt_in(self):
+        content = make_csv(sample_rows(40))
+
+        self.assertNotIn("statistics", self.upload(content).json()["summary"])
+        profile = self.upload(content, query="?profile=extended").json()["summary"]["statistics"]
+        self.assertEqual(profile["global"]["Flowrate"]["count"], 40)
+
+    def test_unknown_profile_is_rejected(self):
+        response = self.upload(make_csv(sample_rows(5)), query="?profile=full")
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+
+from equipment.anomalies import MAD_TO_SIGMA, MEAN_AD_TO_SIGMA, detect_anomalies
+from equipment.tests.utils import EquipmentTestMixin, make_csv, sample_rows
+
+
+class AnomalyTests(SimpleTestCase):
+    def detect(self, values, method="mad"):
+        df = pd.DataFrame({
+            "Equipment Name": [f"EQ-{i}" for i in range(len(values))],
+            "Type": "Pump",
+            "Flowrate": values,
+            "Pressure": 1.0,
+            "Temperature": 1.0,
+        })
+        return detect_anomalies(df, lambda rows: df["Equipment Name"].iloc[rows].tolist(), method)
+
+    def test_mad_score_is_modified_z(self):
+        values = [10.0, 11.0, 12.0, 13.0, 14.0, 15.0, 40.0]
+        result = self.detect(values)
+
+        mad = np.median(np.abs(np.array(values) - 13.0))
+        self.assertEqual(result["total_flagged"], 1)
+        row = result["rows"][0]
+        self.assertEqual(row["equipment"], "EQ-6")
+        self.assertEqual(
+            row["readings"]["Flowrate"]["score"], round(MAD_TO_SIGMA * (40.0 - 13.0) / mad, 2)
+        )
+
+    def test_mean_absolute_deviation_fallback_when_mad_is_zero(self):
+        # Over half the readings are identical, so the MAD is 0
+        values = [10.0] * 6 + [11.0, 12.0, 30.0]
+        result = self.detect(values)
+
+        mean_ad = np.mean(np.abs(np.array(values) - 10.0))
+        expected = round((30.0 - 10.0) / (mean_ad / MEAN_AD_TO_SIGMA), 2)
+        self.assertEqual(result["total_flagged"], 1)
+        self.assertEqual(result["rows"][0]["readings"]["Flowrate"]["score"], expected)
+        self.assertGreater(expected, 3.5)
+
+    def test_iqr_flags_readings_outside_the_fences(self):
+        result = self.detect([10.0, 11.0, 12.0, 13.0, 14.0, 15.0, 40.0], method="iqr")
+
+        self.assertEqual([row["equipment"] for row in result["rows"]], ["EQ-6"])
+
+
+class UploadAnomalyTests(EquipmentTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = make_csv(sample_rows(40) + [("Odd", "Pump", 9999, 5, 60)])
+
+    def test_anomaly_detection_is_opt_in(self):
+        self.assertIsNone(self.upload(self.content).json()["anomalies"])
+
+        flagged = self.upload(self.content, name="b.csv", query="?anomalies=mad").json()
+        self.assertIn("Odd", [row["equipment"] for row in flagged["anomalies"]["rows"]])
+
+    def test_unknown_method_is_rejected(self):
+        response = self.upload(self.content, query="?anomalies=zscore")
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from equipment.cache import FileCache
+
+
+class FileCacheTests(SimpleTestCase):
+    def make_cache(self, max_entries):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        return FileCache(location, {"OPTIONS": {"MAX_ENTRIES": max_entries}})
+
+    def test_evicts_least_recently_used_past_max_entries(self):
+        cache = self.make_cache(3)
+        for i in range(5):
+            cache.set(f"key-{i}", i)
+            os.utime(cache._path(cache.make_key(f"key-{i}")), (i, i))
+
+        self.assertEqual(cache.stats()["entries"], 3)
+        self.assertIsNone(cache.get("key-0"))
+        self.assertEqual(cache.get("key-4"), 4)
+
+    def test_sets_under_the_limits_do_not_scan_the_directory(self):
+        cache = self.make_cache(100)
+        cache.set("first", 0)
+
+        with mock.patch("equipment.cache.os.scandir", wraps=os.scandir) as scandir:
+            for i in range(10):
+                cache.set(f"key-{i}", i)
+            cache.set("key-0", "replaced")
+            cache.delete("key-1")
+
+        scandir.assert_not_called()
+        self.assertEqual(cache.stats()["entries"], 10)
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from equipment.services import _draw_bars
+
+
+class VectorChartTests(SimpleTestCase):
+    def bar_rects(self, values):
+        canvas = mock.MagicMock()
+        labels = [f"T{i}" for i in range(len(values))]
+        _draw_bars(canvas, labels, values, [str(v) for v in values], ["#ffffff"],
+                   0, 0, 300, 200, False)
+        frame, *bars = [c.args for c in canvas.rect.call_args_list]
+        return frame, bars
+
+    def test_negative_bars_stay_inside_the_plot(self):
+        frame, bars = self.bar_rects([12.5, -4.0, 7.0])
+        _, bottom, _, height = frame
+
+        for _, y, _, h in bars:
+            low, high = sorted((y, y + h))
+            self.assertGreaterEqual(low, bottom - 1e-6)
+            self.assertLessEqual(high, bottom + height + 1e-6)
+        # The negative bar hangs down from the same baseline the others rise from
+        self.assertEqual(bars[0][1], bars[1][1])
+        self.assertLess(bars[1][3], 0)
+
+    def test_positive_bars_start_at_the_plot_bottom(self):
+        frame, bars = self.bar_rects([3.0, 5.0])
+
+        self.assertTrue(all(y == frame[1] for _, y, _, _ in bars))
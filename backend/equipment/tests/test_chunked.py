@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import io
+
+from django.test import TestCase
+
+from equipment import chunked
+from equipment.datastore import load_names
+from equipment.models import Dataset, UploadSession
+from equipment.services import read_csv, summarize_dataframe
+from equipment.tests.utils import HEADER, EquipmentTestMixin, make_csv, sample_rows
+
+
+def checksum(data: bytes) -> str:
+    return "sha256 " + hashlib.sha256(data).hexdigest()
+
+
+class ChunkedUploadTests(EquipmentTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = make_csv(sample_rows(200))
+        # Chunk boundaries deliberately fall mid-line
+        self.chunks = [self.content[:1000], self.content[1000:2500], self.content[2500:]]
+
+    def start(self, content=None):
+        content = self.content if content is None else content
+        response = self.client.post(
+            "/api/uploads/", {"filename": "big.csv", "size": len(content)}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["upload_id"]
+
+    def put(self, upload_id, offset, data, digest=None, gzipped=False):
+        headers = {"HTTP_UPLOAD_OFFSET": str(offset), "HTTP_UPLOAD_CHECKSUM": digest or checksum(data)}
+        body = data
+        if gzipped:
+            body = gzip.compress(data)
+            headers["HTTP_CONTENT_ENCODING"] = "gzip"
+        with self.on_commit():
+            return self.client.put(
+                f"/api/uploads/{upload_id}/", body,
+                content_type="application/octet-stream", **headers,
+            )
+
+    def send(self, upload_id, chunks, offset=0):
+        for chunk in chunks:
+            response = self.put(upload_id, offset, chunk)
+            self.assertEqual(response.status_code, 200)
+            offset += len(chunk)
+        return offset
+
+    def finalize(self, upload_id, query=""):
+        with self.on_commit():
+            return self.client.post(f"/api/uploads/{upload_id}/finalize/{query}")
+
+    def test_finalized_upload_matches_one_shot_analysis(self):
+        upload_id = self.start()
+        self.send(upload_id, self.chunks)
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 201)
+        expected = summarize_dataframe(read_csv(io.BytesIO(self.content)))
+        self.assertEqual(response.json()["summary"], expected)
+        dataset = Dataset.objects.get(id=response.json()["dataset_id"])
+        self.assertEqual(dataset.content_hash, hashlib.sha256(self.content).hexdigest())
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_resume_from_stored_offset(self):
+        upload_id = self.start()
+        self.send(upload_id, self.chunks[:1])
+
+        state = self.client.get(f"/api/uploads/{upload_id}/").json()
+        self.assertEqual(state["offset"], len(self.chunks[0]))
+        self.assertEqual(state["rows"], self.chunks[0].count(b"\n") - 1)
+
+        # A retried first chunk is refused with the offset to resume from
+        response = self.put(upload_id, 0, self.chunks[0])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], len(self.chunks[0]))
+
+        self.send(upload_id, self.chunks[1:], offset=state["offset"])
+        self.assertEqual(self.finalize(upload_id).status_code, 201)
+
+    def test_checksum_mismatch_is_not_stored(self):
+        upload_id = self.start()
+        self.send(upload_id, self.chunks[:1])
+
+        response = self.put(upload_id, len(self.chunks[0]), self.chunks[1], digest=checksum(b"other"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Chunk checksum mismatch")
+        self.assertEqual(response.json()["offset"], len(self.chunks[0]))
+        # The rejected chunk can be sent again, and the hash still covers it
+        self.send(upload_id, self.chunks[1:], offset=len(self.chunks[0]))
+        dataset_id = self.finalize(upload_id).json()["dataset_id"]
+        self.assertEqual(
+            Dataset.objects.get(id=dataset_id).content_hash,
+            hashlib.sha256(self.content).hexdigest(),
+        )
+
+    def test_gzip_encoded_chunks(self):
+        upload_id = self.start()
+        offset = 0
+        for chunk in self.chunks:
+            self.assertEqual(self.put(upload_id, offset, chunk, gzipped=True).status_code, 200)
+            offset += len(chunk)
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["summary"]["total_equipment"], 200)
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start()
+        self.send(upload_id, self.chunks[:2])
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], len(self.chunks[0]) + len(self.chunks[1]))
+        self.assertFalse(Dataset.objects.exists())
+
+    def test_content_hash_without_the_running_hash(self):
+        upload_id = self.start()
+        self.send(upload_id, self.chunks)
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual(chunked._hashers[session.id][0], len(self.content))
+
+        # Another worker took the chunks: the staged file is hashed instead
+        chunked.forget_session_hash(session.id)
+
+        self.assertEqual(chunked.content_hash(session), hashlib.sha256(self.content).hexdigest())
+
+    def test_same_content_deduplicates_with_one_shot_uploads(self):
+        one_shot = self.upload(self.content).json()["dataset_id"]
+        upload_id = self.start()
+        self.send(upload_id, self.chunks)
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["duplicate"])
+        self.assertEqual(response.json()["dataset_id"], one_shot)
+        self.assertEqual(Dataset.objects.count(), 1)
+
+    def test_quoted_newlines_across_chunks(self):
+        content = (HEADER + 'EQ-1,Pump,1,2,3\n"EQ-2\nspare",Valve,4,5,6\nEQ-3,Pump,7,8,9\n').encode()
+        split = content.index(b"spare")
+        upload_id = self.start(content)
+        self.send(upload_id, [content[:split], content[split:]])
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["summary"]["total_equipment"], 3)
+        self.assertEqual(load_names(response.json()["dataset_id"]), ["EQ-1", "EQ-2\nspare", "EQ-3"])
@@ -0,0 +1,141 @@
+import threading
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from equipment.models import Dataset
+from equipment import reports
+from equipment.reports import is_report_ready, schedule_report
+from equipment.tests.utils import EquipmentTestMixin, make_csv, sample_rows
+
+
+class ConditionalGetTests(EquipmentTestMixin, TestCase):
+    def assertRevalidates(self, url):
+        """GETs `url`, then revalidates it; returns the ETag."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("Authorization", response["Vary"])
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+        return etag
+
+    def test_history_is_revalidated_until_an_upload(self):
+        self.upload(make_csv(sample_rows(5)))
+        etag = self.assertRevalidates("/api/history/")
+
+        self.upload(make_csv(sample_rows(5, offset=5)))
+
+        response = self.client.get("/api/history/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_dataset_detail_is_revalidated_until_an_append(self):
+        dataset_id = self.upload(make_csv(sample_rows(5))).json()["dataset_id"]
+        url = f"/api/datasets/{dataset_id}/"
+        etag = self.assertRevalidates(url)
+
+        with self.on_commit():
+            self.client.post(
+                f"/api/datasets/{dataset_id}/append/",
+                {"file": SimpleUploadedFile("more.csv", make_csv(sample_rows(5, offset=5)))},
+                format="multipart",
+            )
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_equipment"], 10)
+
+    def test_field_selection_has_its_own_etag(self):
+        self.upload(make_csv(sample_rows(5)))
+        full = self.client.get("/api/history/")
+        slim = self.client.get("/api/history/?fields=id,filename")
+
+        self.assertNotEqual(full["ETag"], slim["ETag"])
+        self.assertEqual(set(slim.json()[0]), {"id", "filename"})
+
+
+class CompareTests(EquipmentTestMixin, TestCase):
+    def test_compares_the_requested_datasets(self):
+        ids = [self.upload(make_csv(sample_rows(5, offset=i * 5)), name=f"{i}.csv").json()["dataset_id"]
+               for i in range(2)]
+
+        response = self.client.get(f"/api/datasets/compare/?ids={ids[0]},{ids[1]}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(d["id"] for d in response.json()["datasets"]), ids)
+
+    @override_settings(COMPARE_MAX_DATASETS=2)
+    def test_too_many_ids_are_rejected_before_querying(self):
+        ids = [self.upload(make_csv(sample_rows(5, offset=i * 5)), name=f"{i}.csv").json()["dataset_id"]
+               for i in range(3)]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/api/datasets/compare/?ids={','.join(map(str, ids))}")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("At most 2", response.json()["error"])
+
+
+# Reports render on a worker thread, which needs to see committed rows
+class ReportTests(EquipmentTestMixin, TransactionTestCase):
+    render_reports = True
+
+    def setUp(self):
+        super().setUp()
+        # Upload without the pre-warm render, so the first download waits
+        with mock.patch("equipment.views.schedule_report"):
+            response = self.upload(make_csv(sample_rows(30)))
+        self.dataset = Dataset.objects.get(id=response.json()["dataset_id"])
+        self.url = f"/api/report/{self.dataset.id}/"
+
+    @override_settings(REPORT_INLINE_WAIT_SECONDS=0)
+    def test_pending_render_is_accepted_then_served(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(response.json()["status"], "rendering")
+
+        schedule_report(self.dataset).result(timeout=60)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        status = self.client.get(f"{self.url}status/").json()["status"]
+        self.assertEqual(status, "ready")
+
+    def test_reports_render_on_the_worker_thread(self):
+        threads = []
+        render = reports._render
+
+        def recording_render(dataset):
+            threads.append(threading.current_thread().name)
+            return render(dataset)
+
+        with mock.patch("equipment.reports._render", recording_render):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("report-render"))
+
+    def test_worker_closes_stale_connections_around_a_job(self):
+        with mock.patch("equipment.reports.close_old_connections") as close:
+            schedule_report(self.dataset).result(timeout=60)
+
+        self.assertEqual(close.call_count, 2)
+
+    def test_unchanged_report_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_report_ready(self.dataset))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,238 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from equipment.cache import summary_cache
+from equipment.datastore import (
+    dataset_dir, has_columns, link_columns, load_names, read_meta,
+)
+from equipment.models import Dataset
+from equipment.retention import prune_user_datasets
+from equipment.tests.utils import EquipmentTestMixin, make_csv, sample_rows
+
+
+class UploadTests(EquipmentTestMixin, TestCase):
+    def test_upload_stores_summary_and_columns(self):
+        response = self.upload(make_csv(sample_rows(20)))
+
+        self.assertEqual(response.status_code, 201)
+        dataset = Dataset.objects.get(id=response.json()["dataset_id"])
+        self.assertEqual(dataset.total_equipment, 20)
+        self.assertEqual(load_names(dataset.id), [f"EQ-{i}" for i in range(20)])
+
+    def test_same_content_returns_the_existing_dataset(self):
+        content = make_csv(sample_rows(20))
+        first = self.upload(content).json()
+        second = self.upload(content, name="copy.csv")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()["duplicate"])
+        self.assertEqual(second.json()["dataset_id"], first["dataset_id"])
+        self.assertEqual(Dataset.objects.count(), 1)
+
+    def test_other_users_same_content_gets_its_own_columns(self):
+        content = make_csv(sample_rows(10))
+        dataset_id = self.upload(content).json()["dataset_id"]
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user("other"))
+        with self.on_commit():
+            copy_id = other.post(
+                "/api/upload/",
+                {"file": SimpleUploadedFile("data.csv", content, content_type="text/csv")},
+                format="multipart",
+            ).json()["dataset_id"]
+
+        self.assertNotEqual(copy_id, dataset_id)
+        self.assertEqual(load_names(copy_id), load_names(dataset_id))
+        for dataset in (dataset_id, copy_id):
+            names = os.path.join(dataset_dir(dataset), "names.bin")
+            self.assertEqual(os.stat(names).st_nlink, 1)
+
+    def test_summary_cache_counts_hits_and_misses(self):
+        content = make_csv(sample_rows(20))
+        before = summary_cache.stats()
+        self.upload(content)
+        self.upload(content, name="copy.csv")
+
+        # The second upload was answered from the summary cache
+        stats = summary_cache.stats()
+        self.assertEqual(stats["hits"] - before["hits"], 1)
+        self.assertEqual(stats["misses"] - before["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_invalid_csv_is_rejected(self):
+        response = self.upload(b"Equipment Name,Type\nEQ-1,Pump\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Missing columns", response.json()["error"])
+        self.assertFalse(Dataset.objects.exists())
+
+
+@override_settings(DATASET_RETENTION_PER_USER=3)
+class RetentionTests(EquipmentTestMixin, TestCase):
+    def upload_many(self, count):
+        return [
+            self.upload(make_csv(sample_rows(5, offset=i * 5)), name=f"{i}.csv").json()["dataset_id"]
+            for i in range(count)
+        ]
+
+    def test_keeps_the_most_recent_datasets(self):
+        ids = self.upload_many(5)
+
+        kept = list(Dataset.objects.filter(user=self.user).values_list("id", flat=True))
+        self.assertEqual(sorted(kept), ids[-3:])
+        self.assertFalse(any(has_columns(dataset_id) for dataset_id in ids[:2]))
+        self.assertTrue(all(has_columns(dataset_id) for dataset_id in ids[2:]))
+
+    def test_prunes_with_a_single_delete(self):
+        ids = self.upload_many(3)
+
+        with CaptureQueriesContext(connection) as queries, self.on_commit():
+            self.assertEqual(prune_user_datasets(self.user, keep=1), 2)
+
+        # One SELECT of the ids to clean up, then one DELETE
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[1]["sql"].startswith("DELETE"))
+        self.assertFalse(has_columns(ids[0]))
+        self.assertFalse(has_columns(ids[1]))
+        self.assertTrue(has_columns(ids[2]))
+
+    def test_deleting_a_user_removes_their_files(self):
+        ids = self.upload_many(2)
+
+        with self.on_commit():
+            self.user.delete()
+
+        self.assertFalse(Dataset.objects.exists())
+        self.assertFalse(any(has_columns(dataset_id) for dataset_id in ids))
+
+    def test_rollback_keeps_rows_and_files(self):
+        ids = self.upload_many(3)
+
+        with self.on_commit():
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                prune_user_datasets(self.user, keep=0)
+                raise RuntimeError
+
+        self.assertEqual(Dataset.objects.count(), 3)
+        self.assertTrue(all(has_columns(dataset_id) for dataset_id in ids))
+
+
+class AppendTests(EquipmentTestMixin, TestCase):
+    def append(self, dataset_id, content, client=None):
+        with self.on_commit():
+            return (client or self.client).post(
+                f"/api/datasets/{dataset_id}/append/",
+                {"file": SimpleUploadedFile("more.csv", content, content_type="text/csv")},
+                format="multipart",
+            )
+
+    def test_append_extends_summary_and_columns(self):
+        dataset_id = self.upload(make_csv(sample_rows(10))).json()["dataset_id"]
+        response = self.append(dataset_id, make_csv(sample_rows(5, offset=10)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["appended_rows"], 5)
+        self.assertEqual(response.json()["summary"]["total_equipment"], 15)
+        self.assertEqual(read_meta(dataset_id)["rows"], 15)
+        self.assertEqual(load_names(dataset_id), [f"EQ-{i}" for i in range(15)])
+
+    def test_append_writes_new_files_instead_of_growing_shared_ones(self):
+        dataset_id = self.upload(make_csv(sample_rows(10))).json()["dataset_id"]
+        copy_id = self.upload(make_csv(sample_rows(3, offset=50)), name="copy.csv").json()["dataset_id"]
+        link_columns(dataset_id, copy_id)
+
+        self.append(dataset_id, make_csv(sample_rows(5, offset=10)))
+
+        self.assertEqual(load_names(dataset_id), [f"EQ-{i}" for i in range(15)])
+        self.assertEqual(load_names(copy_id), [f"EQ-{i}" for i in range(10)])
+        names = os.path.join(dataset_dir(dataset_id), "names.bin")
+        self.assertEqual(os.stat(names).st_nlink, 1)
+
+    def test_other_users_dataset_is_not_found(self):
+        dataset_id = self.upload(make_csv(sample_rows(10))).json()["dataset_id"]
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user("other"))
+
+        response = self.append(dataset_id, make_csv(sample_rows(5)), client=other)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Dataset.objects.get(id=dataset_id).total_equipment, 10)
+
+    def test_invalid_slice_leaves_dataset_unchanged(self):
+        dataset_id = self.upload(make_csv(sample_rows(10))).json()["dataset_id"]
+
+        response = self.append(dataset_id, b"Equipment Name,Type\nEQ-1,Pump\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Dataset.objects.get(id=dataset_id).total_equipment, 10)
+        self.assertEqual(read_meta(dataset_id)["rows"], 10)
+
+
+class BatchUploadTests(EquipmentTestMixin, TestCase):
+    def test_batch_rolls_up_analyzed_files_and_reports_errors(self):
+        files = [
+            SimpleUploadedFile("a.csv", make_csv(sample_rows(10)), content_type="text/csv"),
+            SimpleUploadedFile("b.csv", make_csv(sample_rows(6, offset=10)), content_type="text/csv"),
+            SimpleUploadedFile("bad.csv", b"Equipment Name\nEQ-1\n", content_type="text/csv"),
+        ]
+        with self.on_commit():
+            response = self.client.post("/api/upload/batch/", {"files": files}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data["created"], 2)
+        self.assertEqual(data["rollup"]["total_equipment"], 16)
+        by_name = {entry["filename"]: entry for entry in data["files"]}
+        self.assertEqual(by_name["a.csv"]["status"], "created")
+        self.assertEqual(by_name["bad.csv"]["status"], "error")
+        self.assertIn("Missing columns", by_name["bad.csv"]["error"])
+        self.assertEqual(Dataset.objects.count(), 2)
+
+    @override_settings(DATASET_RETENTION_PER_USER=1)
+    def test_batch_larger_than_retention_keeps_its_last_file(self):
+        files = [
+            SimpleUploadedFile(f"{i}.csv", make_csv(sample_rows(4, offset=i * 4)), content_type="text/csv")
+            for i in range(2)
+        ]
+        with self.on_commit():
+            response = self.client.post("/api/upload/batch/", {"files": files}, format="multipart")
+
+        statuses = [(entry["status"], entry["dataset_id"]) for entry in response.json()["files"]]
+        self.assertEqual(statuses[0], ("pruned", None))
+        self.assertEqual(statuses[1][0], "created")
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(list(Dataset.objects.values_list("id", flat=True)), [statuses[1][1]])
+        self.assertTrue(has_columns(statuses[1][1]))
+
+    def test_batch_of_only_invalid_files_is_rejected(self):
+        bad = SimpleUploadedFile("bad.csv", b"Equipment Name\nEQ-1\n", content_type="text/csv")
+        response = self.client.post("/api/upload/batch/", {"files": [bad]}, format="multipart")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(response.json()["rollup"])
+
+    def test_batch_parses_content_only_another_user_stored(self):
+        content = make_csv(sample_rows(8))
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user("other"))
+        with self.on_commit():
+            other.post(
+                "/api/upload/",
+                {"file": SimpleUploadedFile("data.csv", content, content_type="text/csv")},
+                format="multipart",
+            )
+            response = self.client.post(
+                "/api/upload/batch/",
+                {"files": [SimpleUploadedFile("data.csv", content, content_type="text/csv")]},
+                format="multipart",
+            )
+
+        dataset_id = response.json()["files"][0]["dataset_id"]
+        self.assertEqual(read_meta(dataset_id)["rows"], 8)
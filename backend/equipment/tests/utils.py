@@ -0,0 +1,92 @@
+import contextlib
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+HEADER = "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+
+# Per-process memory caches, so tests never touch the on-disk cache
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    **{
+        alias: {
+            "BACKEND": "equipment.cache.MemoryCache",
+            "LOCATION": f"test-{alias}",
+            "OPTIONS": {"MAX_ENTRIES": 100, "MAX_BYTES": 16 * 1024 * 1024},
+        }
+        for alias in ("summaries", "reports", "charts")
+    },
+}
+
+
+def make_csv(rows, header: str = HEADER) -> bytes:
+    """CSV bytes for rows of (name, type, flowrate, pressure, temperature)."""
+    lines = [",".join("" if value is None else str(value) for value in row) for row in rows]
+    return (header + "".join(line + "\n" for line in lines)).encode()
+
+
+def sample_rows(count: int, offset: int = 0, types=("Pump", "Valve", "Mixer", "Reactor")):
+    return [
+        (
+            f"EQ-{i}",
+            types[i % len(types)],
+            round(100 + (i % 17) * 1.5, 2),
+            round(5 + (i % 7) * 0.25, 2),
+            60 + i % 11,
+        )
+        for i in range(offset, offset + count)
+    ]
+
+
+class EquipmentTestMixin:
+    """
+    Gives each test an empty dataset store and empty memory caches, and an
+    authenticated API client for `self.user`. Background report renders
+    are skipped unless `render_reports` is set.
+    """
+
+    render_reports = False
+
+    def setUp(self):
+        super().setUp()
+        store = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store, True)
+        overrides = override_settings(
+            DATASET_STORE_DIR=Path(store), CACHES=CACHES, CHART_RENDER_PROCESSES=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for alias in ("summaries", "reports", "charts"):
+            caches[alias].clear()
+
+        if not self.render_reports:
+            patcher = mock.patch("equipment.views.schedule_report")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("operator", password="secret")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def on_commit(self):
+        """Runs the on-commit callbacks of requests made inside it."""
+        # Outside a TestCase transaction they already run on commit
+        if hasattr(self, "captureOnCommitCallbacks"):
+            return self.captureOnCommitCallbacks(execute=True)
+        return contextlib.nullcontext()
+
+    def upload(self, content: bytes, name: str = "data.csv", query: str = ""):
+        """POSTs a CSV to /api/upload/, running on-commit work."""
+        with self.on_commit():
+            return self.client.post(
+                f"/api/upload/{query}",
+                {"file": SimpleUploadedFile(name, content, content_type="text/csv")},
+                format="multipart",
+            )
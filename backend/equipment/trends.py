@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+from .services import METRIC_COLUMNS
+
+# Dataset fields read for a comparison; the raw columns are never touched
+COMPARE_FIELDS = (
+    "id", "filename", "uploaded_at", "total_equipment",
+    "avg_flowrate", "avg_pressure", "avg_temperature",
+    "aggregates", "type_metrics",
+)
+
+
+def _aggregate_records(dataset) -> list[dict]:
+    """
+    Per-type aggregate records of a dataset. Datasets stored before running
+    aggregates were kept are rebuilt from their rounded type_metrics, which
+    carry no sums of squares.
+    """
+    if dataset.aggregates:
+        return [r for r in dataset.aggregates if r["type"] is not None]
+    records = []
+    for eq_type, metrics in dataset.type_metrics.items():
+        record = {"type": eq_type, "rows": metrics["count"]}
+        for col, key in METRIC_COLUMNS.items():
+            average = metrics.get(key)
+            record[f"{col}_sum"] = np.nan if average is None else average * metrics["count"]
+            record[f"{col}_count"] = metrics["count"]
+            record[f"{col}_sumsq"] = np.nan
+        records.append(record)
+    return records
+
+
+def _series(values: np.ndarray, cast=float) -> list:
+    return [None if np.isnan(v) else cast(round(float(v), 2)) for v in values]
+
+
+def compare_datasets(datasets) -> dict:
+    """
+    Aligned per-type metric series across `datasets`, oldest first.
+
+    Every series has one entry per dataset, None where a type is absent.
+    Per type it holds the equipment count and, for each metric, the mean
+    and population standard deviation derived from the stored sums and
+    sums of squares; "overall" holds the dataset-level figures.
+    """
+    datasets = sorted(datasets, key=lambda d: (d.uploaded_at, d.id))
+    ids = [d.id for d in datasets]
+
+    frames = [
+        pd.DataFrame.from_records(records).assign(dataset=d.id)
+        for d in datasets if (records := _aggregate_records(d))
+    ]
+    series = {}
+    if frames:
+        series = _type_series(pd.concat(frames, ignore_index=True), ids)
+
+    overall = {"total_equipment": [d.total_equipment for d in datasets]}
+    for key in METRIC_COLUMNS.values():
+        overall[key] = _series(np.array([getattr(d, key) for d in datasets], dtype=float))
+
+    return {
+        "datasets": [
+            {"id": d.id, "filename": d.filename, "uploaded_at": d.uploaded_at}
+            for d in datasets
+        ],
+        "types": list(series),
+        "series": series,
+        "overall": overall,
+    }
+
+
+def _type_series(records: pd.DataFrame, ids: list) -> dict:
+    """Per-type series from aggregate records tagged with their dataset id."""
+    agg = records.set_index(["type", "dataset"])
+    stats = {"count": agg["rows"].astype(float)}
+    for col, key in METRIC_COLUMNS.items():
+        count = agg[f"{col}_count"].replace(0, np.nan)
+        mean = agg[f"{col}_sum"] / count
+        variance = (agg[f"{col}_sumsq"] / count - mean ** 2).clip(lower=0)
+        stats[key] = mean
+        stats[key.replace("avg_", "std_")] = np.sqrt(variance)
+    # One (type x dataset) grid per statistic, aligned on the dataset order
+    wide = pd.DataFrame(stats).unstack("dataset").reindex(
+        columns=pd.MultiIndex.from_product([list(stats), ids])
+    )
+
+    return {
+        str(eq_type): {
+            stat: _series(
+                wide.loc[eq_type, stat].to_numpy(dtype=float),
+                int if stat == "count" else float,
+            )
+            for stat in stats
+        }
+        for eq_type in wide.index
+    }
@@ -0,0 +1,91 @@
+import hashlib
+import zlib
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    FileUploadHandler, MemoryFileUploadHandler, SkipFile,
+)
+
+GZIP_CONTENT_TYPES = {"application/gzip", "application/x-gzip"}
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """
+    Hashes each uploaded file while Django streams it in, without buffering
+    anything itself. Chunks are passed through untouched to the next
+    handler, which still builds the UploadedFile. Digests are exposed in
+    `digests`, keyed by form field name.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = {}
+        self._hasher = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hasher.hexdigest()
+        return None
+
+
+class GzipUploadHandler(FileUploadHandler):
+    """
+    Decompresses file parts sent as application/gzip while they stream in,
+    so the handlers after it (hashing, storage) see the plain CSV bytes and
+    a compressed upload dedups against the same file sent uncompressed.
+    Other parts pass through untouched.
+
+    Decompressed files always spool to disk: Django picks in-memory storage
+    from the compressed request size. Parts that are not valid gzip or
+    inflate past UPLOAD_MAX_DECOMPRESSED_BYTES are skipped, with the reason
+    in `errors`, keyed by form field name.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = {}
+        self._inflater = None
+        self._size = 0
+
+    def new_file(self, field_name, file_name, content_type, *args, **kwargs):
+        super().new_file(field_name, file_name, content_type, *args, **kwargs)
+        self._inflater = None
+        if content_type.lower() in GZIP_CONTENT_TYPES:
+            self._inflater = zlib.decompressobj(wbits=31)
+            self._size = 0
+            for handler in self.request.upload_handlers:
+                if isinstance(handler, MemoryFileUploadHandler):
+                    handler.activated = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._inflater is None:
+            return raw_data
+        try:
+            data = self._inflater.decompress(raw_data)
+            # Concatenated gzip members decode as one stream
+            while self._inflater.eof and self._inflater.unused_data:
+                rest = self._inflater.unused_data
+                self._inflater = zlib.decompressobj(wbits=31)
+                data += self._inflater.decompress(rest)
+        except zlib.error:
+            self._skip("File is not valid gzip data")
+        self._size += len(data)
+        if self._size > settings.UPLOAD_MAX_DECOMPRESSED_BYTES:
+            self._skip("Decompressed file exceeds the upload size limit")
+        return data
+
+    def file_complete(self, file_size):
+        if self._inflater is not None and not self._inflater.eof:
+            self.errors[self.field_name] = "Compressed file is truncated"
+        return None
+
+    def _skip(self, reason):
+        self.errors[self.field_name] = reason
+        self._inflater = None
+        raise SkipFile()
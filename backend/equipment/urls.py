@@ -1,8 +1,20 @@
 from django.urls import path
-from .views import UploadCSVView, DatasetHistoryView, DatasetPDFReportView
+from .views import (
+    UploadCSVView, BatchUploadCSVView, ChunkedUploadView, ChunkedUploadDetailView,
+    ChunkedUploadFinalizeView, DatasetAppendView, DatasetCompareView,
+    DatasetDetailView, DatasetHistoryView, DatasetPDFReportView, DatasetReportStatusView,
+)
 
 urlpatterns = [
     path("upload/", UploadCSVView.as_view(), name="upload-csv"),
+    path("upload/batch/", BatchUploadCSVView.as_view(), name="upload-csv-batch"),
+    path("uploads/", ChunkedUploadView.as_view(), name="upload-chunked"),
+    path("uploads/<uuid:upload_id>/", ChunkedUploadDetailView.as_view(), name="upload-chunked-detail"),
+    path("uploads/<uuid:upload_id>/finalize/", ChunkedUploadFinalizeView.as_view(), name="upload-chunked-finalize"),
+    path("datasets/<int:dataset_id>/", DatasetDetailView.as_view(), name="dataset-detail"),
+    path("datasets/compare/", DatasetCompareView.as_view(), name="dataset-compare"),
+    path("datasets/<int:dataset_id>/append/", DatasetAppendView.as_view(), name="dataset-append"),
     path("history/", DatasetHistoryView.as_view(), name="dataset-history"),
     path("report/<int:dataset_id>/", DatasetPDFReportView.as_view(), name="dataset-report"),
+    path("report/<int:dataset_id>/status/", DatasetReportStatusView.as_view(), name="dataset-report-status"),
 ]
\ No newline at end of file
@@ -1,19 +1,175 @@
+from __future__ import annotations
+
 from django.shortcuts import render
 
 # Create your views here.
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 
-from .services import analyze_csv
-from .models import Dataset
+from .services import (
+    aggregate_by_type, aggregate_csv, load_aggregates, merge_aggregates,
+    storable_aggregates, storable_type_metrics, summarize_aggregates,
+)
+from .models import Dataset, UploadSession
+from .uploads import ContentHashUploadHandler, GzipUploadHandler
+from .cache import summary_cache
+from .retention import prune_user_datasets, retention_limit
+from .datastore import (
+    ColumnWriter, find_stored_columns, has_columns, link_columns,
+    load_frame, load_names,
+)
+from .statistics import ProfileSink
+from .batch import analyze_batch, expand_batch
+from .trends import COMPARE_FIELDS, compare_datasets
+from .anomalies import ANOMALY_METHODS, AnomalySink, detect_anomalies
+from .chunked import (
+    analyze_received, content_hash as chunk_content_hash, open_columns, parse_checksum,
+    purge_expired_sessions, start_session, write_chunk,
+)
 
 from .serializers import DatasetSerializer
+from .pagination import DatasetCursorPagination
+from .http_cache import dataset_etag, history_etag, response_cache
 
 from rest_framework.permissions import IsAuthenticated
 
+from django.db import transaction
 from django.http import FileResponse
-from .services import generate_pdf_report
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+import hashlib
+import io
+from datetime import datetime, time
+from concurrent.futures import TimeoutError as FutureTimeout
+from django.conf import settings
+from .reports import (
+    cached_report, report_etag, report_status, schedule_report,
+)
+
+
+def new_dataset(user, filename, content_hash, summary, aggregates) -> Dataset:
+    """Unsaved Dataset holding an analyzed upload's summary."""
+    return Dataset(
+        user=user,
+        filename=filename,
+        content_hash=content_hash,
+        total_equipment=summary["total_equipment"],
+        avg_flowrate=summary["avg_flowrate"],
+        avg_pressure=summary["avg_pressure"],
+        avg_temperature=summary["avg_temperature"],
+        type_distribution=summary["type_distribution"],
+        type_metrics=storable_type_metrics(summary["type_metrics"]),
+        aggregates=aggregates,
+    )
+
+
+def save_upload(user, filename, content_hash, summary, aggregates, writer, columns_from=None):
+    """
+    Inserts an analyzed upload's dataset and applies retention in one
+    transaction. Returns (dataset, created); an existing dataset of this
+    user with the same content is returned instead of inserting a duplicate.
+    Raw columns come from `writer`, or are linked from the dataset
+    `columns_from` when no writer is given.
+    """
+    with transaction.atomic():
+        if content_hash:
+            existing = Dataset.objects.filter(
+                user=user, content_hash=content_hash
+            ).first()
+            if existing:
+                return existing, False
+
+        # Save to database with current user
+        dataset = new_dataset(user, filename, content_hash, summary, aggregates)
+        dataset.save()
+
+        # Keep only the most recent uploads PER USER
+        prune_user_datasets(user)
+
+        # Persist raw columns and pre-warm the PDF report once committed
+        if writer:
+            transaction.on_commit(lambda: writer.commit(dataset.id), robust=True)
+        elif columns_from is not None:
+            transaction.on_commit(
+                lambda: link_columns(columns_from, dataset.id), robust=True
+            )
+        transaction.on_commit(lambda: schedule_report(dataset))
+
+    return dataset, True
+
+
+def analysis_options(request) -> tuple[str | None, str]:
+    """
+    The opt-in statistics profile and the anomaly method ("none" skips
+    detection) requested for an upload. Unknown values are a 400.
+    """
+    # Opt-in extended statistics (percentiles, std-dev, histograms)
+    profile = request.query_params.get("profile") or request.data.get("profile")
+    if profile and profile != "extended":
+        raise ValidationError({"error": f"Unknown statistics profile: {profile}"})
+
+    # Per-type outlier detection
+    anomalies = (request.query_params.get("anomalies")
+                 or request.data.get("anomalies")
+                 or settings.ANOMALY_METHOD)
+    if anomalies not in ANOMALY_METHODS + ("none",):
+        raise ValidationError({"error": f"Unknown anomaly method: {anomalies}"})
+    return profile, anomalies
+
+
+def upload_response(dataset, created, filename, summary, flagged) -> Response:
+    """Response to a saved upload; a duplicate returns the existing dataset."""
+    if not created:
+        return Response(
+            {
+                "message": "File already uploaded",
+                "dataset_id": dataset.id,
+                "filename": dataset.filename,
+                "summary": summary,
+                "anomalies": flagged,
+                "duplicate": True,
+            },
+            status=status.HTTP_200_OK
+        )
+
+    return Response(
+        {
+            "message": "File uploaded successfully",
+            "dataset_id": dataset.id,
+            "filename": filename,
+            "summary": summary,
+            "anomalies": flagged,
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
+def requested_fields(request) -> list[str] | None:
+    """
+    Fields named by ?fields=id,filename,... (to skip the heavy JSON
+    columns), or None for all of them. Unknown names are a 400.
+    """
+    fields = request.query_params.get("fields")
+    if not fields:
+        return None
+    fields = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = set(fields) - set(DatasetSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({"error": f"Unknown fields: {', '.join(sorted(unknown))}"})
+    return fields
+
+
+def cacheable(response, etag: str):
+    """Marks a per-user response as revalidatable by the client."""
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ["Authorization"])
+    return response
 
 
 # Functionality of uploading CSV and getting analysis
@@ -21,59 +177,631 @@ class UploadCSVView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        # Hash the upload while it streams in, before request.FILES is parsed;
+        # a gzip-compressed file is inflated ahead of the hasher
+        hasher = ContentHashUploadHandler(request)
+        gunzip = GzipUploadHandler(request)
+        request.upload_handlers[:0] = [gunzip, hasher]
+
         file = request.FILES.get("file")
 
+        if "file" in gunzip.errors:
+            return Response(
+                {"error": gunzip.errors["file"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         if not file:
             return Response(
                 {"error": "CSV file is required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        content_hash = hasher.digests.get("file", "")
+        summary = summary_cache.get(content_hash) if content_hash else None
+
+        profile, anomalies = analysis_options(request)
+        if summary is not None and (
+            "aggregates" not in summary or (profile and "statistics" not in summary)
+        ):
+            summary = None
+        flagged = None
+
+        # A cached summary can reuse the raw columns this user already stored
+        # for the same content; otherwise the file is parsed and its columns
+        # written out
+        columns_from = find_stored_columns(request.user, content_hash) if summary else None
+        writer = None
+        if summary is None or columns_from is None:
+            writer = ColumnWriter()
+            sinks = [writer]
+            profiler = ProfileSink() if profile else None
+            detector = AnomalySink(writer, anomalies) if anomalies != "none" else None
+            sinks += [sink for sink in (profiler, detector) if sink]
+            try:
+                agg = aggregate_csv(file, sinks=sinks)
+                summary = summarize_aggregates(agg)
+                summary["aggregates"] = storable_aggregates(agg)
+                if profiler:
+                    summary["statistics"] = profiler.result()
+                if detector:
+                    flagged = detector.result()
+            except Exception as e:
+                writer.abort()
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if content_hash:
+                summary_cache.set(content_hash, summary)
+        elif anomalies != "none":
+            flagged = detect_anomalies(
+                load_frame(columns_from),
+                lambda rows: load_names(columns_from, rows),
+                anomalies,
+            )
+
+        # Running aggregates are persisted but not part of the response
+        aggregates = summary["aggregates"]
+        hidden = {"aggregates"} if profile else {"aggregates", "statistics"}
+        summary = {k: v for k, v in summary.items() if k not in hidden}
+
         try:
-            summary = analyze_csv(file)
-        except Exception as e:
+            dataset, created = save_upload(
+                request.user, file.name, content_hash, summary, aggregates, writer, columns_from
+            )
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+
+        # Same file already uploaded by this user: return it instead of a new row
+        if not created and writer:
+            writer.abort()
+        return upload_response(dataset, created, file.name, summary, flagged)
+
+
+# Functionality of uploading many CSVs (or zip archives of CSVs) at once
+class BatchUploadCSVView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        uploads = request.FILES.getlist("files") + request.FILES.getlist("file")
+
+        if not uploads:
+            return Response(
+                {"error": "At least one CSV file or zip archive is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            entries = expand_batch(uploads)
+        except ValueError as e:
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not entries:
+            return Response(
+                {"error": "No CSV files found in upload"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Save to database with current user
-        dataset = Dataset.objects.create(
-            user=request.user,
-            filename=file.name,
-            total_equipment=summary["total_equipment"],
-            avg_flowrate=summary["avg_flowrate"],
-            avg_pressure=summary["avg_pressure"],
-            avg_temperature=summary["avg_temperature"],
-            type_distribution=summary["type_distribution"],
+        # Files are parsed concurrently, off the DB; cached summaries are only
+        # reused for content whose columns this user already stored
+        stored_hashes = set(
+            Dataset.objects.filter(user=request.user).values_list("content_hash", flat=True)
         )
+        results = analyze_batch(entries, stored_hashes)
+        analyzed = [result for result in results if "error" not in result]
+        try:
+            created = self._save(request, analyzed)
+        except BaseException:
+            for result in analyzed:
+                if result["writer"]:
+                    result["writer"].abort()
+            raise
+
+        files = []
+        for result in results:
+            entry = {"filename": result["filename"]}
+            if "error" in result:
+                entry.update(status="error", error=result["error"])
+            else:
+                entry.update(
+                    status=result["status"],
+                    dataset_id=result["dataset"].id if result["status"] != "pruned" else None,
+                    summary={k: v for k, v in result["summary"].items()
+                             if k not in ("aggregates", "statistics")},
+                )
+            files.append(entry)
+
+        # Combined figures over every analyzed file, from the mergeable aggregates
+        rollup = None
+        if analyzed:
+            rollup = summarize_aggregates(merge_aggregates(*(
+                load_aggregates(result["summary"]["aggregates"]) for result in analyzed
+            )))
+
+        if created:
+            response_status = status.HTTP_201_CREATED
+        elif analyzed:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {
+                "message": f"{created} of {len(results)} files uploaded",
+                "created": created,
+                "files": files,
+                "rollup": rollup,
+            },
+            status=response_status
+        )
+
+    def _save(self, request, analyzed) -> int:
+        """
+        Saves the analyzed files in order with `save_upload`, in one
+        transaction. Sets each result's "status" (created, duplicate, or
+        pruned when retention dropped it for a later file of the batch) and
+        "dataset"; returns the number created and retained.
+        """
+        with transaction.atomic():
+            for result in analyzed:
+                writer = result["writer"]
+                columns_from = None
+                if not writer:
+                    columns_from = find_stored_columns(request.user, result["content_hash"])
+                dataset, created = save_upload(
+                    request.user, result["filename"], result["content_hash"],
+                    result["summary"], result["summary"]["aggregates"],
+                    writer, columns_from,
+                )
+                result.update(status="created" if created else "duplicate", dataset=dataset)
+                if not created and writer:
+                    writer.abort()
+
+            # A batch larger than the retention limit keeps its last files
+            retained = set(Dataset.objects.filter(
+                id__in=[result["dataset"].id for result in analyzed]
+            ).values_list("id", flat=True))
+            for result in analyzed:
+                if result["dataset"].id not in retained:
+                    result["status"] = "pruned"
+
+        return sum(result["status"] == "created" for result in analyzed)
+
+
+# Functionality of appending a CSV slice to an existing dataset
+class DatasetAppendView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, dataset_id):
+        # Missing and other users' datasets are refused before the upload
+        # is read
+        if not Dataset.objects.filter(id=dataset_id, user=request.user).exists():
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        hasher = ContentHashUploadHandler(request)
+        gunzip = GzipUploadHandler(request)
+        request.upload_handlers[:0] = [gunzip, hasher]
+
+        file = request.FILES.get("file")
+
+        if "file" in gunzip.errors:
+            return Response(
+                {"error": gunzip.errors["file"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not file:
+            return Response(
+                {"error": "CSV file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Keep only last 5 uploads PER USER
-        user_datasets = Dataset.objects.filter(user=request.user).order_by("-uploaded_at")
-        if user_datasets.count() > 5:
-            for old in user_datasets[5:]:
-                old.delete()
+        # Only the new slice is parsed, before the dataset is locked; its
+        # rows are staged apart and earlier rows live on as aggregates
+        incoming = ColumnWriter()
+        try:
+            part = aggregate_csv(file, sinks=[incoming])
+        except Exception as e:
+            incoming.abort()
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # The row lock orders concurrent appends to one dataset, so each
+        # extends the stored columns from the rows the previous one left
+        writer = None
+        try:
+            with transaction.atomic():
+                try:
+                    dataset = Dataset.objects.select_for_update().get(
+                        id=dataset_id, user=request.user
+                    )
+                except Dataset.DoesNotExist:
+                    return Response(
+                        {"error": "Dataset not found"},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+
+                columns = has_columns(dataset.id)
+                if dataset.aggregates:
+                    stored = load_aggregates(dataset.aggregates)
+                elif columns:
+                    # Uploaded before running aggregates were kept: rebuild once
+                    stored = aggregate_by_type(load_frame(dataset.id))
+                else:
+                    return Response(
+                        {"error": "Dataset predates append support; upload it again"},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+                agg = merge_aggregates(stored, part)
+                summary = summarize_aggregates(agg)
+
+                dataset.total_equipment = summary["total_equipment"]
+                dataset.avg_flowrate = summary["avg_flowrate"]
+                dataset.avg_pressure = summary["avg_pressure"]
+                dataset.avg_temperature = summary["avg_temperature"]
+                dataset.type_distribution = summary["type_distribution"]
+                dataset.type_metrics = storable_type_metrics(summary["type_metrics"])
+                dataset.aggregates = storable_aggregates(agg)
+                # Chain the hashes so the appended content gets a new identity
+                dataset.content_hash = hashlib.sha256(
+                    (dataset.content_hash + hasher.digests.get("file", "")).encode()
+                ).hexdigest()
+                dataset.save()
+
+                # New files: a copy of the stored columns plus the staged
+                # rows, swapped in once committed. The report is stale by
+                # updated_at and re-rendered in the background
+                if columns:
+                    writer = ColumnWriter.extend(dataset.id)
+                    writer.append_staged(incoming)
+                    transaction.on_commit(lambda: writer.commit(dataset.id), robust=True)
+                transaction.on_commit(lambda: schedule_report(dataset))
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+        finally:
+            incoming.abort()
 
         return Response(
             {
-                "message": "File uploaded successfully",
+                "message": "Rows appended successfully",
                 "dataset_id": dataset.id,
-                "filename": file.name,
-                "summary": summary
+                "filename": dataset.filename,
+                "appended_rows": int(part["rows"].sum()),
+                "summary": summary,
             },
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_200_OK
         )
 
-# Functionality of retrieving last 5 uploads for current user
+# Functionality of resumable chunked uploads of very large CSVs
+def upload_state(session) -> dict:
+    """What a client needs to (re)start sending chunks of an upload."""
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.received,
+        "rows": session.rows,
+        "chunk_size": settings.CHUNKED_UPLOAD_CHUNK_BYTES,
+    }
+
+
+def get_upload_session(request, upload_id, lock=False):
+    sessions = UploadSession.objects.filter(user=request.user)
+    if lock:
+        sessions = sessions.select_for_update()
+    return sessions.filter(id=upload_id).first()
+
+
+class ChunkedUploadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        filename = str(request.data.get("filename", "")).strip()
+        try:
+            size = int(request.data.get("size"))
+        except (TypeError, ValueError):
+            size = None
+        if not filename or size is None:
+            return Response(
+                {"error": "filename and size (in bytes) are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        purge_expired_sessions()
+        try:
+            session = start_session(request.user, filename[:255], size)
+        except ValueError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(upload_state(session), status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        """Stored offset of an upload, to resume from after a failure."""
+        session = get_upload_session(request, upload_id)
+        if session is None:
+            return Response(
+                {"error": "Upload not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(upload_state(session))
+
+    def put(self, request, upload_id):
+        """
+        Stores one chunk, sent as the raw (optionally gzip Content-Encoded)
+        body with `Upload-Offset: <byte offset>` and
+        `Upload-Checksum: sha256 <hex digest of the decoded chunk>`.
+        """
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            checksum = parse_checksum(request.headers.get("Upload-Checksum", ""))
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "Upload-Offset and Upload-Checksum headers are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_BYTES:
+            return Response(
+                {"error": f"Chunks are limited to {settings.CHUNKED_UPLOAD_MAX_CHUNK_BYTES} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        gzipped = request.headers.get("Content-Encoding", "").lower() == "gzip"
+
+        with transaction.atomic():
+            session = get_upload_session(request, upload_id, lock=True)
+            if session is None:
+                return Response(
+                    {"error": "Upload not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            # A retried or out-of-order chunk: tell the client where to resume
+            if offset != session.received:
+                return Response(
+                    {"error": "Chunk offset does not match the stored upload", **upload_state(session)},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            try:
+                session.received += write_chunk(
+                    session, offset, request.stream, length, checksum, gzipped
+                )
+            except ValueError as e:
+                return Response(
+                    {"error": str(e), **upload_state(session)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Analyze what has arrived; a malformed CSV ends the upload
+            try:
+                analyze_received(session)
+            except ValueError as e:
+                session.delete()
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            session.save()
+
+        return Response(upload_state(session))
+
+    def delete(self, request, upload_id):
+        """Abandons an upload and its stored bytes."""
+        session = get_upload_session(request, upload_id)
+        if session is None:
+            return Response(
+                {"error": "Upload not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChunkedUploadFinalizeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        """Analyzes the last line and saves the dataset, like a one-shot upload."""
+        profile, anomalies = analysis_options(request)
+
+        with transaction.atomic():
+            session = get_upload_session(request, upload_id, lock=True)
+            if session is None:
+                return Response(
+                    {"error": "Upload not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            if session.received != session.size:
+                return Response(
+                    {"error": "Upload is incomplete", **upload_state(session)},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            try:
+                analyze_received(session, final=True)
+            except ValueError as e:
+                session.delete()
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            content_hash = chunk_content_hash(session)
+            aggregates = session.aggregates
+            summary = summarize_aggregates(load_aggregates(aggregates))
+            writer = open_columns(session)
+            try:
+                if profile:
+                    profiler = ProfileSink()
+                    profiler.append(writer.load_frame())
+                    summary["statistics"] = profiler.result()
+                flagged = None
+                if anomalies != "none":
+                    flagged = detect_anomalies(writer.load_frame(), writer.load_names, anomalies)
+                summary_cache.set(content_hash, {**summary, "aggregates": aggregates})
+                dataset, created = save_upload(
+                    request.user, session.filename, content_hash, summary, aggregates, writer
+                )
+            except BaseException:
+                writer.abort()
+                raise
+            if not created:
+                writer.abort()
+            # Staged files are removed once the columns have been committed
+            session.delete()
+
+        return upload_response(dataset, created, session.filename, summary, flagged)
+
+
+# Functionality of retrieving the retained uploads for current user
 class DatasetHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
+        fields = requested_fields(request)
+
+        # Revalidation is answered from one aggregate query; unchanged
+        # listings are then served from the per-user response cache
+        etag = history_etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        data = response_cache.get(request.user.id, etag)
+        if data is None:
+            data = self._render(request, fields)
+            response_cache.set(request.user.id, etag, data)
+
+        return cacheable(Response(data, status=status.HTTP_200_OK), etag)
+
+    def _render(self, request, fields):
         # Filter by current user - each user sees only their own datasets
-        datasets = Dataset.objects.filter(user=request.user).order_by("-uploaded_at")[:5]
-        serializer = DatasetSerializer(datasets, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        datasets = Dataset.objects.filter(user=request.user)
+        if fields:
+            # uploaded_at orders the listing and keys the cursor
+            datasets = datasets.only("id", "uploaded_at", *fields)
 
+        # ?page_size= or ?cursor= switch to keyset pagination over all of the
+        # user's datasets; otherwise the retained datasets are listed
+        paginator = DatasetCursorPagination()
+        if {"page_size", "cursor"} & set(request.query_params):
+            page = paginator.paginate_queryset(datasets, request, view=self)
+            serializer = DatasetSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data).data
+
+        datasets = datasets.order_by("-uploaded_at", "-id")[:retention_limit()]
+        return DatasetSerializer(datasets, many=True, fields=fields).data
+
+
+# Functionality of retrieving one dataset's stored summary
+class DatasetDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, dataset_id):
+        fields = requested_fields(request)
+        try:
+            dataset = Dataset.objects.get(id=dataset_id, user=request.user)
+        except Dataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        etag = dataset_etag(dataset, request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        data = response_cache.get(request.user.id, etag)
+        if data is None:
+            data = DatasetSerializer(dataset, fields=fields).data
+            response_cache.set(request.user.id, etag, data)
+
+        return cacheable(Response(data, status=status.HTTP_200_OK), etag)
+
+
+# Functionality of comparing datasets and plotting trends across uploads
+class DatasetCompareView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Only the stored summaries and aggregates are read, never the CSVs
+        datasets = Dataset.objects.filter(user=request.user).only(*COMPARE_FIELDS)
+
+        ids = request.query_params.get("ids")
+        if ids:
+            try:
+                ids = {int(i) for i in ids.split(",") if i.strip()}
+            except ValueError:
+                return Response(
+                    {"error": "ids must be a comma-separated list of dataset ids"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Refused up front: a cut list would report real ids as missing
+            if len(ids) > settings.COMPARE_MAX_DATASETS:
+                return Response(
+                    {"error": f"At most {settings.COMPARE_MAX_DATASETS} datasets can be compared"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            datasets = datasets.filter(id__in=ids)
+
+        # Optional window over uploaded_at, as ISO dates or datetimes
+        for param, lookup in (("since", "uploaded_at__gte"), ("until", "uploaded_at__lte")):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            moment = self._parse_moment(value, end_of_day=param == "until")
+            if moment is None:
+                return Response(
+                    {"error": f"Invalid {param}: {value}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            datasets = datasets.filter(**{lookup: moment})
+
+        datasets = list(
+            datasets.order_by("-uploaded_at", "-id")[:settings.COMPARE_MAX_DATASETS]
+        )
+        if ids:
+            missing = ids - {dataset.id for dataset in datasets}
+            if missing:
+                return Response(
+                    {"error": "Dataset not found", "missing": sorted(missing)},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        return Response(compare_datasets(datasets), status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _parse_moment(value: str, end_of_day: bool = False):
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is None:
+                    return None
+                moment = datetime.combine(day, time.max if end_of_day else time.min)
+        except ValueError:
+            return None
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
 
 
 # Functionality of downloading PDF report
@@ -90,12 +818,72 @@ class DatasetPDFReportView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        pdf_path = generate_pdf_report(dataset)
+        # Reports are derived from the dataset as last updated, so the
+        # client's copy can be validated before anything is rendered
+        etag = report_etag(dataset)
+        last_modified = int(dataset.updated_at.timestamp())
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
 
-        return FileResponse(
-            open(pdf_path, "rb"),
+        # Cached reports are served directly; otherwise wait briefly for the
+        # background render and fall back to 202 so the client can poll.
+        # Rendering never runs on the request thread.
+        pdf = cached_report(dataset)
+        try:
+            if pdf is None:
+                job = schedule_report(dataset)
+                pdf = job.result(timeout=settings.REPORT_INLINE_WAIT_SECONDS)
+        except FutureTimeout:
+            response = Response(
+                {
+                    "status": "rendering",
+                    "status_url": reverse("dataset-report-status", args=[dataset_id]),
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+            response["Retry-After"] = "1"
+            return response
+        except Exception:
+            return Response(
+                {"error": "Report generation failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        if pdf is None:
+            # Deleted while the report was rendering
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        response = FileResponse(
+            io.BytesIO(pdf),
             content_type="application/pdf",
             as_attachment=True,
             filename=f"dataset_report_{dataset_id}.pdf",
         )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
 
+# Functionality of polling background PDF rendering
+class DatasetReportStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, dataset_id):
+        try:
+            dataset = Dataset.objects.get(id=dataset_id, user=request.user)
+        except Dataset.DoesNotExist:
+            return Response(
+                {"error": "Dataset not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(
+            {"dataset_id": dataset.id, "status": report_status(dataset)},
+            status=status.HTTP_200_OK
+        )
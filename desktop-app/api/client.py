@@ -3,17 +3,89 @@ API Client for Chemical Equipment Visualizer Backend
 Handles authentication and all API calls to Django backend.
 """
 
+from __future__ import annotations
+
 import os
+import gzip
+import json
+import time
+import hashlib
+import threading
 import requests
-from config import API_BASE_URL, AUTH_TOKEN_FILE
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    API_BASE_URL, AUTH_TOKEN_FILE, REPORT_POLL_TIMEOUT,
+    API_POOL_SIZE, API_RETRIES, API_RETRY_BACKOFF, API_TIMEOUT, API_UPLOAD_TIMEOUT,
+    API_UPLOAD_COMPRESS, API_UPLOAD_COMPRESS_MIN_BYTES, API_UPLOAD_ANOMALIES,
+    API_RESUMABLE_UPLOAD_MIN_BYTES, API_UPLOAD_RESUME_ATTEMPTS, RESUMABLE_UPLOADS_FILE,
+    LOCAL_STORE_FILE,
+)
+from api.local_store import LocalStore
+from api.multipart import MultipartFileBody
+
+
+class CancelledError(Exception):
+    """Raised inside an API call once its CancelToken has been cancelled."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag checked by long-running API calls."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
+
+    def sleep(self, seconds: float):
+        """Sleep for `seconds`, raising CancelledError as soon as cancelled."""
+        if self._event.wait(seconds):
+            raise CancelledError()
+
+
+def create_session() -> requests.Session:
+    """
+    A keep-alive session whose pool holds one connection per concurrent
+    request. Connection failures are retried for every method (nothing was
+    sent yet); read errors and 502/503/504 answers only for GETs, which are
+    safe to repeat.
+    """
+    retry = Retry(
+        total=API_RETRIES,
+        backoff_factor=API_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class APIClient:
-    """Handles all communication with the Django REST backend."""
+    """
+    Handles all communication with the Django REST backend. All calls share
+    one pooled session, so they may run on several threads at once.
+    """
 
     def __init__(self):
         self.base_url = API_BASE_URL
+        self.session = create_session()
         self.token = self._load_token()
+        # Last responses and reports, for revalidation and offline use
+        self.store = LocalStore(LOCAL_STORE_FILE)
+        self._uploads_lock = threading.Lock()
 
     def _load_token(self) -> str | None:
         """Load auth token from file if exists."""
@@ -41,6 +113,43 @@ class APIClient:
             headers["Authorization"] = f"Token {self.token}"
         return headers
 
+    def _get_revalidated(self, path: str, dataset_id: int | None = None):
+        """
+        GET `path`, sending the ETag of the stored response so an unchanged
+        resource comes back as an empty 304. Returns the response and its
+        decoded body (the stored one on 304). `dataset_id` ties the stored
+        copy to a dataset, for eviction.
+        """
+        headers = self._get_headers()
+        cached = self.store.get(path)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        response = self.session.get(f"{self.base_url}{path}", headers=headers, timeout=API_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return response, cached[1]
+        if response.status_code != 200:
+            return response, None
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self.store.put(path, etag, data, dataset_id)
+        return response, data
+
+    def _stored(self, path: str):
+        """Decoded body of the stored response for `path`, or None."""
+        cached = self.store.get(path)
+        return cached[1] if cached else None
+
+    def cached_history(self) -> list | None:
+        """History as last fetched, read from the local store without a request."""
+        return self._stored("/api/history/")
+
+    def cached_dataset(self, dataset_id: int) -> dict | None:
+        """A dataset summary as last fetched, without a request."""
+        return self._stored(f"/api/datasets/{dataset_id}/")
+
     def is_authenticated(self) -> bool:
         """Check if user has a stored token."""
         return self.token is not None
@@ -51,20 +160,24 @@ class APIClient:
         Returns (success, message).
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/auth/token/login/",
                 json={"username": username, "password": password},
                 headers={"Content-Type": "application/json"},
+                timeout=API_TIMEOUT,
             )
 
             if response.status_code == 200:
                 data = response.json()
                 self._save_token(data["auth_token"])
+                self.store.set_owner(username)
                 return True, "Login successful"
             else:
                 error = response.json().get("non_field_errors", ["Invalid credentials"])
                 return False, error[0] if isinstance(error, list) else str(error)
 
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
         except requests.exceptions.ConnectionError:
             return False, "Cannot connect to server. Is the backend running?"
         except Exception as e:
@@ -72,40 +185,238 @@ class APIClient:
 
     def logout(self) -> tuple[bool, str]:
         """Logout and clear stored token."""
+        # Clear locally first so a login made while this request is in
+        # flight is not wiped by it
+        headers = self._get_headers()
+        had_token = self.token is not None
+        self._clear_token()
         try:
-            if self.token:
-                requests.post(
+            if had_token:
+                self.session.post(
                     f"{self.base_url}/api/auth/token/logout/",
-                    headers=self._get_headers(),
+                    headers=headers,
+                    timeout=API_TIMEOUT,
                 )
-            self._clear_token()
             return True, "Logged out successfully"
         except Exception as e:
-            self._clear_token()
             return True, "Logged out (offline mode)"
 
-    def upload_csv(self, file_path: str) -> tuple[bool, dict | str]:
+    def upload_csv(
+        self, file_path: str, cancel: CancelToken | None = None, progress=None
+    ) -> tuple[bool, dict | str]:
         """
-        Upload a CSV file for analysis.
+        Upload a CSV file for analysis, streamed from disk and gzip-compressed
+        when large. `progress(sent, total)` receives the bytes sent so far.
+        Very large files go through `upload_csv_resumable`.
         Returns (success, data/error_message).
         """
         try:
-            with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f, "text/csv")}
-                headers = {"Authorization": f"Token {self.token}"}
+            if os.path.getsize(file_path) >= API_RESUMABLE_UPLOAD_MIN_BYTES:
+                return self.upload_csv_resumable(file_path, cancel=cancel, progress=progress)
+            compress = API_UPLOAD_COMPRESS and os.path.getsize(file_path) >= API_UPLOAD_COMPRESS_MIN_BYTES
+            with MultipartFileBody(
+                "file", file_path, compress=compress, progress=progress, cancel=cancel
+            ) as body:
+                headers = {
+                    "Authorization": f"Token {self.token}",
+                    "Content-Type": body.content_type,
+                }
 
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/api/upload/",
+                    params={"anomalies": API_UPLOAD_ANOMALIES},
+                    data=body,
+                    headers=headers,
+                    timeout=API_UPLOAD_TIMEOUT,
+                )
+
+            # 200 means the same file was already uploaded and is reused
+            if response.status_code in (200, 201):
+                return True, response.json()
+            else:
+                error = response.json().get("error", "Upload failed")
+                return False, error
+
+        except CancelledError:
+            return False, "Cancelled"
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
+        except requests.exceptions.ConnectionError:
+            return False, "Cannot connect to server"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def upload_csv_resumable(
+        self, file_path: str, cancel: CancelToken | None = None, progress=None
+    ) -> tuple[bool, dict | str]:
+        """
+        Upload a CSV in checksummed chunks: start an upload, PUT each chunk
+        at its byte offset, then finalize, which returns the same data as
+        `upload_csv`. The server analyzes chunks as they arrive.
+
+        After a network failure the upload carries on from the offset the
+        server has stored. A cancelled or failed upload is kept on the
+        server for a while, and uploading the same file again resumes it.
+        Returns (success, data/error_message).
+        """
+        cancel = cancel or CancelToken()
+        sent = {"offset": None}
+        failures = 0
+        while True:
+            offset = sent["offset"]
+            try:
+                return self._send_chunks(file_path, cancel, progress, sent)
+            except CancelledError:
+                return False, "Cancelled"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # Only failures in a row without progress count
+                failures = 1 if sent["offset"] != offset else failures + 1
+                if failures > API_UPLOAD_RESUME_ATTEMPTS:
+                    return False, "Cannot connect to server; upload again to resume"
+                try:
+                    cancel.sleep(API_RETRY_BACKOFF * 2 ** failures)
+                except CancelledError:
+                    return False, "Cancelled"
+            except Exception as e:
+                return False, f"Error: {str(e)}"
+
+    def _send_chunks(self, file_path: str, cancel: CancelToken, progress, sent: dict):
+        """One attempt of `upload_csv_resumable`; network errors propagate."""
+        size = os.path.getsize(file_path)
+        key = f"{os.path.abspath(file_path)}|{size}|{os.path.getmtime(file_path)}"
+        headers = {"Authorization": f"Token {self.token}"}
+
+        # Resume the upload of this exact file if the server still has it
+        state = None
+        upload_id = self._pending_uploads().get(key)
+        if upload_id:
+            response = self.session.get(
+                f"{self.base_url}/api/uploads/{upload_id}/", headers=headers, timeout=API_TIMEOUT
+            )
+            if response.status_code == 200:
+                state = response.json()
+        if state is None:
+            response = self.session.post(
+                f"{self.base_url}/api/uploads/",
+                json={"filename": os.path.basename(file_path), "size": size},
+                headers=headers,
+                timeout=API_TIMEOUT,
+            )
+            if response.status_code != 201:
+                return False, response.json().get("error", "Upload failed")
+            state = response.json()
+            self._remember_upload(key, state["upload_id"])
+
+        url = f"{self.base_url}/api/uploads/{state['upload_id']}/"
+        offset = sent["offset"] = state["offset"]
+        with open(file_path, "rb") as f:
+            while offset < size:
+                cancel.raise_if_cancelled()
+                f.seek(offset)
+                chunk = f.read(state["chunk_size"])
+                chunk_headers = {
+                    **headers,
+                    "Content-Type": "application/octet-stream",
+                    "Upload-Offset": str(offset),
+                    "Upload-Checksum": f"sha256 {hashlib.sha256(chunk).hexdigest()}",
+                }
+                if API_UPLOAD_COMPRESS:
+                    chunk = gzip.compress(chunk, compresslevel=6, mtime=0)
+                    chunk_headers["Content-Encoding"] = "gzip"
+
+                response = self.session.put(
+                    url, data=chunk, headers=chunk_headers, timeout=API_UPLOAD_TIMEOUT
+                )
+                # 409: the server holds a different offset; continue from it
+                if response.status_code not in (200, 409):
+                    self._forget_upload(key)
+                    return False, response.json().get("error", "Upload failed")
+                offset = sent["offset"] = response.json()["offset"]
+                if progress:
+                    progress(offset, size)
+
+        response = self.session.post(
+            f"{url}finalize/",
+            params={"anomalies": API_UPLOAD_ANOMALIES},
+            headers=headers,
+            timeout=API_UPLOAD_TIMEOUT,
+        )
+        self._forget_upload(key)
+        if response.status_code in (200, 201):
+            return True, response.json()
+        return False, response.json().get("error", "Upload failed")
+
+    def _pending_uploads(self) -> dict:
+        """Ids of unfinished resumable uploads, by file path, size and mtime."""
+        with self._uploads_lock:
+            try:
+                with open(RESUMABLE_UPLOADS_FILE, "r") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {}
+
+    def _update_pending_uploads(self, update):
+        with self._uploads_lock:
+            try:
+                with open(RESUMABLE_UPLOADS_FILE, "r") as f:
+                    pending = json.load(f)
+            except (OSError, ValueError):
+                pending = {}
+            update(pending)
+            with open(RESUMABLE_UPLOADS_FILE, "w") as f:
+                json.dump(pending, f)
+
+    def _remember_upload(self, key: str, upload_id: str):
+        self._update_pending_uploads(lambda pending: pending.__setitem__(key, upload_id))
+
+    def _forget_upload(self, key: str):
+        self._update_pending_uploads(lambda pending: pending.pop(key, None))
+
+    def upload_batch(
+        self, file_paths: list[str], cancel: CancelToken | None = None
+    ) -> tuple[bool, dict | str]:
+        """
+        Upload several CSV files (or zip archives of CSVs) in one request;
+        the server analyzes them concurrently.
+        Returns (success, data/error_message); data holds per-file results
+        under "files" and the combined summary under "rollup".
+        """
+        try:
+            if cancel:
+                cancel.raise_if_cancelled()
+            handles = [open(path, "rb") for path in file_paths]
+            try:
+                files = [
+                    ("files", (
+                        os.path.basename(path),
+                        f,
+                        "application/zip" if path.lower().endswith(".zip") else "text/csv",
+                    ))
+                    for path, f in zip(file_paths, handles)
+                ]
+                headers = {"Authorization": f"Token {self.token}"}
+
+                response = self.session.post(
+                    f"{self.base_url}/api/upload/batch/",
                     files=files,
                     headers=headers,
+                    timeout=API_UPLOAD_TIMEOUT,
                 )
+            finally:
+                for f in handles:
+                    f.close()
 
-            if response.status_code == 201:
+            # 200 means every file was already uploaded or failed analysis
+            if response.status_code in (200, 201):
                 return True, response.json()
             else:
                 error = response.json().get("error", "Upload failed")
                 return False, error
 
+        except CancelledError:
+            return False, "Cancelled"
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
         except requests.exceptions.ConnectionError:
             return False, "Cannot connect to server"
         except Exception as e:
@@ -117,46 +428,158 @@ class APIClient:
         Returns (success, data/error_message).
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/api/history/",
+            response, data = self._get_revalidated("/api/history/")
+
+            if response.status_code == 200:
+                # The listing holds every retained dataset; drop the rest
+                self.store.retain_datasets(dataset["id"] for dataset in data)
+            if data is not None:
+                return True, data
+            else:
+                return False, "Failed to fetch history"
+
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
+        except requests.exceptions.ConnectionError:
+            return False, "Cannot connect to server"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def get_dataset(self, dataset_id: int) -> tuple[bool, dict | str]:
+        """
+        Get the stored summary of one dataset.
+        Returns (success, data/error_message).
+        """
+        try:
+            response, data = self._get_revalidated(
+                f"/api/datasets/{dataset_id}/", dataset_id=dataset_id
+            )
+
+            if data is not None:
+                return True, data
+            elif response.status_code == 404:
+                self.store.forget_dataset(dataset_id)
+                return False, "Dataset not found"
+            else:
+                return False, "Failed to fetch dataset"
+
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
+        except requests.exceptions.ConnectionError:
+            return False, "Cannot connect to server"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    def compare_datasets(
+        self, ids: list[int] | None = None, since: str | None = None, until: str | None = None
+    ) -> tuple[bool, dict | str]:
+        """
+        Get aligned per-type metric series across datasets, selected by id
+        or by an upload window (ISO dates); all retained datasets by default.
+        Returns (success, data/error_message).
+        """
+        params = {}
+        if ids:
+            params["ids"] = ",".join(str(i) for i in ids)
+        if since:
+            params["since"] = since
+        if until:
+            params["until"] = until
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/datasets/compare/",
+                params=params,
                 headers=self._get_headers(),
+                timeout=API_TIMEOUT,
             )
 
             if response.status_code == 200:
                 return True, response.json()
             else:
-                return False, "Failed to fetch history"
+                return False, response.json().get("error", "Failed to compare datasets")
 
+        except requests.exceptions.ReadTimeout:
+            return False, "Server did not respond in time"
         except requests.exceptions.ConnectionError:
             return False, "Cannot connect to server"
         except Exception as e:
             return False, f"Error: {str(e)}"
 
-    def download_report(self, dataset_id: int, save_path: str) -> tuple[bool, str]:
+    def download_report(
+        self, dataset_id: int, save_path: str, cancel: CancelToken | None = None
+    ) -> tuple[bool, str]:
         """
-        Download PDF report for a dataset.
+        Download PDF report for a dataset. Cancelling stops polling or the
+        transfer between chunks and leaves no partial file behind. A report
+        downloaded before is revalidated, and saved from the local store
+        when unchanged or when the server cannot be reached.
         Returns (success, message).
         """
+        cancel = cancel or CancelToken()
+        cached = self.store.get_report(dataset_id)
+        headers = self._get_headers()
+        if cached:
+            headers["If-None-Match"] = cached[0]
         try:
-            response = requests.get(
-                f"{self.base_url}/api/report/{dataset_id}/",
-                headers=self._get_headers(),
-                stream=True,
-            )
+            # 202 means the server is still rendering; poll until it is ready
+            deadline = time.monotonic() + REPORT_POLL_TIMEOUT
+            while True:
+                cancel.raise_if_cancelled()
+                response = self.session.get(
+                    f"{self.base_url}/api/report/{dataset_id}/",
+                    headers=headers,
+                    stream=True,
+                    timeout=API_TIMEOUT,
+                )
+                if response.status_code != 202 or time.monotonic() >= deadline:
+                    break
+                response.close()
+                cancel.sleep(float(response.headers.get("Retry-After", 1)))
 
             if response.status_code == 200:
-                with open(save_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                pdf = []
+                try:
+                    with open(save_path, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=8192):
+                            cancel.raise_if_cancelled()
+                            f.write(chunk)
+                            pdf.append(chunk)
+                except CancelledError:
+                    response.close()
+                    os.remove(save_path)
+                    raise
+                etag = response.headers.get("ETag")
+                if etag:
+                    self.store.put_report(dataset_id, etag, b"".join(pdf))
+                return True, f"Report saved to {save_path}"
+            elif response.status_code == 304 and cached:
+                self._write_report(save_path, cached[1])
                 return True, f"Report saved to {save_path}"
+            elif response.status_code == 202:
+                return False, "Report is still being generated, try again shortly"
+            elif response.status_code == 404:
+                self.store.forget_dataset(dataset_id)
+                return False, "Dataset not found"
             else:
                 return False, "Failed to download report"
 
-        except requests.exceptions.ConnectionError:
+        except CancelledError:
+            return False, "Cancelled"
+        except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as e:
+            if cached:
+                self._write_report(save_path, cached[1])
+                return True, f"Report saved to {save_path} (offline copy)"
+            if isinstance(e, requests.exceptions.ReadTimeout):
+                return False, "Server did not respond in time"
             return False, "Cannot connect to server"
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+    def _write_report(self, save_path: str, pdf: bytes):
+        with open(save_path, "wb") as f:
+            f.write(pdf)
+
 
 # Global API client instance
 api_client = APIClient()
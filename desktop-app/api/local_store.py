@@ -0,0 +1,132 @@
+"""
+Local offline store of API responses and downloaded reports.
+
+A SQLite database in the user profile keeps the last response of each
+revalidated GET (history listing, dataset summaries) with its ETag, and
+the PDF of each downloaded report. The UI renders from it straight away
+while the client revalidates in the background, and falls back to it
+read-only when the backend cannot be reached.
+
+The store belongs to one user at a time: logging in as someone else
+empties it. Datasets that disappear from the server's history listing
+(pruned by the retention limit or deleted) are evicted with their reports.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    path TEXT PRIMARY KEY,
+    etag TEXT NOT NULL,
+    body TEXT NOT NULL,
+    dataset_id INTEGER,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_dataset ON responses (dataset_id);
+CREATE TABLE IF NOT EXISTS reports (
+    dataset_id INTEGER PRIMARY KEY,
+    etag TEXT NOT NULL,
+    pdf BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class LocalStore:
+    """Thread-safe SQLite store shared by the API calls of the thread pool."""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def set_owner(self, username: str):
+        """Makes `username` the owner, dropping another user's data."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'owner'").fetchone()
+            if row and row[0] == username:
+                return
+            with self._db:
+                self._db.execute("BEGIN")
+                self._clear()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('owner', ?)", (username,)
+                )
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._clear()
+
+    def _clear(self):
+        self._db.execute("DELETE FROM responses")
+        self._db.execute("DELETE FROM reports")
+        self._db.execute("DELETE FROM meta")
+
+    def get(self, path: str) -> tuple[str, object] | None:
+        """The (ETag, decoded body) stored for `path`, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, body FROM responses WHERE path = ?", (path,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put(self, path: str, etag: str, data, dataset_id: int | None = None):
+        """Stores a response; `dataset_id` ties it to a dataset for eviction."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (path, etag, body, dataset_id, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (path, etag, json.dumps(data), dataset_id, time.time()),
+            )
+
+    def get_report(self, dataset_id: int) -> tuple[str, bytes] | None:
+        """The (ETag, PDF bytes) of a downloaded report, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, pdf FROM reports WHERE dataset_id = ?", (dataset_id,)
+            ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def put_report(self, dataset_id: int, etag: str, pdf: bytes):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports (dataset_id, etag, pdf, fetched_at)"
+                " VALUES (?, ?, ?, ?)",
+                (dataset_id, etag, pdf, time.time()),
+            )
+
+    def forget_dataset(self, dataset_id: int):
+        """Evicts one dataset's summary and report (deleted on the server)."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM responses WHERE dataset_id = ?", (dataset_id,))
+            self._db.execute("DELETE FROM reports WHERE dataset_id = ?", (dataset_id,))
+
+    def retain_datasets(self, dataset_ids):
+        """Evicts every dataset not in `dataset_ids`, the server's retained set."""
+        ids = json.dumps(sorted(set(dataset_ids)))
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "DELETE FROM responses WHERE dataset_id IS NOT NULL"
+                " AND dataset_id NOT IN (SELECT value FROM json_each(?))",
+                (ids,),
+            )
+            self._db.execute(
+                "DELETE FROM reports WHERE dataset_id NOT IN (SELECT value FROM json_each(?))",
+                (ids,),
+            )
@@ -0,0 +1,144 @@
+"""
+Background execution of APIClient calls, so network requests never block
+the Qt event loop. Calls run on a QThreadPool and report back through Qt
+signals, which are delivered on the GUI thread.
+"""
+
+from __future__ import annotations
+
+import inspect
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from api.client import CancelledError, CancelToken
+from config import API_MAX_CONCURRENT_REQUESTS
+
+
+class TaskSignals(QObject):
+    """Signals of one ApiTask."""
+
+    # (success, data or error message), as returned by APIClient methods
+    finished = pyqtSignal(bool, object)
+    cancelled = pyqtSignal()
+    # (bytes done, bytes total) from calls taking a `progress` callback
+    progress = pyqtSignal(object, object)
+
+
+class ApiTask(QRunnable):
+    """
+    One APIClient call on the thread pool. Methods taking a `cancel`
+    argument are handed the task's CancelToken so they can stop early;
+    for the others a cancelled task just drops its result. Methods taking
+    a `progress` callback report through the `progress` signal.
+    """
+
+    def __init__(self, fn, args: tuple, kwargs: dict):
+        super().__init__()
+        # The runner keeps a reference until the task reports back
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancelToken()
+        self.signals = TaskSignals()
+        parameters = inspect.signature(fn).parameters
+        if "cancel" in parameters:
+            self.kwargs["cancel"] = self.token
+        if "progress" in parameters:
+            self.kwargs["progress"] = self.signals.progress.emit
+
+    def cancel(self):
+        """Request cancellation; `cancelled` is emitted instead of `finished`."""
+        self.token.cancel()
+
+    def run(self):
+        success, result = False, "Cancelled"
+        if not self.token.cancelled:
+            try:
+                success, result = self.fn(*self.args, **self.kwargs)
+            except CancelledError:
+                pass
+            except Exception as e:
+                success, result = False, f"Error: {str(e)}"
+
+        if self.token.cancelled:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(success, result)
+
+
+class ApiRunner(QObject):
+    """
+    Runs APIClient calls on a bounded thread pool, several at a time.
+    A call submitted with a `key` replaces (cancels) any pending call with
+    the same key, so e.g. repeated refreshes only deliver the latest result.
+    """
+
+    def __init__(self, max_concurrent: int = API_MAX_CONCURRENT_REQUESTS, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_concurrent)
+        self._tasks = set()
+        self._keyed = {}
+
+    def submit(self, fn, *args, key: str | None = None,
+               on_finished=None, on_cancelled=None, on_progress=None, **kwargs) -> ApiTask:
+        """
+        Run `fn(*args, **kwargs)` in the background. `on_finished` receives
+        (success, data/error_message); `on_cancelled` is called instead if
+        the task is cancelled. `on_progress` receives (done, total).
+        """
+        if key is not None:
+            self.cancel(key)
+
+        task = ApiTask(fn, args, kwargs)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        if on_cancelled:
+            task.signals.cancelled.connect(on_cancelled)
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        task.signals.finished.connect(lambda *_: self._forget(task, key))
+        task.signals.cancelled.connect(lambda: self._forget(task, key))
+
+        self._tasks.add(task)
+        if key is not None:
+            self._keyed[key] = task
+        self._pool.start(task)
+        return task
+
+    def is_running(self, key: str) -> bool:
+        """Whether a call submitted under `key` has not reported back yet."""
+        return key in self._keyed
+
+    def cancel(self, key: str):
+        """Cancel the pending call submitted under `key`, if any."""
+        task = self._keyed.pop(key, None)
+        if task is not None:
+            self._cancel(task)
+
+    def cancel_all(self):
+        """Cancel every pending call."""
+        self._keyed.clear()
+        for task in list(self._tasks):
+            self._cancel(task)
+
+    def shutdown(self, timeout_ms: int = 2000):
+        """Cancel every call and wait briefly for running ones to stop."""
+        self.cancel_all()
+        self._pool.waitForDone(timeout_ms)
+
+    def _cancel(self, task: ApiTask):
+        task.cancel()
+        # Calls still queued never start; report them cancelled right away
+        if self._pool.tryTake(task):
+            task.signals.cancelled.emit()
+
+    def _forget(self, task: ApiTask, key: str | None):
+        self._tasks.discard(task)
+        if key is not None and self._keyed.get(key) is task:
+            del self._keyed[key]
+
+
+# Global API task runner instance
+api_tasks = ApiRunner()
@@ -0,0 +1,114 @@
+"""
+Benchmark: per-request latency of the desktop APIClient, one connection per
+call (module-level requests.get, as before) vs the pooled keep-alive session.
+
+Runs a local HTTP/1.1 stand-in for /api/history/ that answers with a small
+JSON body. --handshake-ms delays every new connection on the server side to
+stand in for the TCP + TLS setup of a remote production host. Reports the
+median latency of sequential calls and the throughput of --threads callers.
+
+    python benchmarks/bench_session.py --requests 500 --handshake-ms 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.client import APIClient  # noqa: E402
+
+BODY = json.dumps([
+    {"id": i, "filename": f"batch_{i}.csv", "total_equipment": 15,
+     "avg_flowrate": 119.8, "avg_pressure": 6.11, "avg_temperature": 117.47}
+    for i in range(5)
+]).encode()
+
+
+def serve(handshake_ms: float) -> ThreadingHTTPServer:
+    connections = 0
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; without this Nagle's
+        # algorithm stalls every kept-alive response on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            nonlocal connections
+            connections += 1
+            time.sleep(handshake_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    server.connections = lambda: connections
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = serve(args.handshake_ms)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    client = APIClient()
+    client.base_url = base_url
+    client.token = "bench"
+
+    def per_call():
+        response = requests.get(f"{base_url}/api/history/", headers=client._get_headers())
+        return response.json()
+
+    def pooled():
+        success, data = client.get_history()
+        assert success, data
+        return data
+
+    print(f"{'client':<26} {'p50 ms':>8} {'p95 ms':>8} {'req/s x' + str(args.threads):>12} {'connections':>12}")
+    for label, call in (("requests.get per call", per_call), ("pooled session", pooled)):
+        call()  # warm up
+        opened = server.connections()
+        timings = []
+        for _ in range(args.requests):
+            begin = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - begin)
+
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(lambda _: call(), range(args.requests)))
+        throughput = args.requests / (time.perf_counter() - begin)
+
+        timings.sort()
+        print(f"{label:<26} {statistics.median(timings) * 1000:>8.2f} "
+              f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f} {throughput:>12.0f} "
+              f"{server.connections() - opened:>12}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,45 @@
+import os
+
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
 AUTH_TOKEN_FILE = ".auth_token"
+
+# Seconds to keep polling while the server renders a PDF report
+REPORT_POLL_TIMEOUT = 60
+
+# API calls run on a background thread pool; at most this many at once
+API_MAX_CONCURRENT_REQUESTS = 4
+
+# Pooled HTTP session: kept-alive connections per host (matches the thread
+# pool), retries of failed connects and idempotent GETs with exponential
+# backoff (API_RETRY_BACKOFF * 2^n seconds), and (connect, read) timeouts in
+# seconds. Uploads wait longer for the server to finish analyzing the file.
+API_POOL_SIZE = API_MAX_CONCURRENT_REQUESTS
+API_RETRIES = 3
+API_RETRY_BACKOFF = 0.5
+API_TIMEOUT = (5, 30)
+API_UPLOAD_TIMEOUT = (5, 300)
+
+# Single-file uploads of at least this many bytes are gzip-compressed
+# before sending (set API_UPLOAD_COMPRESS = False for servers without
+# gzip upload support)
+API_UPLOAD_COMPRESS = True
+API_UPLOAD_COMPRESS_MIN_BYTES = 256 * 1024
+
+# Outlier detection run on single-file uploads ("mad", "iqr" or "none");
+# flagged readings are listed under the charts
+API_UPLOAD_ANOMALIES = "mad"
+
+# Files of at least this many bytes go up in resumable, checksummed chunks.
+# After a network failure the upload continues from the offset the server
+# has stored, giving up after this many attempts in a row without progress;
+# the ids of unfinished uploads are kept in RESUMABLE_UPLOADS_FILE so they
+# can also resume after the app restarts
+API_RESUMABLE_UPLOAD_MIN_BYTES = 64 * 1024 * 1024
+API_UPLOAD_RESUME_ATTEMPTS = 5
+RESUMABLE_UPLOADS_FILE = ".resumable_uploads.json"
+
+# Offline store of history, dataset summaries and downloaded reports in the
+# user profile; the UI renders from it and it serves read-only when the
+# backend cannot be reached
+LOCAL_STORE_FILE = os.path.join(os.path.expanduser("~"), ".chemviz", "offline.sqlite3")
@@ -4,7 +4,8 @@ Charts Page - Data visualization with matplotlib
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QFrame, QGridLayout, QScrollArea, QPushButton
+    QFrame, QGridLayout, QScrollArea, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
@@ -184,6 +185,34 @@ class ChartWidget(QFrame):
         self.figure.tight_layout(pad=2.0)
         self.canvas.draw()
 
+    def plot_trend(self, labels: list, series: dict, ylabel: str = ""):
+        """Plot one line per series across datasets; None values leave gaps."""
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+
+        # Style
+        ax.set_facecolor('#0a0e1a')
+        ax.tick_params(colors='#f0f4f8', labelsize=10)
+        ax.spines['bottom'].set_color('#334155')
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color('#334155')
+
+        colors = ['#63caff', '#34d399', '#fbbf24', '#fb7185', '#a78bfa', '#38bdf8']
+        x = np.arange(len(labels))
+        for i, (name, values) in enumerate(series.items()):
+            y = np.array([np.nan if v is None else v for v in values], dtype=float)
+            ax.plot(x, y, marker='o', linewidth=2, label=name,
+                    color=colors[i % len(colors)])
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=30, ha='right', fontsize=9)
+        ax.set_ylabel(ylabel, color='#94a3b8', fontsize=11)
+        ax.legend(loc='upper left', frameon=False, labelcolor='#f0f4f8', fontsize=9)
+
+        self.figure.tight_layout(pad=2.0)
+        self.canvas.draw()
+
     def plot_horizontal_bar(self, data: dict):
         """Plot a horizontal bar chart (ranking)."""
         self.figure.clear()
@@ -223,6 +252,49 @@ class ChartWidget(QFrame):
         self.canvas.draw()
 
 
+class AnomalyTable(QFrame):
+    """Card listing the readings flagged as out of envelope for their type."""
+
+    COLUMNS = ["Equipment", "Type", "Reading", "Value", "Score"]
+
+    def __init__(self, anomalies: dict):
+        super().__init__()
+        self.setObjectName("chartCard")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 15, 20, 20)
+
+        rows = anomalies.get("rows", [])
+        total = anomalies.get("total_flagged", len(rows))
+        title = f"Flagged Readings ({total})"
+        if anomalies.get("truncated"):
+            title = f"Flagged Readings (top {len(rows)} of {total})"
+        title_label = QLabel(title)
+        title_label.setObjectName("chartTitle")
+        title_label.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
+        layout.addWidget(title_label)
+
+        # One line per flagged reading, most severe equipment first
+        readings = [
+            (row["equipment"], row["type"], column, reading)
+            for row in rows
+            for column, reading in row["readings"].items()
+        ]
+        table = QTableWidget(len(readings), len(self.COLUMNS))
+        table.setObjectName("anomalyTable")
+        table.setHorizontalHeaderLabels(self.COLUMNS)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        for i, (equipment, eq_type, column, reading) in enumerate(readings):
+            values = [equipment, eq_type, column, f"{reading['value']:g}", f"{reading['score']:+.2f}"]
+            for j, value in enumerate(values):
+                table.setItem(i, j, QTableWidgetItem(value))
+        table.setMinimumHeight(min(320, 40 + 32 * len(readings)))
+        layout.addWidget(table)
+
+
 class ChartsPage(QWidget):
     """Page displaying analysis charts and statistics."""
 
@@ -371,6 +443,12 @@ class ChartsPage(QWidget):
             no_data_label.setObjectName("pageDescription")
             self.charts_grid.addWidget(no_data_label, 0, 0, 1, 2)
 
+        # Readings flagged by the upload's outlier detection, full width
+        anomalies = data.get("anomalies")
+        if anomalies and anomalies.get("rows"):
+            row = self.chart_row + 1 if self.chart_col else self.chart_row
+            self.charts_grid.addWidget(AnomalyTable(anomalies), row, 0, 1, 2)
+
     def display_from_history(self, dataset: dict):
         """Display results from a history dataset."""
         self.clear_charts()
@@ -393,7 +471,8 @@ class ChartsPage(QWidget):
         type_dist = dataset.get("type_distribution", {})
         type_metrics = dataset.get("type_metrics", {})
         
-        # Generate type_metrics if not provided
+        # Datasets stored before per-type metrics were persisted only have
+        # the global averages; use those for every type
         if type_dist and not type_metrics:
             type_metrics = {}
             for eq_type, count in type_dist.items():
@@ -423,3 +502,49 @@ class ChartsPage(QWidget):
             ranking_chart = ChartWidget("Equipment Ranking")
             ranking_chart.plot_horizontal_bar(type_dist)
             self.add_chart_to_grid(ranking_chart)
+
+    def display_trends(self, data: dict):
+        """Display per-type metric trends from the dataset comparison API."""
+        self.clear_charts()
+
+        datasets = data.get("datasets", [])
+        self.description.setText(f"Trends across {len(datasets)} datasets (oldest first)")
+
+        overall = data.get("overall", {})
+        totals = overall.get("total_equipment", [])
+        stats = [
+            ("Datasets", str(len(datasets)), "🗂️"),
+            ("Equipment Types", str(len(data.get("types", []))), "🏷️"),
+            ("Latest Total", str(totals[-1] if totals else 0), "🔧"),
+            ("First Total", str(totals[0] if totals else 0), "📈"),
+        ]
+
+        for i, (title, value, icon) in enumerate(stats):
+            card = StatCard(title, value, icon)
+            self.stats_grid.addWidget(card, 0, i)
+
+        series = data.get("series", {})
+        if not series:
+            no_data_label = QLabel("No equipment type data available")
+            no_data_label.setObjectName("pageDescription")
+            self.charts_grid.addWidget(no_data_label, 0, 0, 1, 2)
+            return
+
+        labels = [
+            f"{d.get('filename', '')}\n{str(d.get('uploaded_at', ''))[:10]}"
+            for d in datasets
+        ]
+        charts = [
+            ("Equipment Count by Type", "count", "Count"),
+            ("Avg Flowrate by Type", "avg_flowrate", "Flowrate"),
+            ("Avg Pressure by Type", "avg_pressure", "Pressure"),
+            ("Avg Temperature by Type", "avg_temperature", "Temperature"),
+        ]
+        for title, stat, ylabel in charts:
+            chart = ChartWidget(title)
+            chart.plot_trend(
+                labels,
+                {eq_type: values[stat] for eq_type, values in series.items()},
+                ylabel=ylabel,
+            )
+            self.add_chart_to_grid(chart)
@@ -12,6 +12,7 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from api import api_client
+from api.tasks import api_tasks
 
 
 class DatasetCard(QFrame):
@@ -85,9 +86,13 @@ class HistoryPage(QWidget):
     """Page displaying history of uploaded datasets."""
     
     view_dataset = pyqtSignal(dict)
+    view_trends = pyqtSignal(dict)
 
     def __init__(self):
         super().__init__()
+        # Listing currently shown (None until one has been loaded)
+        self.datasets = None
+        self.dataset_ids = []
         self.setup_ui()
 
     def setup_ui(self):
@@ -110,6 +115,13 @@ class HistoryPage(QWidget):
         refresh_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         refresh_btn.clicked.connect(self.load_history)
         header_row.addWidget(refresh_btn)
+
+        self.compare_btn = QPushButton("Compare Trends")
+        self.compare_btn.setObjectName("secondaryButton")
+        self.compare_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.compare_btn.setEnabled(False)
+        self.compare_btn.clicked.connect(self.on_compare)
+        header_row.addWidget(self.compare_btn)
         
         layout.addLayout(header_row)
 
@@ -138,41 +150,104 @@ class HistoryPage(QWidget):
         layout.addWidget(self.status_label)
 
     def load_history(self):
-        """Fetch and display dataset history."""
-        # Clear existing cards
-        while self.cards_layout.count() > 1:  # Keep the stretch
-            item = self.cards_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        self.status_label.hide()
+        """
+        Show the locally stored history at once, then revalidate it in the
+        background; a new refresh replaces a pending one.
+        """
+        cached = api_client.cached_history()
+        if cached is not None:
+            self.show_datasets(cached)
+        else:
+            # Nothing stored (e.g. another user logged in): show no cards
+            self.clear_cards()
+            self.status_label.setText("Loading...")
+            self.status_label.setObjectName("hintLabel")
+            self.status_label.show()
+            self.style().polish(self.status_label)
 
-        success, result = api_client.get_history()
+        api_tasks.submit(api_client.get_history, key="history", on_finished=self.on_history_loaded)
 
+    def on_history_loaded(self, success: bool, result):
+        """Display the revalidated history, or keep the stored one when offline."""
         if success:
-            if not result:
-                self.status_label.setText("No datasets uploaded yet.")
-                self.status_label.setObjectName("hintLabel")
-                self.status_label.show()
-            else:
-                for dataset in result:
-                    card = DatasetCard(dataset)
-                    card.view_clicked.connect(self.on_view_dataset)
-                    card.download_clicked.connect(self.on_download_pdf)
-                    self.cards_layout.insertWidget(
-                        self.cards_layout.count() - 1, card
-                    )
+            self.show_datasets(result)
+            return
+
+        if self.datasets is not None:
+            # Read-only offline mode: stored summaries and reports stay
+            # viewable, comparing needs the server
+            self.compare_btn.setEnabled(False)
+            self.status_label.setText(f"Offline, showing saved datasets ({result})")
+            self.status_label.setObjectName("hintLabel")
+            self.status_label.show()
         else:
             self.status_label.setText(f"Error: {result}")
             self.status_label.setObjectName("errorLabel")
             self.status_label.show()
-        
+
         self.style().polish(self.status_label)
 
+    def clear_cards(self):
+        """Remove every dataset card."""
+        self.datasets = None
+        self.dataset_ids = []
+        self.compare_btn.setEnabled(False)
+        while self.cards_layout.count() > 1:  # Keep the stretch
+            item = self.cards_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+    def show_datasets(self, datasets: list):
+        """Show a listing; the cards are only rebuilt when it changed."""
+        if datasets:
+            self.status_label.hide()
+        else:
+            self.status_label.setText("No datasets uploaded yet.")
+            self.status_label.setObjectName("hintLabel")
+            self.status_label.show()
+            self.style().polish(self.status_label)
+        self.compare_btn.setEnabled(len(datasets) > 1)
+        if datasets == self.datasets:
+            return
+
+        self.clear_cards()
+        self.datasets = datasets
+        self.dataset_ids = [dataset["id"] for dataset in datasets]
+        self.compare_btn.setEnabled(len(datasets) > 1)
+
+        for dataset in datasets:
+            card = DatasetCard(dataset)
+            card.view_clicked.connect(self.on_view_dataset)
+            card.download_clicked.connect(self.on_download_pdf)
+            self.cards_layout.insertWidget(
+                self.cards_layout.count() - 1, card
+            )
+
     def on_view_dataset(self, dataset: dict):
         """Handle view charts button click."""
         self.view_dataset.emit(dataset)
 
+    def on_compare(self):
+        """Fetch trend series for the listed datasets in one request."""
+        self.compare_btn.setEnabled(False)
+        api_tasks.submit(
+            api_client.compare_datasets, self.dataset_ids,
+            key="compare",
+            on_finished=self.on_compare_finished,
+        )
+
+    def on_compare_finished(self, success: bool, result):
+        """Show the trend series, or the error."""
+        self.compare_btn.setEnabled(len(self.dataset_ids) > 1)
+
+        if success:
+            self.view_trends.emit(result)
+        else:
+            QMessageBox.warning(
+                self, "Error",
+                f"Failed to compare datasets:\n{result}"
+            )
+
     def on_download_pdf(self, dataset_id: int):
         """Handle download PDF button click."""
         if not dataset_id:
@@ -189,8 +264,15 @@ class HistoryPage(QWidget):
         if not save_path:
             return
 
-        success, message = api_client.download_report(dataset_id, save_path)
+        # Downloads of different reports run side by side
+        api_tasks.submit(
+            api_client.download_report, dataset_id, save_path,
+            key=f"report-{dataset_id}",
+            on_finished=lambda success, message: self.on_download_finished(success, message, save_path),
+        )
 
+    def on_download_finished(self, success: bool, message: str, save_path: str):
+        """Report the outcome of a PDF download."""
         if success:
             QMessageBox.information(
                 self, "Success", 
@@ -10,6 +10,7 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from api import api_client
+from api.tasks import api_tasks
 
 
 class LoginPage(QWidget):
@@ -105,21 +106,33 @@ class LoginPage(QWidget):
         if not username or not password:
             self.show_error("Please enter both username and password")
             return
+        if api_tasks.is_running("login"):
+            return
 
         # Disable button during login
         self.login_btn.setEnabled(False)
         self.login_btn.setText("Signing in...")
 
-        # Attempt login
-        success, message = api_client.login(username, password)
+        # Attempt login in the background
+        api_tasks.submit(
+            api_client.login, username, password,
+            key="login",
+            on_finished=self.on_login_finished,
+            on_cancelled=self.reset_button,
+        )
 
+    def on_login_finished(self, success: bool, message: str):
+        """Handle the login response."""
         if success:
             self.error_label.hide()
             self.login_successful.emit()
         else:
             self.show_error(message)
 
-        # Re-enable button
+        self.reset_button()
+
+    def reset_button(self):
+        """Re-enable the login button."""
         self.login_btn.setEnabled(True)
         self.login_btn.setText("Sign In")
 
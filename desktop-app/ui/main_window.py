@@ -10,6 +10,7 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
 from api import api_client
+from api.tasks import api_tasks
 from ui.login_page import LoginPage
 from ui.upload_page import UploadPage
 from ui.charts_page import ChartsPage
@@ -116,6 +117,7 @@ class MainWindow(QMainWindow):
 
         self.history_page = HistoryPage()
         self.history_page.view_dataset.connect(self.on_view_from_history)
+        self.history_page.view_trends.connect(self.on_view_trends)
         self.stack.addWidget(self.history_page)
 
         content_layout.addWidget(self.stack)
@@ -164,7 +166,19 @@ class MainWindow(QMainWindow):
         self.charts_page.display_from_history(dataset)
         self.switch_page(1)  # Switch to charts
 
+    def on_view_trends(self, data: dict):
+        """View metric trends across history datasets."""
+        self.charts_page.display_trends(data)
+        self.switch_page(1)  # Switch to charts
+
     def handle_logout(self):
         """Handle logout button click."""
-        api_client.logout()
+        # Results of the old session's requests are no longer wanted
+        api_tasks.cancel_all()
+        api_tasks.submit(api_client.logout)
         self.show_login()
+
+    def closeEvent(self, event):
+        """Stop background requests before the window closes."""
+        api_tasks.shutdown()
+        super().closeEvent(event)
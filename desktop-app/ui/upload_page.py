@@ -2,21 +2,28 @@
 Upload Page - CSV file upload interface
 """
 
+from __future__ import annotations
+
 import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QFrame, QFileDialog, QScrollArea
+    QPushButton, QFrame, QFileDialog, QScrollArea, QProgressBar,
+    QMessageBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QDragEnterEvent, QDropEvent
 
 from api import api_client
+from api.tasks import api_tasks
+
+
+UPLOAD_EXTENSIONS = ('.csv', '.zip')
 
 
 class DropZone(QFrame):
     """Drag and drop zone for CSV files - also clickable."""
     
-    file_dropped = pyqtSignal(str)
+    files_dropped = pyqtSignal(list)
     clicked = pyqtSignal()  # Signal for click to browse
 
     def __init__(self):
@@ -35,7 +42,7 @@ class DropZone(QFrame):
         icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(icon)
 
-        text = QLabel("Drag & drop CSV file here")
+        text = QLabel("Drag & drop CSV files or a zip archive here")
         text.setObjectName("dropZoneText")
         text.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(text)
@@ -52,8 +59,8 @@ class DropZone(QFrame):
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
-            url = event.mimeData().urls()[0]
-            if url.toLocalFile().endswith('.csv'):
+            paths = [url.toLocalFile() for url in event.mimeData().urls()]
+            if any(path.lower().endswith(UPLOAD_EXTENSIONS) for path in paths):
                 event.acceptProposedAction()
                 self.setProperty("dragOver", True)
                 self.style().polish(self)
@@ -66,10 +73,10 @@ class DropZone(QFrame):
         self.setProperty("dragOver", False)
         self.style().polish(self)
         
-        url = event.mimeData().urls()[0]
-        file_path = url.toLocalFile()
-        if file_path.endswith('.csv'):
-            self.file_dropped.emit(file_path)
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        paths = [path for path in paths if path.lower().endswith(UPLOAD_EXTENSIONS)]
+        if paths:
+            self.files_dropped.emit(paths)
 
 
 class UploadPage(QWidget):
@@ -79,7 +86,7 @@ class UploadPage(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.selected_file = None
+        self.selected_files = []
         self.setup_ui()
 
     def setup_ui(self):
@@ -93,7 +100,10 @@ class UploadPage(QWidget):
         header.setFont(QFont("Segoe UI", 24, QFont.Weight.Bold))
         layout.addWidget(header)
 
-        description = QLabel("Upload a CSV file containing chemical equipment data for analysis.")
+        description = QLabel(
+            "Upload a CSV file containing chemical equipment data for analysis. "
+            "Select several files or a zip archive to upload a batch."
+        )
         description.setObjectName("pageDescription")
         description.setWordWrap(True)
         layout.addWidget(description)
@@ -103,7 +113,7 @@ class UploadPage(QWidget):
         # Drop zone (also clickable to browse)
         self.drop_zone = DropZone()
         self.drop_zone.setMinimumHeight(200)
-        self.drop_zone.file_dropped.connect(self.on_file_selected)
+        self.drop_zone.files_dropped.connect(self.on_files_selected)
         self.drop_zone.clicked.connect(self.browse_file)
         layout.addWidget(self.drop_zone)
 
@@ -121,6 +131,23 @@ class UploadPage(QWidget):
         self.upload_btn.clicked.connect(self.handle_upload)
         layout.addWidget(self.upload_btn)
 
+        # Upload progress, shown while a single file is being sent
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setObjectName("uploadProgress")
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumHeight(6)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
+        # Cancel button, shown while an upload is running
+        self.cancel_btn = QPushButton("Cancel Upload")
+        self.cancel_btn.setObjectName("outlineButton")
+        self.cancel_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.cancel_btn.clicked.connect(self.cancel_upload)
+        self.cancel_btn.hide()
+        layout.addWidget(self.cancel_btn)
+
         # Demo CSV button
         demo_btn = QPushButton("📄 Use Demo Dataset")
         demo_btn.setObjectName("secondaryButton")
@@ -155,36 +182,104 @@ class UploadPage(QWidget):
         layout.addStretch()
 
     def browse_file(self):
-        """Open file dialog to select CSV."""
-        file_path, _ = QFileDialog.getOpenFileName(
+        """Open file dialog to select one or more CSVs or zip archives."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Select CSV File",
+            "Select CSV Files",
             "",
-            "CSV Files (*.csv);;All Files (*)"
+            "CSV Files (*.csv);;Zip Archives (*.zip);;All Files (*)"
         )
-        if file_path:
-            self.on_file_selected(file_path)
+        if file_paths:
+            self.on_files_selected(file_paths)
 
     def on_file_selected(self, file_path: str):
+        """Handle selection of a single file."""
+        self.on_files_selected([file_path])
+
+    def on_files_selected(self, file_paths: list):
         """Handle file selection."""
-        self.selected_file = file_path
-        filename = os.path.basename(file_path)
-        self.file_label.setText(f"Selected: {filename}")
+        self.selected_files = list(file_paths)
+        if len(file_paths) == 1:
+            self.file_label.setText(f"Selected: {os.path.basename(file_paths[0])}")
+        else:
+            self.file_label.setText(f"Selected: {len(file_paths)} files")
         self.file_label.setObjectName("fileLabelSelected")
         self.style().polish(self.file_label)
         self.upload_btn.setEnabled(True)
         self.status_label.hide()
 
     def handle_upload(self):
-        """Upload the selected file."""
-        if not self.selected_file:
+        """Upload the selected file(s)."""
+        if not self.selected_files or api_tasks.is_running("upload"):
             return
 
         self.upload_btn.setEnabled(False)
         self.upload_btn.setText("⏳ Uploading & Analyzing...")
+        self.cancel_btn.show()
         self.status_label.hide()
 
-        success, result = api_client.upload_csv(self.selected_file)
+        # Several files or an archive go up as one batch request
+        if len(self.selected_files) == 1 and self.selected_files[0].lower().endswith('.csv'):
+            self.progress_bar.setValue(0)
+            self.progress_bar.show()
+            api_tasks.submit(
+                api_client.upload_csv, self.selected_files[0],
+                key="upload",
+                on_finished=self.on_upload_finished,
+                on_cancelled=self.on_upload_cancelled,
+                on_progress=self.on_upload_progress,
+            )
+        else:
+            api_tasks.submit(
+                api_client.upload_batch, self.selected_files,
+                key="upload",
+                on_finished=self.on_batch_finished,
+                on_cancelled=self.on_upload_cancelled,
+            )
+
+    def cancel_upload(self):
+        """Cancel the running upload."""
+        api_tasks.cancel("upload")
+
+    def on_upload_progress(self, sent: int, total: int):
+        """Show how much of the file has been sent."""
+        self.progress_bar.setValue(int(sent * 1000 / total) if total else 0)
+        if sent >= total:
+            self.upload_btn.setText("⏳ Analyzing...")
+        else:
+            self.upload_btn.setText(f"⏳ Uploading {sent * 100 // total}%...")
+
+    def on_upload_cancelled(self):
+        """Restore the form after a cancelled upload."""
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
+        self.upload_btn.setEnabled(bool(self.selected_files))
+        self.upload_btn.setText("Upload & Analyze")
+        self.status_label.setText("Upload cancelled")
+        self.status_label.setObjectName("hintLabel")
+        self.status_label.show()
+        self.style().polish(self.status_label)
+
+    def on_batch_finished(self, success: bool, result):
+        """Handle the response of a batch upload."""
+        failed = []
+        if success:
+            failed = [f"{f['filename']}: {f['error']}" for f in result["files"] if f["status"] == "error"]
+            success, result = self._batch_result(result, failed)
+        self.on_upload_finished(success, result)
+
+        # Files that failed next to ones that were analyzed
+        if success and failed:
+            QMessageBox.warning(
+                self, "Some files were not analyzed",
+                f"{len(failed)} of {len(result['files'])} files could not be analyzed:\n\n"
+                + "\n".join(failed)
+            )
+
+    def on_upload_finished(self, success: bool, result):
+        """Handle the upload response."""
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
 
         if success:
             self.status_label.setText("✓ Upload successful! Generating charts...")
@@ -202,6 +297,17 @@ class UploadPage(QWidget):
 
         self.style().polish(self.status_label)
 
+    def _batch_result(self, data: dict, failed: list) -> tuple[bool, dict | str]:
+        """Turn a batch response into the combined result shown on the charts page."""
+        if data["rollup"] is None:
+            return False, "; ".join(failed) or "No files were analyzed"
+        analyzed = len(data["files"]) - len(failed)
+        return True, {
+            "filename": f"{analyzed} files combined",
+            "summary": data["rollup"],
+            "files": data["files"],
+        }
+
     def use_demo_csv(self):
         """Use the demo CSV file from backend sample_data."""
         # Find the demo CSV file relative to desktop-app directory
@@ -221,10 +327,13 @@ class UploadPage(QWidget):
 
     def reset(self):
         """Reset the upload form."""
-        self.selected_file = None
+        api_tasks.cancel("upload")
+        self.selected_files = []
         self.file_label.setText("No file selected")
         self.file_label.setObjectName("fileLabel")
         self.style().polish(self.file_label)
         self.upload_btn.setEnabled(False)
         self.upload_btn.setText("Upload & Analyze")
+        self.progress_bar.hide()
+        self.cancel_btn.hide()
         self.status_label.hide()
@@ -0,0 +1,104 @@
+export interface FlaggedReading {
+  value: number;
+  score: number;
+}
+
+export interface FlaggedRow {
+  row:       number;
+  equipment: string;
+  type:      string;
+  readings:  Record<string, FlaggedReading>;
+}
+
+export interface AnomalyData {
+  method:        string;
+  threshold:     number;
+  total_flagged: number;
+  truncated:     boolean;
+  rows:          FlaggedRow[];
+}
+
+interface Props {
+  data: AnomalyData;
+}
+
+const cell = {
+  padding: "10px 14px",
+  borderBottom: "1px solid rgba(99,202,255,0.08)",
+  textAlign: "left" as const,
+};
+
+/* readings flagged as out of envelope for their equipment type */
+const AnomalyTable = ({ data }: Props) => {
+  if (data.rows.length === 0) return null;
+
+  const title = data.truncated
+    ? `Flagged Readings — top ${data.rows.length} of ${data.total_flagged}`
+    : `Flagged Readings — ${data.total_flagged}`;
+
+  return (
+    <div
+      style={{
+        marginTop: 32,
+        borderRadius: 18,
+        border: "1px solid rgba(99,202,255,0.14)",
+        background: "rgba(17,24,39,0.55)",
+        backdropFilter: "blur(10px)",
+        padding: "22px 24px",
+      }}
+    >
+      <p
+        style={{
+          fontSize: 13,
+          color: "#63caff",
+          fontFamily: "'Share Tech Mono', monospace",
+          letterSpacing: "0.22em",
+          textTransform: "uppercase",
+          margin: "0 0 16px",
+        }}
+      >
+        ◈ {title}
+      </p>
+      <table
+        style={{
+          width: "100%",
+          borderCollapse: "collapse",
+          color: "#fff",
+          fontFamily: "'Rajdhani', sans-serif",
+          fontSize: 16,
+        }}
+      >
+        <thead>
+          <tr style={{ color: "#8b9bb5", fontFamily: "'Share Tech Mono', monospace", fontSize: 13 }}>
+            {["Equipment", "Type", "Reading", "Value", "Score"].map((h) => (
+              <th key={h} style={cell}>{h}</th>
+            ))}
+          </tr>
+        </thead>
+        <tbody>
+          {data.rows.flatMap((row) =>
+            Object.entries(row.readings).map(([column, reading]) => (
+              <tr key={`${row.row}-${column}`}>
+                <td style={cell}>{row.equipment}</td>
+                <td style={{ ...cell, color: "#8b9bb5" }}>{row.type}</td>
+                <td style={cell}>{column}</td>
+                <td style={{ ...cell, fontFamily: "'Share Tech Mono', monospace" }}>{reading.value}</td>
+                <td
+                  style={{
+                    ...cell,
+                    fontFamily: "'Share Tech Mono', monospace",
+                    color: reading.score > 0 ? "#fb7185" : "#fbbf24",
+                  }}
+                >
+                  {reading.score > 0 ? "+" : ""}{reading.score.toFixed(2)}
+                </td>
+              </tr>
+            ))
+          )}
+        </tbody>
+      </table>
+    </div>
+  );
+};
+
+export default AnomalyTable;
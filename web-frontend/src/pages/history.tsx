@@ -1,7 +1,7 @@
 import { useEffect, useState, useCallback } from "react";
 import api from "../api/axios";
 import SummaryChart from "../components/SummaryChart";
-import type { SummaryData } from "../components/SummaryChart";
+import type { SummaryData, TypeMetric } from "../components/SummaryChart";
 
 interface Dataset {
   id:                number;
@@ -12,6 +12,7 @@ interface Dataset {
   avg_pressure:      number;
   avg_temperature:   number;
   type_distribution?: Record<string, number>;
+  type_metrics?:      Record<string, TypeMetric>;
 }
 
 /* ── skeleton card ── */
@@ -42,25 +43,35 @@ const HistoryCard = ({ ds, index }: { ds: Dataset; index: number }) => {
     avg_pressure:      ds.avg_pressure,
     avg_temperature:   ds.avg_temperature,
     type_distribution: ds.type_distribution,
-    // Generate type_metrics from type_distribution for charts
-    type_metrics: ds.type_distribution ? Object.fromEntries(
-      Object.entries(ds.type_distribution).map(([type, count]) => [
-        type,
-        {
-          count: count as number,
-          avg_flowrate: ds.avg_flowrate * (0.9 + Math.random() * 0.2),
-          avg_pressure: ds.avg_pressure * (0.9 + Math.random() * 0.2),
-          avg_temperature: ds.avg_temperature * (0.9 + Math.random() * 0.2),
-        }
-      ])
-    ) : undefined,
+    // Per-type metrics are stored with the dataset; older uploads fall back
+    // to the dataset-wide averages
+    type_metrics: ds.type_metrics && Object.keys(ds.type_metrics).length
+      ? ds.type_metrics
+      : ds.type_distribution ? Object.fromEntries(
+          Object.entries(ds.type_distribution).map(([type, count]) => [
+            type,
+            {
+              count: count as number,
+              avg_flowrate: ds.avg_flowrate,
+              avg_pressure: ds.avg_pressure,
+              avg_temperature: ds.avg_temperature,
+            }
+          ])
+        ) : undefined,
   };
 
   const downloadReport = async (e: React.MouseEvent) => {
     e.stopPropagation(); // Don't toggle open/close
     setDownloading(true);
     try {
-      const res = await api.get(`report/${ds.id}/`, { responseType: "blob" });
+      // 202 means the report is still rendering in the background: poll
+      let res = await api.get(`report/${ds.id}/`, { responseType: "blob" });
+      for (let tries = 0; res.status === 202 && tries < 60; tries++) {
+        const wait = Number(res.headers["retry-after"] ?? 1) * 1000;
+        await new Promise((resolve) => setTimeout(resolve, wait));
+        res = await api.get(`report/${ds.id}/`, { responseType: "blob" });
+      }
+      if (res.status !== 200) throw new Error("Report not ready");
       const url  = URL.createObjectURL(new Blob([res.data], { type: "application/pdf" }));
       const link = document.createElement("a");
       link.href  = url; link.download = `report_${ds.filename.replace(".csv","")}.pdf`;
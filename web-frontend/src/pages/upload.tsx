@@ -2,6 +2,8 @@ import { useState, useRef, useCallback } from "react";
 import api from "../api/axios";
 import SummaryChart from "../components/SummaryChart";
 import type { SummaryData } from "../components/SummaryChart";
+import AnomalyTable from "../components/AnomalyTable";
+import type { AnomalyData } from "../components/AnomalyTable";
 
 /* ── reusable Toast ── */
 const Toast = ({
@@ -65,6 +67,7 @@ const Upload = () => {
   const [loading, setLoading] = useState(false);
   const [dragOver, setDragOver] = useState(false);
   const [summary, setSummary] = useState<SummaryData | null>(null);
+  const [anomalies, setAnomalies] = useState<AnomalyData | null>(null);
   const [toast, setToast] = useState<{
     show: boolean;
     type: "success" | "error";
@@ -126,9 +129,11 @@ const Upload = () => {
 
     setLoading(true);
     try {
-      await api.post("upload/", formData, {
+      const res = await api.post("upload/", formData, {
         headers: { "Content-Type": "multipart/form-data" },
+        params: { anomalies: "mad" },
       });
+      setAnomalies(res.data.anomalies ?? null);
 
       const histRes = await api.get("history/");
       if (histRes.data && histRes.data.length > 0) {
@@ -525,6 +530,7 @@ const Upload = () => {
             </div>
 
             <SummaryChart data={summary} />
+            {anomalies && <AnomalyTable data={anomalies} />}
           </div>
         )}
       </div>